@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('apply', '0004_alter_awardapplication_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='awardapplication',
+            index=models.Index(fields=['applicant', 'status'], name='apply_applicant_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apply', '0005_awardapplication_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='awardapplication',
+            name='admin_remark',
+            field=models.TextField(blank=True, default='', verbose_name='审批备注'),
+        ),
+    ]
@@ -17,8 +17,15 @@ class AwardApplication(models.Model):
     payload = models.JSONField(verbose_name="申请详情数据")
 
     status = FSMField(default='pending', verbose_name="审批状态")
+    admin_remark = models.TextField(blank=True, default='', verbose_name="审批备注")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # “我的申请”按 (申请人, 状态) 筛选
+            models.Index(fields=['applicant', 'status'], name='apply_applicant_status_idx'),
+        ]
+
     @transition(field=status, source='pending', target='approved')
     def approve(self):
         pass
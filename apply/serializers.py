@@ -7,8 +7,9 @@ class AwardApplicationBaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AwardApplication
-        fields = ['id', 'cert_image', 'cert_no','award_level','award_date', 'payload', 'status', 'created_at', 'applicant']
-        read_only_fields = ['status', 'created_at', 'applicant']
+        fields = ['id', 'cert_image', 'cert_no','award_level','award_date', 'payload', 'status', 'admin_remark',
+                  'created_at', 'applicant']
+        read_only_fields = ['status', 'admin_remark', 'created_at', 'applicant']
 
 
 class AwardApplySerializer(AwardApplicationBaseSerializer):
@@ -25,43 +26,97 @@ class AwardApplySerializer(AwardApplicationBaseSerializer):
         # 优化点 2：Payload 业务校验
         self.validate_business_logic(attrs.get('payload', {}))
 
+        # 优化点 3：获奖防重（竞赛 + 获奖等级 + 学生ID）
+        award_level = attrs.get('award_level') or (instance.award_level if instance else None)
+        self.validate_duplicate_award(attrs.get('payload', {}), award_level)
+
         return attrs
 
     def validate_business_logic(self, payload):
-        """校验 JSON 内部的关联 ID 是否合法"""
+        """
+        校验 JSON 内部的关联 ID 是否合法
+        类别、级别与参与人/指导老师的存在性合并为一条 UNION ALL 查询，每行为 (类型, 键)
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models import CharField, F, Value
+        from django.db.models.functions import Cast
         from competitions.models import CompetitionCategory, CompetitionLevel
 
         category_id = payload.get('category_id')
         level_id = payload.get('level_id')
+        if not category_id:
+            raise serializers.ValidationError({"payload": "必须提供 category_id"})
+        if not level_id:
+            raise serializers.ValidationError({"payload": "必须提供 level_id"})
+
+        User = get_user_model()
+        participant_ids = [str(uid) for uid in payload.get('participant_ids', [])]
+        instructor_ids = [str(uid) for uid in payload.get('instructor_ids', [])]
+
+        # 各分支都只选注解列，保证 UNION 的列顺序一致
+        lookups = [
+            CompetitionCategory.objects.filter(pk=category_id)
+            .annotate(kind=Value('category'), key=Cast('pk', CharField())).values_list('kind', 'key'),
+            CompetitionLevel.objects.filter(pk=level_id)
+            .annotate(kind=Value('level'), key=Cast('pk', CharField())).values_list('kind', 'key'),
+        ]
+        if participant_ids or instructor_ids:
+            lookups.append(
+                User.objects.filter(user_id__in=set(participant_ids + instructor_ids))
+                .annotate(kind=Value('user'), key=F('user_id')).values_list('kind', 'key')
+            )
+        rows = set(lookups[0].union(*lookups[1:], all=True))
+        kinds = {kind for kind, _ in rows}
+        found = {key for kind, key in rows if kind == 'user'}
 
         # 校验竞赛类别
-        if category_id:
-            if not CompetitionCategory.objects.filter(pk=category_id).exists():
-                raise serializers.ValidationError({"payload": f"竞赛类别 ID {category_id} 不存在"})
-        else:
-            raise serializers.ValidationError({"payload": "必须提供 category_id"})
+        if 'category' not in kinds:
+            raise serializers.ValidationError({"payload": f"竞赛类别 ID {category_id} 不存在"})
 
         # 校验竞赛级别
-        if level_id:
-            if not CompetitionLevel.objects.filter(pk=level_id).exists():
-                raise serializers.ValidationError({"payload": f"竞赛级别 ID {level_id} 不存在"})
-        else:
-            raise serializers.ValidationError({"payload": "必须提供 level_id"})
+        if 'level' not in kinds:
+            raise serializers.ValidationError({"payload": f"竞赛级别 ID {level_id} 不存在"})
+
+        # 校验用户ID 是否合法：指出具体缺失的 ID
+        errors = []
+        missing_participants = [uid for uid in dict.fromkeys(participant_ids) if uid not in found]
+        if missing_participants:
+            errors.append(f"以下参与人 user_id 无效: {missing_participants}")
+        missing_instructors = [uid for uid in dict.fromkeys(instructor_ids) if uid not in found]
+        if missing_instructors:
+            errors.append(f"以下指导老师 user_id 无效: {missing_instructors}")
+        if errors:
+            raise serializers.ValidationError({"payload": errors})
+
+    def validate_duplicate_award(self, payload, award_level):
+        """
+        查询获奖防重索引：同一竞赛、同一获奖等级下，参与学生已有获奖记录则拒绝提交
+        """
+        from award.models import AwardConflictKey
 
-        # 校验用户ID 是否合法
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
         participant_ids = payload.get('participant_ids', [])
-        instructor_ids = payload.get('instructor_ids', [])
-        if participant_ids:
-            exists_count = User.objects.filter(user_id__in=participant_ids).count()
-            if exists_count != len(participant_ids):
-                raise serializers.ValidationError({"payload": "部分参与人 user_id 无效"})
-        if instructor_ids:
-            exists_count = User.objects.filter(user_id__in=instructor_ids).count()
-            if exists_count != len(participant_ids):
-                raise serializers.ValidationError({"payload": "部分指导老师 user_id 无效"})
+        if not award_level or not participant_ids:
+            return
 
+        conflicts = AwardConflictKey.objects.filter(
+            award_level=award_level,
+            user__user_id__in=participant_ids
+        )
+        if payload.get('comp_id'):
+            conflicts = conflicts.filter(competition_id=payload.get('comp_id'))
+        elif payload.get('comp_title') and payload.get('year'):
+            conflicts = conflicts.filter(
+                competition__title=payload.get('comp_title'),
+                competition__year=payload.get('year')
+            )
+        else:
+            return
+
+        duplicated = sorted(set(conflicts.values_list('user__user_id', flat=True)))
+        if duplicated:
+            raise serializers.ValidationError(
+                {"payload": f"以下学生在该竞赛中已有“{award_level}”获奖记录，请勿重复申请: {duplicated}"}
+            )
 
 class AwardApproveSerializer(AwardApplicationBaseSerializer):
     class Meta(AwardApplicationBaseSerializer.Meta):
@@ -1,3 +1,290 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django_fsm.signals import post_transition
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from award.models import Award
+from certificate.models import Certificate
+from competitionManagementSys.factories import create_admin, create_competition, create_user
+from competitions.models import Competition, CompetitionCategory, CompetitionLevel
+from .models import AwardApplication
+from .serializers import AwardApplySerializer
+from .utils import ApprovalContext
+
+
+def png(name):
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ApplicationTestCase(TestCase):
+    """审批相关用例的公共数据：管理员、学生、老师与一个已有竞赛（提供类别与级别），证书文件写入临时目录"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.student = create_user('20000000000', groups=('Student',))
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        cls.competition = create_competition()
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_application(self, cert_no, **payload):
+        payload.setdefault('participant_ids', [self.student.user_id])
+        payload.setdefault('instructor_ids', [self.teacher.user_id])
+        if 'comp_id' not in payload:
+            payload.setdefault('comp_title', '新竞赛')
+            payload.setdefault('year', 2024)
+            payload.setdefault('category_id', self.competition.category_id)
+            payload.setdefault('level_id', self.competition.level_id)
+        return AwardApplication.objects.create(
+            applicant=self.student, cert_no=cert_no, award_level='一等奖', award_date='2024-06-01',
+            cert_image=SimpleUploadedFile(f'{cert_no}.png', b'png'), payload=payload,
+        )
+
+
+class BatchApproveTests(ApplicationTestCase):
+    """批量审批：逐条 savepoint，单条失败不影响其余申请，返回逐条结果"""
+
+    def batch_approve(self, ids):
+        response = self.client.post('/apply/award-approve/batch-approve/', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_results(self):
+        ok = self.create_application('C-001', comp_id=self.competition.pk)
+        missing_user = self.create_application('C-002', comp_id=self.competition.pk, participant_ids=['x'])
+        done = self.create_application('C-003', comp_id=self.competition.pk)
+        AwardApplication.objects.filter(pk=done.pk).update(status='rejected')
+
+        data = self.batch_approve([ok.pk, missing_user.pk, done.pk, 99999])
+        self.assertEqual((data['approved'], data['failed']), (1, 3))
+        self.assertEqual([(item['id'], item['success']) for item in data['results']], [
+            (ok.pk, True), (missing_user.pk, False), (done.pk, False), (99999, False),
+        ])
+        self.assertIn("['x']", data['results'][1]['detail'])
+
+        award = Award.objects.get(pk=data['results'][0]['award_id'])
+        self.assertEqual(list(award.participants.all()), [self.student])
+        self.assertEqual(list(award.instructors.all()), [self.teacher])
+        self.assertEqual(
+            list(AwardApplication.objects.order_by('id').values_list('status', flat=True)),
+            ['approved', 'pending', 'rejected']
+        )
+        self.assertEqual(list(Certificate.objects.values_list('cert_no', flat=True)), ['C-001'])
+        self.assertEqual(self.student.notifications.get().target, award)
+
+        # 已处理的申请不会被重复审批
+        data = self.batch_approve([ok.pk])
+        self.assertEqual(data['results'][0]['detail'], '该申请已处理，请勿重复操作')
+        self.assertEqual(Award.objects.count(), 1)
+
+    def test_failed_application_does_not_leave_cached_competition(self):
+        # 第一条申请新建竞赛后因证书文件丢失失败，savepoint 回滚了竞赛；
+        # 同批引用同名竞赛的第二条申请必须重新创建，而不是引用已回滚的竞赛
+        broken = self.create_application('C-001')
+        broken.cert_image.storage.delete(broken.cert_image.name)
+        ok = self.create_application('C-002')
+
+        data = self.batch_approve([broken.pk, ok.pk])
+        self.assertEqual([item['success'] for item in data['results']], [False, True])
+        award = Award.objects.get(pk=data['results'][1]['award_id'])
+        self.assertTrue(Competition.objects.filter(pk=award.competition_id, title='新竞赛').exists())
+        self.assertEqual(Competition.objects.filter(title='新竞赛').count(), 1)
+
+    def test_new_competition_shared_within_batch(self):
+        first, second = self.create_application('C-001'), self.create_application('C-002')
+        data = self.batch_approve([first.pk, second.pk])
+        self.assertEqual(data['approved'], 2)
+        self.assertEqual(Competition.objects.filter(title='新竞赛').count(), 1)
+
+    def test_invalid_ids(self):
+        for ids in ([], 'x', ['a']):
+            response = self.client.post('/apply/award-approve/batch-approve/', {'ids': ids}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+class RejectTests(ApplicationTestCase):
+    """单条与批量拒绝都经过 reject 状态流转并保存审批备注"""
+
+    def setUp(self):
+        super().setUp()
+        self.transitions = []
+
+        def record(sender, instance, name, source, target, **kwargs):
+            self.transitions.append((instance.pk, name, source, target))
+
+        post_transition.connect(record, sender=AwardApplication)
+        self.addCleanup(post_transition.disconnect, record, sender=AwardApplication)
+
+    def test_batch_reject(self):
+        first, second, done = [self.create_application(f'C-00{i}', comp_id=self.competition.pk) for i in range(3)]
+        AwardApplication.objects.filter(pk=done.pk).update(status='approved')
+
+        response = self.client.post('/apply/award-approve/batch-reject/', {
+            'ids': [first.pk, second.pk, done.pk], 'remark': '证书不清晰',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rejected'], 2)
+        self.assertEqual([item['success'] for item in response.json()['results']], [True, True, False])
+
+        self.assertEqual(
+            list(AwardApplication.objects.order_by('id').values_list('status', 'admin_remark')),
+            [('rejected', '证书不清晰'), ('rejected', '证书不清晰'), ('approved', '')]
+        )
+        self.assertEqual(sorted(self.transitions), [
+            (first.pk, 'reject', 'pending', 'rejected'), (second.pk, 'reject', 'pending', 'rejected'),
+        ])
+        self.assertEqual(self.student.notifications.count(), 2)
+
+    def test_do_reject(self):
+        app = self.create_application('C-001', comp_id=self.competition.pk)
+        response = self.client.post(f'/apply/award-approve/{app.pk}/do_reject/', {'remark': '材料不全'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        app.refresh_from_db()
+        self.assertEqual((app.status, app.admin_remark), ('rejected', '材料不全'))
+        self.assertEqual(self.transitions, [(app.pk, 'reject', 'pending', 'rejected')])
+
+        # 申请人可以看到退回理由，但不能修改
+        client = APIClient()
+        client.force_authenticate(self.student)
+        self.assertEqual(client.get(f'/apply/award-apply/{app.pk}/').json()['admin_remark'], '材料不全')
+
+
+class DuplicateAwardTests(ApplicationTestCase):
+    """提交申请时查询获奖防重索引：同一竞赛、同一获奖等级下已获奖的学生不能重复申请"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        award = Award.objects.create(competition=cls.competition, award_level='一等奖', award_date='2024-06-01')
+        award.participants.add(cls.student)
+        # 只作为指导老师获奖不计入防重
+        award.instructors.add(cls.teacher)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.student)
+
+    def apply(self, award_level='一等奖', **payload):
+        payload.setdefault('participant_ids', [self.student.user_id])
+        payload.setdefault('category_id', self.competition.category_id)
+        payload.setdefault('level_id', self.competition.level_id)
+        response = self.client.post('/apply/award-apply/', {
+            'cert_image': png('c.png'), 'cert_no': 'C-NEW', 'award_level': award_level,
+            'award_date': '2024-06-01', 'payload': json.dumps(payload), 'status': 'approved',
+        }, format='multipart')
+        return response
+
+    def test_duplicate_by_comp_id(self):
+        response = self.apply(comp_id=self.competition.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.student.user_id, str(response.json()['payload']))
+
+    def test_duplicate_by_title_and_year(self):
+        response = self.apply(comp_title=self.competition.title, year=self.competition.year)
+        self.assertEqual(response.status_code, 400)
+
+    def test_allowed(self):
+        self.assertEqual(self.apply('二等奖', comp_id=self.competition.pk).status_code, 201)
+        self.assertEqual(self.apply(comp_title=self.competition.title, year=2025).status_code, 201)
+        response = self.apply(comp_id=self.competition.pk, participant_ids=[self.teacher.user_id])
+        self.assertEqual(response.status_code, 201)
+
+    def test_applicant_cannot_set_status(self):
+        # 学生提交接口使用 AwardApplySerializer：执行业务校验，提交的 status 被忽略
+        response = self.apply('二等奖', comp_id=self.competition.pk)
+        app_id = response.json()['id']
+        self.assertEqual(AwardApplication.objects.get(pk=app_id).status, 'pending')
+
+        # 管理员审批接口使用 AwardApproveSerializer，status 可写
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(f'/apply/award-approve/{app_id}/', {'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AwardApplication.objects.get(pk=app_id).status, 'rejected')
+
+
+class ReferenceValidationTests(ApplicationTestCase):
+    """类别、级别每次校验都以数据库为准：新建、删除与回滚的数据不会被旧结果掩盖"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.student)
+
+    def apply(self, **payload):
+        payload.setdefault('comp_title', '新竞赛')
+        payload.setdefault('year', 2024)
+        payload.setdefault('category_id', self.competition.category_id)
+        payload.setdefault('level_id', self.competition.level_id)
+        return self.client.post('/apply/award-apply/', {
+            'cert_image': png('c.png'), 'cert_no': 'C-NEW', 'award_level': '一等奖',
+            'award_date': '2024-06-01', 'payload': json.dumps(payload),
+        }, format='multipart')
+
+    def test_new_and_deleted_references(self):
+        self.assertEqual(self.apply().status_code, 201)
+
+        category = CompetitionCategory.objects.create(name='创新类')
+        level = CompetitionLevel.objects.create(name='省级')
+        self.assertEqual(self.apply(category_id=category.pk, level_id=level.pk).status_code, 201)
+
+        category_id = category.pk
+        category.delete()
+        response = self.apply(category_id=category_id, level_id=level.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'竞赛类别 ID {category_id} 不存在', str(response.json()['payload']))
+
+    def test_rolled_back_reference(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            level = CompetitionLevel.objects.create(name='省级')
+            self.assertEqual(self.apply(level_id=level.pk).status_code, 201)
+            raise RuntimeError
+
+        response = self.apply(level_id=level.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'竞赛级别 ID {level.pk} 不存在', str(response.json()['payload']))
+
+    def test_batch_resolves_references_once(self):
+        other = CompetitionCategory.objects.create(name='创新类')
+        apps = [self.create_application(f'C-00{i}', category_id=category_id)
+                for i, category_id in enumerate([self.competition.category_id, other.pk, 99999])]
+        # 类别、级别、按名称匹配的竞赛、用户、证书编号各一次查询，与批量大小无关
+        with self.assertNumQueries(5):
+            context = ApprovalContext(apps)
+        self.assertEqual(context.category_ids, {self.competition.category_id, other.pk})
+        self.assertEqual(context.level_ids, {self.competition.level_id})
+
+    def test_validation_is_one_query(self):
+        payload = {
+            'category_id': self.competition.category_id, 'level_id': self.competition.level_id,
+            'participant_ids': [self.student.user_id, 'x'], 'instructor_ids': [self.teacher.user_id],
+        }
+        serializer = AwardApplySerializer()
+        with self.assertNumQueries(1), self.assertRaises(ValidationError) as raised:
+            serializer.validate_business_logic(payload)
+        self.assertEqual(raised.exception.detail, {'payload': ["以下参与人 user_id 无效: ['x']"]})
+
+        payload['participant_ids'] = [self.student.user_id]
+        with self.assertNumQueries(1):
+            serializer.validate_business_logic(payload)
+
+        for key, message in [('category_id', '竞赛类别 ID 99999 不存在'), ('level_id', '竞赛级别 ID 99999 不存在')]:
+            with self.subTest(key), self.assertNumQueries(1), self.assertRaises(ValidationError) as raised:
+                serializer.validate_business_logic({**payload, key: 99999})
+            self.assertEqual(raised.exception.detail, {'payload': message})
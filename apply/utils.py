@@ -1,8 +1,143 @@
+import os
+
 from django.contrib.auth.models import Group
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+
+from award.models import Award
+from certificate.models import Certificate
+from competitions.models import Competition, CompetitionCategory, CompetitionLevel
 
 User = get_user_model()
 
 def get_users_by_group(group_name):
     """根据组名获取用户列表"""
-    return User.objects.filter(groups__name=group_name)
\ No newline at end of file
+    return User.objects.filter(groups__name=group_name)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ApprovalContext:
+    """
+    审批所需的参照数据：一次性预取一批申请引用的类别、级别、竞赛、用户与已占用的证书编号
+    单条审批与批量审批共用，批量时整批只需少量 __in 查询
+    """
+
+    def __init__(self, applications):
+        payloads = [app.payload or {} for app in applications]
+
+        category_ids = {_to_int(p.get('category_id')) for p in payloads} - {None}
+        level_ids = {_to_int(p.get('level_id')) for p in payloads} - {None}
+        comp_ids = {_to_int(p.get('comp_id')) for p in payloads} - {None}
+
+        # 类别、级别每批各查一次，不做跨请求缓存：多数据库、回滚与其他进程的删除都能如实反映
+        self.category_ids = set(CompetitionCategory.objects.filter(pk__in=category_ids).values_list('pk', flat=True))
+        self.level_ids = set(CompetitionLevel.objects.filter(pk__in=level_ids).values_list('pk', flat=True))
+        self.competitions_by_id = Competition.objects.in_bulk(comp_ids)
+
+        # 按 (名称, 年份) 匹配已有竞赛，等价于 get_or_create 的查找部分
+        titles = {p.get('comp_title') for p in payloads if not p.get('comp_id')} - {None}
+        self.competitions_by_key = {}
+        for competition in Competition.objects.filter(title__in=titles).order_by('id'):
+            self.competitions_by_key.setdefault((competition.title, str(competition.year)), competition)
+
+        user_ids = {
+            str(uid)
+            for p in payloads
+            for uid in (p.get('participant_ids') or []) + (p.get('instructor_ids') or [])
+        }
+        self.users = {user.user_id: user for user in User.objects.filter(user_id__in=user_ids)}
+
+        self.used_cert_nos = set(
+            Certificate.objects.filter(cert_no__in=[app.cert_no for app in applications])
+            .values_list('cert_no', flat=True)
+        )
+
+
+def approve_application(app, context):
+    """
+    将一条待审批申请转为正式获奖记录并流转状态，返回生成的 Award
+    校验失败抛出 ValueError；调用方负责事务（批量时每条申请一个 savepoint）
+    """
+    data = app.payload or {}
+
+    # --- 1. 验证基础数据 ---
+    if not data.get('comp_id'):
+        if _to_int(data.get('category_id')) not in context.category_ids:
+            raise ValueError(f"竞赛类别ID {data.get('category_id')} 不存在")
+        if _to_int(data.get('level_id')) not in context.level_ids:
+            raise ValueError(f"竞赛级别ID {data.get('level_id')} 不存在")
+
+    # --- 2. 校验人员与证书编号 ---
+    people = {}
+    for field_name, ids_key in [('participants', 'participant_ids'), ('instructors', 'instructor_ids')]:
+        u_ids = [str(uid) for uid in (data.get(ids_key) or [])]
+        missing = [uid for uid in u_ids if uid not in context.users]
+        if missing:
+            raise ValueError(f"以下人员 ID 不存在: {missing}")
+        people[field_name] = [context.users[uid] for uid in u_ids]
+
+    if app.cert_no in context.used_cert_nos:
+        raise ValueError(f"证书编号 {app.cert_no} 已存在")
+
+    # --- 3. 处理竞赛 ---
+    comp_id = data.get('comp_id')
+    new_competition_key = None
+    if comp_id:
+        competition = context.competitions_by_id.get(_to_int(comp_id))
+        if competition is None:
+            raise ValueError("关联的竞赛已不存在")
+    else:
+        key = (data.get('comp_title'), str(data.get('year')))
+        competition = context.competitions_by_key.get(key)
+        if competition is None:
+            competition = Competition.objects.create(
+                title=data.get('comp_title'),
+                year=data.get('year'),
+                description=data.get('description', ''),
+                uri=data.get('uri', ''),
+                category_id=data.get('category_id'),
+                level_id=data.get('level_id'),
+                creator=app.applicant
+            )
+            new_competition_key = key
+
+    # --- 4. 处理证书：复制申请中的临时文件 ---
+    new_cert = Certificate(cert_no=app.cert_no)
+    with app.cert_image.open('rb') as source:
+        new_cert.image_uri.save(os.path.basename(app.cert_image.name), ContentFile(source.read()), save=False)
+
+    try:
+        new_cert.save()
+
+        # --- 5. 创建正式 Award 并关联人员 ---
+        award = Award.objects.create(
+            competition=competition,
+            certificate=new_cert,
+            creator=app.applicant,
+            award_level=app.award_level,
+            award_date=app.award_date,
+        )
+        for field_name, users in people.items():
+            if users:
+                getattr(award, field_name).set(users)
+
+        # --- 6. 状态流转与保存 ---
+        app.approve()
+        app.save()
+    except Exception:
+        # 数据库回滚不会删除已写入的文件，这里手动清理
+        new_cert.image_uri.delete(save=False)
+        raise
+
+    context.used_cert_nos.add(app.cert_no)
+    # 新建的竞赛在本条申请全部写入成功后才放入缓存：
+    # 中途失败时调用方回滚 savepoint，竞赛随之消失，不能留给同批后续申请引用
+    if new_competition_key is not None:
+        context.competitions_by_key[new_competition_key] = competition
+    return award
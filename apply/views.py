@@ -1,27 +1,22 @@
-import os
-
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
 from django.db import transaction
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from notifications.signals import notify
 
-from award.models import Award
-from certificate.models import Certificate
-from competitions.models import Competition, CompetitionCategory, CompetitionLevel
 from userManage.permissions import IsCompAdmin
 from .models import AwardApplication
 from .serializers import AwardApplySerializer, AwardApproveSerializer
-from .utils import get_users_by_group
+from notification.utils import bulk_notify
+from .utils import get_users_by_group, ApprovalContext, approve_application
 
 User = get_user_model()
 
 class AwardApproveViewSet(viewsets.ModelViewSet):
     permission_classes = [IsCompAdmin]
     queryset = AwardApplication.objects.all()
-    serializer_class = AwardApplySerializer
+    serializer_class = AwardApproveSerializer
 
     @action(detail=True, methods=['post'])
     def do_approve(self, request, pk=None):
@@ -30,69 +25,11 @@ class AwardApproveViewSet(viewsets.ModelViewSet):
         if app.status != 'pending':
             return Response({"detail": "该申请已处理，请勿重复操作"}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = app.payload
-
         try:
             with transaction.atomic():
-                # --- 1. 验证基础数据 ---
-                if not data.get('comp_id'):
-                    if not CompetitionCategory.objects.filter(pk=data.get('category_id')).exists():
-                        raise ValueError(f"竞赛类别ID {data.get('category_id')} 不存在")
-                    if not CompetitionLevel.objects.filter(pk=data.get('level_id')).exists():
-                        raise ValueError(f"竞赛级别ID {data.get('level_id')} 不存在")
-
-                # --- 2. 处理竞赛 ---
-                comp_id = data.get('comp_id')
-                if comp_id:
-                    competition = Competition.objects.get(pk=comp_id)
-                else:
-                    competition, _ = Competition.objects.get_or_create(
-                        title=data.get('comp_title'),
-                        year=data.get('year'),
-                        defaults={
-                            'description': data.get('description', ''),
-                            'uri': data.get('uri', ''),
-                            'category_id': data.get('category_id'),
-                            'level_id': data.get('level_id'),
-                            'creator': app.applicant
-                        }
-                    )
-
-                # --- 3. 处理证书 (关键：如果保存失败会抛错触发回滚) ---
-                # 读取原始文件内容
-                file_content = app.cert_image.read()
-                file_name = os.path.basename(app.cert_image.name)
-
-                new_cert = Certificate(cert_no=app.cert_no)
-                # save(name, content, save=False) 这里的 save=False 是指暂不提交数据库，但会处理文件流
-                new_cert.image_uri.save(file_name, ContentFile(file_content), save=False)
-                new_cert.save()
-
-                # --- 4. 创建正式 Award ---
-                # 如果这一步失败（例如 award_level 为空），前面的 new_cert 产生的文件和记录都会回滚
-                award = Award.objects.create(
-                    competition=competition,
-                    certificate=new_cert,
-                    creator=app.applicant,
-                    award_level=app.award_level,
-                    award_date=app.award_date,
-                )
-
-                # --- 5. 关联人员 (校验学号) ---
-                for field_name, ids_key in [('participants', 'participant_ids'), ('instructors', 'instructor_ids')]:
-                    u_ids = data.get(ids_key, [])
-                    if u_ids:
-                        user_objs = User.objects.filter(user_id__in=u_ids)
-                        if user_objs.count() != len(u_ids):
-                            found_ids = list(user_objs.values_list('user_id', flat=True))
-                            missing = set(u_ids) - set(found_ids)
-                            raise ValueError(f"以下人员 ID 不存在: {list(missing)}")
-
-                        getattr(award, field_name).set(user_objs)
-
-                # --- 6. 状态流转与保存 ---
-                app.approve()
-                app.save()
+                # 校验、建竞赛、复制证书、生成 Award、关联人员、状态流转
+                # 任一步骤失败，证书记录和 Award 记录都不会留在数据库里
+                award = approve_application(app, ApprovalContext([app]))
 
                 # --- 7. 发送通知 ---
                 notify.send(
@@ -104,16 +41,114 @@ class AwardApproveViewSet(viewsets.ModelViewSet):
 
             return Response({"detail": "审批通过，正式记录已生成"}, status=status.HTTP_200_OK)
 
-        except Competition.DoesNotExist:
-            return Response({"detail": "关联的竞赛已不存在"}, status=400)
         except ValueError as e:
             return Response({"detail": str(e)}, status=400)
         except Exception as e:
             import logging
             logging.error(f"Approval Error: {str(e)}")
-            # 这里的异常捕获确保了只要 atomic 内部有任何报错，证书记录和 Award 记录都不会留在数据库里
             return Response({"detail": f"操作失败，数据已回滚: {str(e)}"}, status=400)
 
+    def _get_batch_ids(self, request):
+        """解析批量接口的 ids 参数，格式不正确时返回空列表"""
+        ids = request.data.get('ids')
+        if not isinstance(ids, list):
+            return []
+        try:
+            return list(dict.fromkeys(int(app_id) for app_id in ids))
+        except (TypeError, ValueError):
+            return []
+
+    @action(detail=False, methods=['post'], url_path='batch-approve')
+    def batch_approve(self, request):
+        """
+        批量审批通过
+        POST /apply/award-approve/batch-approve/
+        data: {"ids": [1, 2, 3]}
+        每条申请在独立的 savepoint 中处理，单条失败不影响其余申请，返回逐条结果
+        """
+        ids = self._get_batch_ids(request)
+        if not ids:
+            return Response({"detail": "请提供 ids 列表"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = {}
+        notices = []
+        with transaction.atomic():
+            # 锁定整批申请，并发的批量/单条审批等待本批提交后再读取状态，同一申请不会被重复审批
+            apps = {
+                app.id: app
+                for app in AwardApplication.objects.select_for_update(of=('self',))
+                .filter(id__in=ids).select_related('applicant')
+            }
+            pending = [app for app in apps.values() if app.status == 'pending']
+
+            # 整批的类别、级别、竞赛、用户、证书编号一次性预取
+            context = ApprovalContext(pending)
+
+            for app in pending:
+                try:
+                    with transaction.atomic():
+                        award = approve_application(app, context)
+                except Exception as e:
+                    results[app.id] = {"id": app.id, "success": False, "detail": str(e)}
+                    continue
+                results[app.id] = {"id": app.id, "success": True, "award_id": award.id,
+                                   "detail": "审批通过，正式记录已生成"}
+                notices.append((app.applicant_id, '您的获奖申请已通过并入库', award))
+
+            bulk_notify(request.user, notices)
+
+        response = []
+        for app_id in ids:
+            if app_id in results:
+                response.append(results[app_id])
+            elif app_id in apps:
+                response.append({"id": app_id, "success": False, "detail": "该申请已处理，请勿重复操作"})
+            else:
+                response.append({"id": app_id, "success": False, "detail": "申请不存在"})
+
+        return Response({
+            "approved": len(notices),
+            "failed": len(response) - len(notices),
+            "results": response
+        })
+
+    @action(detail=False, methods=['post'], url_path='batch-reject')
+    def batch_reject(self, request):
+        """
+        批量拒绝
+        POST /apply/award-approve/batch-reject/
+        data: {"ids": [1, 2, 3], "remark": "可选的退回理由"}
+        只处理待审批的申请；与 do_reject 相同经过 reject 状态流转并记录审批备注，一条 UPDATE 批量写回
+        """
+        ids = self._get_batch_ids(request)
+        if not ids:
+            return Response({"detail": "请提供 ids 列表"}, status=status.HTTP_400_BAD_REQUEST)
+
+        remark = request.data.get('remark', '')
+        with transaction.atomic():
+            pending = list(
+                AwardApplication.objects.select_for_update()
+                .filter(id__in=ids, status='pending')
+                .only('id', 'applicant_id', 'status')
+            )
+            for app in pending:
+                app.reject()
+                app.admin_remark = remark
+            AwardApplication.objects.bulk_update(pending, ['status', 'admin_remark'])
+            bulk_notify(request.user, [
+                (app.applicant_id, '您的获奖申请已被退回', None) for app in pending
+            ])
+
+        rejected_ids = {app.id for app in pending}
+        return Response({
+            "rejected": len(rejected_ids),
+            "results": [
+                {"id": app_id, "success": app_id in rejected_ids,
+                 "detail": "已拒绝该申请" if app_id in rejected_ids else "申请不存在或已处理"}
+                for app_id in ids
+            ]
+        })
+
     @action(detail=True, methods=['post'])
     def do_reject(self, request, pk=None):
         """增加拒绝申请的接口"""
@@ -131,7 +166,7 @@ class AwardApproveViewSet(viewsets.ModelViewSet):
 
 class AwardApplyViewSet(viewsets.ModelViewSet):
     queryset = AwardApplication.objects.all()
-    serializer_class = AwardApproveSerializer
+    serializer_class = AwardApplySerializer
     # 只要登录的用户都可以提交申请
     permission_classes = [permissions.IsAuthenticated]
 
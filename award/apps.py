@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AwardConfig(AppConfig):
     name = 'award'
+
+    def ready(self):
+        # 注册全文检索索引的同步信号
+        from . import signals  # noqa: F401
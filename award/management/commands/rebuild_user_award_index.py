@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from award.utils import rebuild_conflict_keys, rebuild_user_award_index
+
+
+class Command(BaseCommand):
+    help = '根据获奖记录的参赛学生/指导老师全量重建用户获奖索引与获奖防重索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='目标数据库别名')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            total = rebuild_user_award_index(using=using)
+            conflict_total = rebuild_conflict_keys(using=using)
+        self.stdout.write(self.style.SUCCESS(
+            f'用户获奖索引重建完成，共 {total} 条；获奖防重索引重建完成，共 {conflict_total} 条'
+        ))
@@ -0,0 +1,78 @@
+import re
+
+from django.db import migrations
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不生成拼音词元
+    lazy_pinyin = None
+
+# 迁移是历史快照：表结构、分词/拼音规则与回填 SQL 都写在这里，不引用运行时的 award.search，
+# 后者之后的修改不会影响本迁移的执行结果
+
+CREATE_FTS_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS sys_award_fts USING fts5('
+    'competition, event, award_level, pinyin, tokenize="unicode61 remove_diacritics 2")'
+)
+INSERT_FTS_SQL = 'INSERT INTO sys_award_fts (rowid, competition, event, award_level, pinyin) VALUES (%s, %s, %s, %s, %s)'
+SELECT_AWARDS_SQL = (
+    'SELECT a.id, c.title, e.name, a.award_level FROM sys_award a '
+    'INNER JOIN sys_competition c ON c.id = a.competition_id '
+    'LEFT JOIN sys_competition_event e ON e.id = a.event_id'
+)
+
+CJK_RE = re.compile(r'([㐀-䶿一-鿿豈-﫿])')
+CJK_RUN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+PINYIN_MAX_SUFFIXES = 32
+
+
+def segment(text):
+    if not text:
+        return ''
+    return ' '.join(CJK_RE.sub(r' \1 ', text).split())
+
+
+def pinyin_tokens(*texts):
+    if lazy_pinyin is None:
+        return ''
+    tokens = []
+    for text in texts:
+        for run in CJK_RUN_RE.findall(text or ''):
+            full = lazy_pinyin(run)
+            initials = lazy_pinyin(run, style=Style.FIRST_LETTER)
+            for i in range(min(len(run), PINYIN_MAX_SUFFIXES)):
+                tokens.append(''.join(full[i:]))
+                tokens.append(''.join(initials[i:]))
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(CREATE_FTS_SQL)
+    with connection.cursor() as cursor:
+        cursor.execute(SELECT_AWARDS_SQL)
+        rows = [
+            [pk, segment(title), segment(event), segment(level), pinyin_tokens(title, event, level)]
+            for pk, title, event, level in cursor.fetchall()
+        ]
+        cursor.executemany(INSERT_FTS_SQL, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS sys_award_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('award', '0003_award_event_alter_award_id'),
+        ('competitions', '0005_competition_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_user_award_index(apps, schema_editor):
+    Award = apps.get_model('award', 'Award')
+    UserAwardIndex = apps.get_model('award', 'UserAwardIndex')
+    using = schema_editor.connection.alias
+
+    for role, field_name in [('participant', 'participants'), ('instructor', 'instructors')]:
+        through = getattr(Award, field_name).through
+        UserAwardIndex.objects.using(using).bulk_create(
+            [
+                UserAwardIndex(user_id=user_id, award_id=award_id, role=role, award_date=award_date)
+                for user_id, award_id, award_date in through.objects.using(using).values_list(
+                    'user_id', 'award_id', 'award__award_date'
+                )
+            ],
+            batch_size=5000,
+            ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('award', '0004_award_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAwardIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('participant', '参赛学生'), ('instructor', '指导老师')], max_length=20, verbose_name='角色')),
+                ('award_date', models.DateField(verbose_name='获奖日期')),
+                ('award', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_index', to='award.award', verbose_name='获奖记录')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='award_index', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '用户获奖索引',
+                'db_table': 'sys_user_award_index',
+                'indexes': [models.Index(fields=['user', '-award_date'], name='user_award_date_idx'), models.Index(fields=['role', 'award_date'], name='user_award_role_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userawardindex',
+            constraint=models.UniqueConstraint(fields=('user', 'award', 'role'), name='unique_user_award_role'),
+        ),
+        migrations.RunPython(populate_user_award_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_conflict_keys(apps, schema_editor):
+    Award = apps.get_model('award', 'Award')
+    AwardConflictKey = apps.get_model('award', 'AwardConflictKey')
+    using = schema_editor.connection.alias
+
+    AwardConflictKey.objects.using(using).bulk_create(
+        [
+            AwardConflictKey(
+                user_id=user_id, award_id=award_id, competition_id=competition_id,
+                event_id=event_id, award_level=award_level
+            )
+            for user_id, award_id, competition_id, event_id, award_level in
+            Award.participants.through.objects.using(using).values_list(
+                'user_id', 'award_id', 'award__competition_id', 'award__event_id', 'award__award_level'
+            )
+        ],
+        batch_size=5000,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0005_competition_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('award', '0005_user_award_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AwardConflictKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('award_level', models.CharField(max_length=50, verbose_name='获奖等级')),
+                ('award', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conflict_keys', to='award.award', verbose_name='获奖记录')),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='award_conflict_keys', to='competitions.competition', verbose_name='所属竞赛')),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='award_conflict_keys', to='competitions.competitionevent', verbose_name='所属赛事场次')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='award_conflict_keys', to=settings.AUTH_USER_MODEL, verbose_name='参赛学生')),
+            ],
+            options={
+                'verbose_name': '获奖防重索引',
+                'db_table': 'sys_award_conflict_key',
+                'indexes': [models.Index(fields=['competition', 'award_level', 'user'], name='award_conflict_comp_idx'), models.Index(fields=['event', 'award_level', 'user'], name='award_conflict_event_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='awardconflictkey',
+            constraint=models.UniqueConstraint(fields=('award', 'user'), name='unique_conflict_key_award_user'),
+        ),
+        migrations.RunPython(populate_conflict_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('award', '0006_award_conflict_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='award',
+            index=models.Index(fields=['-award_date'], name='award_date_idx'),
+        ),
+    ]
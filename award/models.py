@@ -64,6 +64,93 @@ class Award(models.Model):
         db_table = 'sys_award'
         verbose_name = "获奖信息"
         ordering = ['-award_date']
+        indexes = [
+            # 默认排序与报表的日期范围筛选
+            models.Index(fields=['-award_date'], name='award_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.competition.title} - {self.award_level}"
\ No newline at end of file
+        return f"{self.competition.title} - {self.award_level}"
+
+class UserAwardIndex(models.Model):
+    """
+    用户-获奖 反范式索引表
+    由 Award.participants / Award.instructors 的 m2m_changed 信号维护，
+    “我的获奖”与按人员统计的报表直接走 (user, award_date) 复合索引，无需 OR 两张中间表再去重
+    """
+    ROLE_CHOICES = (
+        ('participant', '参赛学生'),
+        ('instructor', '指导老师'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="award_index",
+        verbose_name="用户"
+    )
+    award = models.ForeignKey(
+        Award,
+        on_delete=models.CASCADE,
+        related_name="user_index",
+        verbose_name="获奖记录"
+    )
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, verbose_name="角色")
+    # 冗余 Award.award_date，便于按日期排序/过滤
+    award_date = models.DateField(verbose_name="获奖日期")
+
+    class Meta:
+        db_table = 'sys_user_award_index'
+        verbose_name = "用户获奖索引"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'award', 'role'], name='unique_user_award_role')
+        ]
+        indexes = [
+            models.Index(fields=['user', '-award_date'], name='user_award_date_idx'),
+            models.Index(fields=['role', 'award_date'], name='user_award_role_date_idx'),
+        ]
+
+
+class AwardConflictKey(models.Model):
+    """
+    获奖防重索引：竞赛(赛事场次) + 获奖等级 + 学生
+    由 Award.participants 的 m2m_changed 信号维护，提交获奖申请时按 (competition, award_level, user) 索引一次查询冲突
+    """
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.CASCADE,
+        related_name="award_conflict_keys",
+        verbose_name="所属竞赛"
+    )
+    event = models.ForeignKey(
+        'competitions.CompetitionEvent',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="award_conflict_keys",
+        verbose_name="所属赛事场次"
+    )
+    award_level = models.CharField(max_length=50, verbose_name="获奖等级")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="award_conflict_keys",
+        verbose_name="参赛学生"
+    )
+    award = models.ForeignKey(
+        Award,
+        on_delete=models.CASCADE,
+        related_name="conflict_keys",
+        verbose_name="获奖记录"
+    )
+
+    class Meta:
+        db_table = 'sys_award_conflict_key'
+        verbose_name = "获奖防重索引"
+        constraints = [
+            models.UniqueConstraint(fields=['award', 'user'], name='unique_conflict_key_award_user')
+        ]
+        indexes = [
+            models.Index(fields=['competition', 'award_level', 'user'], name='award_conflict_comp_idx'),
+            models.Index(fields=['event', 'award_level', 'user'], name='award_conflict_event_idx'),
+        ]
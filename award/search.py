@@ -0,0 +1,44 @@
+"""
+获奖记录全文检索（竞赛名称、赛事场次名称、获奖等级、拼音/首字母）
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from competitionManagementSys.fts import FtsIndex, pinyin_tokens
+
+award_index = FtsIndex(
+    'sys_award_fts',
+    ['competition', 'event', 'award_level', 'pinyin'],
+    weights=[10.0, 4.0, 4.0, 6.0],
+)
+
+INDEX_VALUES = ['id', 'award_level', 'competition__title', 'event__name']
+
+
+def _award_values(row):
+    return {
+        'competition': row['competition__title'],
+        'event': row['event__name'],
+        'award_level': row['award_level'],
+        'pinyin': pinyin_tokens(row['competition__title'], row['event__name'], row['award_level']),
+    }
+
+
+def index_awards(awards, using=DEFAULT_DB_ALIAS):
+    """刷新一组获奖记录的索引（一次查询取出竞赛/场次名称）"""
+    award_index.upsert_many(
+        ((row['id'], _award_values(row)) for row in awards.using(using).values(*INDEX_VALUES)),
+        using=using
+    )
+
+
+def remove_award(award_id, using=DEFAULT_DB_ALIAS):
+    award_index.delete(award_id, using=using)
+
+
+def rebuild_index(awards, using=DEFAULT_DB_ALIAS):
+    """全量重建索引，返回写入的条数"""
+    rows = (
+        (row['id'], _award_values(row))
+        for row in awards.values(*INDEX_VALUES).iterator(chunk_size=2000)
+    )
+    return award_index.rebuild(rows, using=using)
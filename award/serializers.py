@@ -2,7 +2,10 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
 from certificate.models import Certificate
-from userProfile.serializers import UserDetailSerializer
+from competitionManagementSys.flat import FlatListSerializer
+from competitionManagementSys.sparse import SparseFieldsMixin
+from userManage.fields import BatchSlugRelatedField
+from userProfile.serializers import UserDetailSerializer, build_user_details
 from .models import Award
 
 User = get_user_model()
@@ -16,7 +19,7 @@ class CertificateSerializer(serializers.ModelSerializer):
         fields = ['id', 'cert_no', 'image_uri']
 
 
-class AwardSerializer(serializers.ModelSerializer):
+class AwardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # 1. 证书关联字段 (用于写入：接受 UUID 字符串)
     certificate = serializers.PrimaryKeyRelatedField(
         queryset=Certificate.objects.all(),
@@ -30,13 +33,13 @@ class AwardSerializer(serializers.ModelSerializer):
     # 竞赛名称快捷字段
     competition_name = serializers.ReadOnlyField(source='competition.title')
 
-    # 用户关联字段（保持你之前的 SlugRelatedField 设置）
-    participants = serializers.SlugRelatedField(
+    # 用户关联字段（按 user_id 一次查询批量解析）
+    participants = BatchSlugRelatedField(
         many=True,
         queryset=User.objects.all(),
         slug_field='user_id'
     )
-    instructors = serializers.SlugRelatedField(
+    instructors = BatchSlugRelatedField(
         many=True,
         queryset=User.objects.all(),
         slug_field='user_id'
@@ -56,6 +59,59 @@ class AwardSerializer(serializers.ModelSerializer):
             'award_level', 'award_date', 'creator'
         ]
         read_only_fields = ['creator']
+        # ?expand= 可控制的嵌套详情字段
+        expandable_fields = ['certificate_details', 'participant_details', 'instructor_details']
+
+
+class AwardListSerializer(FlatListSerializer):
+    """获奖列表（GET /award/infos/）的扁平序列化器，输出与 AwardSerializer 一致"""
+    fields = AwardSerializer.Meta.fields
+
+    def build_rows(self, queryset, names):
+        rows = list(queryset.values(
+            'id', 'competition_id', 'competition__title', 'certificate_id',
+            'certificate__cert_no', 'certificate__image_uri', 'award_level', 'award_date', 'creator_id'
+        ))
+        award_ids = [row['id'] for row in rows]
+        participants = instructors = {}
+        if names & {'participants', 'participant_details'}:
+            participants = self.related_slugs(Award.participants.through, 'award_id', award_ids)
+        if names & {'instructors', 'instructor_details'}:
+            instructors = self.related_slugs(Award.instructors.through, 'award_id', award_ids)
+
+        details = {}
+        if names & {'participant_details', 'instructor_details'}:
+            user_pks = {pk for people in (participants, instructors) for pairs in people.values() for pk, _ in pairs}
+            details = build_user_details(user_pks)
+
+        storage = Certificate._meta.get_field('image_uri').storage
+        with_participant_details = 'participant_details' in names
+        with_instructor_details = 'instructor_details' in names
+        for row in rows:
+            award_id = row['id']
+            certificate_id = row['certificate_id']
+            award_participants = participants.get(award_id, ())
+            award_instructors = instructors.get(award_id, ())
+            yield {
+                'id': award_id,
+                'competition': row['competition_id'],
+                'competition_name': row['competition__title'],
+                'certificate': certificate_id,
+                'certificate_details': {
+                    'id': str(certificate_id),
+                    'cert_no': row['certificate__cert_no'],
+                    'image_uri': self.file_url(storage, row['certificate__image_uri']),
+                } if certificate_id is not None else None,
+                'participants': [slug for _, slug in award_participants],
+                'participant_details':
+                    [details[pk] for pk, _ in award_participants] if with_participant_details else None,
+                'instructors': [slug for _, slug in award_instructors],
+                'instructor_details':
+                    [details[pk] for pk, _ in award_instructors] if with_instructor_details else None,
+                'award_level': row['award_level'],
+                'award_date': row['award_date'].isoformat(),
+                'creator': row['creator_id'],
+            }
 
 
 class AwardInfoSerializer(serializers.ModelSerializer):
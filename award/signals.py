@@ -0,0 +1,116 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from competitions.models import Competition, CompetitionEvent
+from .models import Award, AwardConflictKey, UserAwardIndex
+from .search import index_awards, remove_award
+from .utils import add_conflict_keys, add_index_rows
+
+
+@receiver(post_save, sender=Award)
+def sync_award_search_index(sender, instance, using, raw=False, **kwargs):
+    """获奖记录新增/修改后刷新检索索引"""
+    if raw:
+        return
+    index_awards(Award.objects.filter(pk=instance.pk), using=using)
+
+
+@receiver(post_delete, sender=Award)
+def remove_award_search_index(sender, instance, using, **kwargs):
+    remove_award(instance.pk, using=using)
+
+
+# 冗余在获奖索引中的字段；只更新其他字段（如赛事状态）时无需刷新索引
+COMPETITION_INDEXED_FIELDS = {'title'}
+EVENT_INDEXED_FIELDS = {'name', 'competition', 'competition_id'}
+
+
+def _indexed_fields_unchanged(update_fields, indexed_fields):
+    return update_fields is not None and not (set(update_fields) & indexed_fields)
+
+
+@receiver(post_save, sender=Competition)
+def sync_competition_awards_search_index(sender, instance, using, raw=False, created=False,
+                                         update_fields=None, **kwargs):
+    """竞赛名称冗余在获奖索引中，竞赛修改后刷新其下的获奖记录"""
+    if raw or created or _indexed_fields_unchanged(update_fields, COMPETITION_INDEXED_FIELDS):
+        return
+    index_awards(Award.objects.filter(competition_id=instance.pk), using=using)
+
+
+@receiver(post_save, sender=CompetitionEvent)
+def sync_event_awards_search_index(sender, instance, using, raw=False, created=False,
+                                   update_fields=None, **kwargs):
+    if raw or created or _indexed_fields_unchanged(update_fields, EVENT_INDEXED_FIELDS):
+        return
+    index_awards(Award.objects.filter(event_id=instance.pk), using=using)
+
+
+def _sync_user_award_index(role, instance, action, reverse, pk_set, using):
+    """
+    同步 UserAwardIndex
+    正向：award.participants.add(user)，instance 为 Award，pk_set 为用户 id
+    反向：user.student_awards.add(award)，instance 为 User，pk_set 为获奖记录 id
+    """
+    rows = UserAwardIndex.objects.using(using).filter(role=role)
+    owner = {'user_id': instance.pk} if reverse else {'award_id': instance.pk}
+
+    if action == 'post_add' and pk_set:
+        if reverse:
+            pairs = [(instance.pk, award_id) for award_id in pk_set]
+        else:
+            pairs = [(user_id, instance.pk) for user_id in pk_set]
+        add_index_rows(role, pairs, using=using)
+    elif action == 'post_remove' and pk_set:
+        key = 'award_id__in' if reverse else 'user_id__in'
+        rows.filter(**owner, **{key: pk_set}).delete()
+    elif action == 'post_clear':
+        rows.filter(**owner).delete()
+
+
+def _sync_conflict_keys(instance, action, reverse, pk_set, using):
+    """同步获奖防重索引（仅参赛学生），参数含义同 _sync_user_award_index"""
+    rows = AwardConflictKey.objects.using(using)
+    owner = {'user_id': instance.pk} if reverse else {'award_id': instance.pk}
+
+    if action == 'post_add' and pk_set:
+        if reverse:
+            pairs = [(instance.pk, award_id) for award_id in pk_set]
+        else:
+            pairs = [(user_id, instance.pk) for user_id in pk_set]
+        add_conflict_keys(pairs, using=using)
+    elif action == 'post_remove' and pk_set:
+        key = 'award_id__in' if reverse else 'user_id__in'
+        rows.filter(**owner, **{key: pk_set}).delete()
+    elif action == 'post_clear':
+        rows.filter(**owner).delete()
+
+
+@receiver(m2m_changed, sender=Award.participants.through)
+def sync_participant_index(sender, instance, action, reverse, pk_set, using, **kwargs):
+    _sync_user_award_index('participant', instance, action, reverse, pk_set, using)
+    _sync_conflict_keys(instance, action, reverse, pk_set, using)
+
+
+@receiver(m2m_changed, sender=Award.instructors.through)
+def sync_instructor_index(sender, instance, action, reverse, pk_set, using, **kwargs):
+    _sync_user_award_index('instructor', instance, action, reverse, pk_set, using)
+
+
+@receiver(post_save, sender=Award)
+def sync_user_award_index_date(sender, instance, using, raw=False, created=False, **kwargs):
+    """索引中冗余了获奖日期/竞赛/场次/等级，获奖记录修改后同步"""
+    if raw or created:
+        return
+    UserAwardIndex.objects.using(using).filter(award=instance).exclude(
+        award_date=instance.award_date
+    ).update(award_date=instance.award_date)
+    AwardConflictKey.objects.using(using).filter(award=instance).exclude(
+        competition_id=instance.competition_id,
+        event_id=instance.event_id,
+        award_level=instance.award_level
+    ).update(
+        competition_id=instance.competition_id,
+        event_id=instance.event_id,
+        award_level=instance.award_level
+    )
@@ -1,3 +1,401 @@
+import datetime
+import importlib
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from certificate.models import Certificate
+from competitionManagementSys.factories import create_admin, create_competition, create_event, create_user
+from .models import Award, AwardConflictKey, UserAwardIndex
+from .search import award_index, index_awards
+from .utils import rebuild_conflict_keys, rebuild_user_award_index
+from .views import AwardViewSet
+
+
+class AwardListTestCase(TestCase):
+    """
+    获奖列表的公共数据：一条带证书、参与者与指导老师的获奖，另有 4 条获奖日期相同的获奖
+    学生 student2 没有档案
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.students = [
+            create_user(f'2000000000{i}', f'student{i}', groups=('Student',), real_name=f'student{i}', title='讲师')
+            for i in range(2)
+        ] + [create_user('20000000002', 'student2', groups=('Student',))]
+        cls.teacher = create_user('30000000000', 'teacher', groups=('Teacher',), real_name='teacher', title='讲师')
+
+        competition = create_competition()
+        today = timezone.now().date()
+        cls.award = Award.objects.create(
+            competition=competition, event=create_event(competition),
+            certificate=Certificate.objects.create(cert_no='C-001', image_uri='certificates/c-001.png'),
+            award_level='一等奖', award_date=today, creator=cls.admin,
+        )
+        cls.award.participants.add(*cls.students)
+        cls.award.instructors.add(cls.teacher)
+        for i in range(4):
+            award = Award.objects.create(competition=competition, award_level=f'{i}等奖', award_date=today)
+            award.participants.add(*cls.students[:i % 3 + 1])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def find(self, items, pk):
+        return next(item for item in items if item['id'] == pk)
+
+
+class SparseFieldsetTests(AwardListTestCase):
+    """?fields= / ?expand= 裁剪输出字段，并相应减少 select_related / prefetch_related 查询"""
+
+    def test_default_unchanged(self):
+        # 获奖 + 参与者/指导老师中间表 + 用户、角色组、档案
+        data = self.get('/award/infos/', 6)
+        self.assertEqual(set(data[0]), {
+            'id', 'competition', 'competition_name', 'certificate', 'certificate_details', 'participants',
+            'participant_details', 'instructors', 'instructor_details', 'award_level', 'award_date', 'creator',
+        })
+
+    def test_fields(self):
+        data = self.get('/award/infos/?fields=id,award_level,competition_name', 1)
+        self.assertEqual(self.find(data, self.award.pk), {
+            'id': self.award.pk, 'award_level': '一等奖', 'competition_name': '蓝桥杯',
+        })
+
+        data = self.get('/award/infos/?fields=id,participants', 2)
+        self.assertEqual(self.find(data, self.award.pk)['participants'], ['20000000000', '20000000001', '20000000002'])
+
+    def test_expand(self):
+        # 不展开任何详情：不再预取档案与角色组
+        data = self.get('/award/infos/?expand=', 3)
+        self.assertNotIn('participant_details', data[0])
+        self.assertIn('participants', data[0])
+
+        data = self.get('/award/infos/?expand=participant_details', 6)
+        self.assertIn('participant_details', data[0])
+        self.assertNotIn('instructor_details', data[0])
+
+    def test_invalid_fields(self):
+        response = self.client.get('/award/infos/?fields=id,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'])
+
+    def test_write_ignores_sparse_fields(self):
+        response = self.client.patch(
+            f'/award/infos/{self.award.pk}/?fields=id', {'award_level': '二等奖'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('participant_details', response.json())
+
+
+class FlatListSerializerTests(AwardListTestCase):
+    """列表接口的扁平序列化器输出与 AwardSerializer 一致"""
+
+    def test_same_as_detail(self):
+        items = self.client.get('/award/infos/').json()
+        self.assertEqual(len(items), 5)
+        for item in items:
+            self.assertEqual(item, self.client.get(f'/award/infos/{item["id"]}/').json())
+
+        award = self.find(items, self.award.pk)
+        self.assertTrue(award['certificate_details']['image_uri'].startswith('http://testserver/'))
+        # 学生不输出职称，无档案的用户 profile 为 None
+        details = award['participant_details']
+        self.assertNotIn('title', details[0]['profile'])
+        self.assertEqual(details[0]['profile']['role_name'], 'Student')
+        self.assertIsNone(details[2]['profile'])
+        self.assertEqual(award['instructor_details'][0]['profile']['title'], '讲师')
+
+    def test_build_rows_required(self):
+        from competitionManagementSys.flat import FlatListSerializer
+
+        class Incomplete(FlatListSerializer):
+            fields = ('id',)
+
+        with self.assertRaises(TypeError):
+            Incomplete(Award.objects.all())
+
+
+class StreamingListTests(AwardListTestCase):
+    """?stream=1 / NDJSON 流式输出与普通列表内容一致"""
+
+    def setUp(self):
+        super().setUp()
+        # 小块大小，覆盖多块且块内获奖日期相同的情况
+        patcher = mock.patch.object(AwardViewSet, 'stream_chunk_size', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_json_array(self):
+        for path in ('/award/infos/', '/award/infos/?fields=award_level,participants'):
+            expected = self.client.get(path).json()
+            separator = '&' if '?' in path else '?'
+            response = self.client.get(f'{path}{separator}stream=1')
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(json.loads(self.read(response)), expected)
+
+    def test_ndjson(self):
+        expected = self.client.get('/award/infos/').json()
+        response = self.client.get('/award/infos/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self.read(response).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_empty_and_invalid(self):
+        response = self.client.get('/award/infos/?stream=1&user_id=me')
+        self.assertEqual(self.read(response), b'[]')
+        # 参数错误在开始输出前返回
+        response = self.client.get('/award/infos/?stream=1&fields=password')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.streaming)
+
+
+class AwardSearchTests(TestCase):
+    """?search= 走全文索引：中文子串、拼音/首字母、按相关度排序，索引随获奖/竞赛/场次变更同步"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        lanqiao = create_competition('第十五届蓝桥杯')
+        modeling = create_competition('数学建模竞赛', category='数学')
+        today = timezone.now().date()
+        cls.lanqiao_award = Award.objects.create(
+            competition=lanqiao, event=create_event(lanqiao, '省赛'), award_level='一等奖', award_date=today
+        )
+        cls.modeling_award = Award.objects.create(
+            competition=modeling, event=create_event(modeling, '蓝桥杯同期赛'), award_level='二等奖', award_date=today
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, q, **params):
+        response = self.client.get('/award/infos/', {'search': q, 'fields': 'id', **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [item['id'] for item in response.json()]
+
+    def test_substring_and_pinyin(self):
+        self.assertEqual(self.search('建模'), [self.modeling_award.pk])
+        self.assertEqual(self.search('一等'), [self.lanqiao_award.pk])
+        self.assertEqual(self.search('sxjm'), [self.modeling_award.pk])
+        self.assertEqual(self.search('shuxue 二等'), [self.modeling_award.pk])
+        self.assertEqual(self.search('不存在'), [])
+
+    def test_ranking(self):
+        # 竞赛名称的权重高于场次名称
+        expected = [self.lanqiao_award.pk, self.modeling_award.pk]
+        self.assertEqual(self.search('蓝桥'), expected)
+        self.assertEqual(self.search('lqb'), expected)
+
+        response = self.client.get('/award/infos/', {'search': '蓝桥', 'fields': 'id', 'stream': '1'})
+        self.assertEqual([item['id'] for item in json.loads(b''.join(response.streaming_content))], expected)
+
+    def test_not_capped(self):
+        competition = self.lanqiao_award.competition
+        today = timezone.now().date()
+        Award.objects.bulk_create(
+            Award(competition=competition, award_level='三等奖', award_date=today) for _ in range(250)
+        )
+        index_awards(Award.objects.filter(award_level='三等奖'))
+        self.assertEqual(len(self.search('三等奖')), 250)
+
+    def test_reindex_in_batches(self):
+        competition = self.lanqiao_award.competition
+        today = timezone.now().date()
+        Award.objects.bulk_create(
+            Award(competition=competition, award_level='三等奖', award_date=today) for _ in range(5)
+        )
+        awards = Award.objects.filter(competition=competition).order_by('id')
+        rows = [(row['id'], {'competition': '国赛', 'award_level': row['award_level']})
+                for row in awards.values('id', 'award_level')]
+
+        # 每批一条 DELETE 与一条批量 INSERT，重复写入同一主键只保留最新一行
+        with CaptureQueriesContext(connection) as ctx:
+            award_index.upsert_many(rows, batch_size=4)
+        self.assertEqual(len(ctx.captured_queries), 4)
+        self.assertEqual(self.search('国赛'), list(awards.values_list('id', flat=True)))
+        self.assertEqual(self.search('蓝桥'), [self.modeling_award.pk])
+
+        index_awards(awards)
+        self.assertEqual(len(self.search('蓝桥')), 7)
+
+        with self.assertNumQueries(0):
+            award_index.upsert_many([])
+
+    def test_index_follows_changes(self):
+        competition = self.modeling_award.competition
+        competition.title = '统计建模大赛'
+        competition.save()
+        self.assertEqual(self.search('数学'), [])
+        self.assertEqual(self.search('tongji'), [self.modeling_award.pk])
+
+        event = self.lanqiao_award.event
+        event.name = '国赛'
+        event.save(update_fields=['name'])
+        self.assertEqual(self.search('国赛'), [self.lanqiao_award.pk])
+
+        self.lanqiao_award.award_level = '特等奖'
+        self.lanqiao_award.save()
+        self.assertEqual(self.search('特等'), [self.lanqiao_award.pk])
+
+        self.lanqiao_award.delete()
+        self.assertEqual(self.search('蓝桥'), [self.modeling_award.pk])
+
+
+class UserAwardIndexTests(TestCase):
+    """UserAwardIndex 随参与者/指导老师的增删（正反两个方向）与获奖日期同步，?user_id= 走索引"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.student, cls.other = create_user('20000000000', groups=('Student',)), create_user('20000000001')
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        competition = create_competition()
+        cls.awards = [
+            Award.objects.create(
+                competition=competition, award_level='一等奖', award_date=datetime.date(2024, month, 1)
+            )
+            for month in (3, 6, 9)
+        ]
+
+    def rows(self):
+        return set(UserAwardIndex.objects.values_list('user_id', 'award_id', 'role', 'award_date'))
+
+    def assertMatchesRebuild(self):
+        rows = self.rows()
+        self.assertEqual(rebuild_user_award_index(), len(rows))
+        self.assertEqual(self.rows(), rows)
+
+    def test_m2m_changes(self):
+        first, second, third = self.awards
+        first.participants.add(self.student, self.other)
+        first.instructors.add(self.teacher)
+        self.student.student_awards.add(second)
+        self.teacher.teacher_awards.add(third)
+        self.assertEqual(self.rows(), {
+            (self.student.pk, first.pk, 'participant', first.award_date),
+            (self.other.pk, first.pk, 'participant', first.award_date),
+            (self.teacher.pk, first.pk, 'instructor', first.award_date),
+            (self.student.pk, second.pk, 'participant', second.award_date),
+            (self.teacher.pk, third.pk, 'instructor', third.award_date),
+        })
+        self.assertMatchesRebuild()
+
+        first.participants.remove(self.other)
+        self.teacher.teacher_awards.clear()
+        self.student.student_awards.remove(second)
+        self.assertEqual(self.rows(), {(self.student.pk, first.pk, 'participant', first.award_date)})
+
+        first.participants.clear()
+        self.assertEqual(self.rows(), set())
+
+    def test_award_date_and_delete(self):
+        award = self.awards[0]
+        award.participants.add(self.student)
+        award.award_date = datetime.date(2025, 1, 1)
+        award.save()
+        self.assertEqual(list(UserAwardIndex.objects.values_list('award_date', flat=True)), [award.award_date])
+        award.delete()
+        self.assertFalse(UserAwardIndex.objects.exists())
+
+    def test_migration_backfill(self):
+        self.awards[0].participants.add(self.student)
+        self.awards[1].instructors.add(self.teacher)
+        expected = self.rows()
+        UserAwardIndex.objects.all().delete()
+
+        migration = importlib.import_module('award.migrations.0005_user_award_index')
+        migration.populate_user_award_index(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.rows(), expected)
+
+    def test_user_id_filter(self):
+        first, second, third = self.awards
+        first.participants.add(self.student)
+        second.participants.add(self.student, self.other)
+        third.instructors.add(self.student)
+
+        client = APIClient()
+        client.force_authenticate(self.student)
+        ids = [item['id'] for item in client.get('/award/infos/?user_id=me&fields=id').json()]
+        # 参赛与指导的获奖都计入，按获奖日期倒序且不重复
+        self.assertEqual(ids, [third.pk, second.pk, first.pk])
+        ids = [item['id'] for item in client.get('/award/infos/?user_id=20000000001&fields=id').json()]
+        self.assertEqual(ids, [second.pk])
+
+
+class AwardConflictKeyTests(TestCase):
+    """获奖防重索引只记录参赛学生，随参与者增删与获奖的竞赛/场次/等级修改同步"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student, cls.other = create_user('20000000000'), create_user('20000000001')
+        cls.teacher = create_user('30000000000')
+        cls.competition = create_competition()
+        cls.event = create_event(cls.competition)
+        cls.award = Award.objects.create(
+            competition=cls.competition, event=cls.event, award_level='一等奖', award_date=datetime.date(2024, 6, 1)
+        )
+
+    def keys(self):
+        return set(AwardConflictKey.objects.values_list('user_id', 'competition_id', 'event_id', 'award_level'))
+
+    def test_m2m_changes(self):
+        self.award.participants.add(self.student)
+        self.other.student_awards.add(self.award)
+        self.award.instructors.add(self.teacher)
+        self.assertEqual(self.keys(), {
+            (self.student.pk, self.competition.pk, self.event.pk, '一等奖'),
+            (self.other.pk, self.competition.pk, self.event.pk, '一等奖'),
+        })
+        rows = self.keys()
+        self.assertEqual(rebuild_conflict_keys(), 2)
+        self.assertEqual(self.keys(), rows)
+
+        self.other.student_awards.remove(self.award)
+        self.assertEqual({key[0] for key in self.keys()}, {self.student.pk})
+        self.award.participants.clear()
+        self.assertEqual(self.keys(), set())
+
+    def test_award_changes(self):
+        self.award.participants.add(self.student)
+        other_competition = create_competition('数学建模')
+        self.award.competition = other_competition
+        self.award.event = None
+        self.award.award_level = '二等奖'
+        self.award.save()
+        self.assertEqual(self.keys(), {(self.student.pk, other_competition.pk, None, '二等奖')})
+
+        self.award.delete()
+        self.assertEqual(self.keys(), set())
+
+    def test_migration_backfill(self):
+        self.award.participants.add(self.student, self.other)
+        self.award.instructors.add(self.teacher)
+        expected = self.keys()
+        AwardConflictKey.objects.all().delete()
 
-# Create your tests here.
+        migration = importlib.import_module('award.migrations.0006_award_conflict_key')
+        migration.populate_conflict_keys(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self.keys(), expected)
@@ -0,0 +1,110 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Award, AwardConflictKey, UserAwardIndex
+
+# Award 上的多对多字段 -> UserAwardIndex.role
+ROLE_FIELDS = {
+    'participant': 'participants',
+    'instructor': 'instructors',
+}
+
+
+def add_index_rows(role, pairs, using=DEFAULT_DB_ALIAS):
+    """
+    写入索引行，pairs 为 (user_id, award_id) 列表
+    award_date 一次性从 Award 表取出
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    award_dates = dict(
+        Award.objects.using(using)
+        .filter(pk__in={award_id for _, award_id in pairs})
+        .values_list('id', 'award_date')
+    )
+    UserAwardIndex.objects.using(using).bulk_create(
+        [
+            UserAwardIndex(user_id=user_id, award_id=award_id, role=role, award_date=award_dates[award_id])
+            for user_id, award_id in pairs if award_id in award_dates
+        ],
+        ignore_conflicts=True
+    )
+
+
+def add_conflict_keys(pairs, using=DEFAULT_DB_ALIAS):
+    """
+    写入获奖防重索引，pairs 为 (user_id, award_id) 列表（仅参赛学生）
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    awards = {
+        row['id']: row
+        for row in Award.objects.using(using)
+        .filter(pk__in={award_id for _, award_id in pairs})
+        .values('id', 'competition_id', 'event_id', 'award_level')
+    }
+    AwardConflictKey.objects.using(using).bulk_create(
+        [
+            AwardConflictKey(
+                user_id=user_id,
+                award_id=award_id,
+                competition_id=awards[award_id]['competition_id'],
+                event_id=awards[award_id]['event_id'],
+                award_level=awards[award_id]['award_level'],
+            )
+            for user_id, award_id in pairs if award_id in awards
+        ],
+        ignore_conflicts=True
+    )
+
+
+def rebuild_conflict_keys(using=DEFAULT_DB_ALIAS, batch_size=5000):
+    """根据 participants 中间表全量重建获奖防重索引，返回写入的条数"""
+    AwardConflictKey.objects.using(using).all().delete()
+
+    total = 0
+    rows = (
+        Award.participants.through.objects.using(using)
+        .values_list('user_id', 'award_id', 'award__competition_id', 'award__event_id', 'award__award_level')
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for user_id, award_id, competition_id, event_id, award_level in rows:
+        batch.append(AwardConflictKey(
+            user_id=user_id, award_id=award_id, competition_id=competition_id,
+            event_id=event_id, award_level=award_level
+        ))
+        if len(batch) >= batch_size:
+            AwardConflictKey.objects.using(using).bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+            batch = []
+    if batch:
+        AwardConflictKey.objects.using(using).bulk_create(batch, ignore_conflicts=True)
+        total += len(batch)
+    return total
+
+
+def rebuild_user_award_index(using=DEFAULT_DB_ALIAS, batch_size=5000):
+    """根据 participants/instructors 中间表全量重建索引，返回写入的条数"""
+    UserAwardIndex.objects.using(using).all().delete()
+
+    total = 0
+    for role, field_name in ROLE_FIELDS.items():
+        through = getattr(Award, field_name).through
+        rows = (
+            through.objects.using(using)
+            .values_list('user_id', 'award_id', 'award__award_date')
+            .iterator(chunk_size=batch_size)
+        )
+        batch = []
+        for user_id, award_id, award_date in rows:
+            batch.append(UserAwardIndex(user_id=user_id, award_id=award_id, role=role, award_date=award_date))
+            if len(batch) >= batch_size:
+                UserAwardIndex.objects.using(using).bulk_create(batch, ignore_conflicts=True)
+                total += len(batch)
+                batch = []
+        if batch:
+            UserAwardIndex.objects.using(using).bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+    return total
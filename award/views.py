@@ -7,8 +7,13 @@ from datetime import datetime
 from django.db.models import Prefetch
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Award
-from .serializers import AwardSerializer
+from competitionManagementSys.fts import FtsSearchFilter
+from competitionManagementSys.flat import FlatListViewMixin
+from competitionManagementSys.sparse import SparseFieldsViewMixin
+from competitionManagementSys.streaming import StreamingListMixin
+from .models import Award, UserAwardIndex
+from .search import award_index
+from .serializers import AwardSerializer, AwardListSerializer
 from .serializers import AwardReportSerializer
 from userManage.permissions import IsCompAdminOrReadOnly,IsCompAdmin
 from django.db.models import Count,Q,F
@@ -16,41 +21,50 @@ from django.db.models.functions import ExtractYear
 
 User = get_user_model()
 
-class AwardViewSet(viewsets.ModelViewSet):
+class AwardViewSet(StreamingListMixin, FlatListViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     # 1. select_related 针对 ForeignKey 和 OneToOne
     # 2. prefetch_related 针对 ManyToMany，并使用 Prefetch 对象深入关联 profile
     queryset = Award.objects.all()
     serializer_class = AwardSerializer
+    # 列表使用扁平序列化器（输出一致），详情与写接口仍用 AwardSerializer
+    flat_serializer_class = AwardListSerializer
     permission_classes = [IsCompAdminOrReadOnly]
+    replica_actions = ('list',)
+
+    # ?search= 按竞赛名称/场次/获奖等级检索，支持拼音/首字母
+    filter_backends = [FtsSearchFilter]
+    search_index = award_index
+    search_fields = ['competition__title', 'event__name', 'award_level']
+
+    # 输出字段 -> (select_related, prefetch_related)；?fields= / ?expand= 未用到的关联不再查询
+    sparse_relations = {
+        'competition_name': (['competition'], []),
+        'certificate_details': (['certificate'], []),
+        'participants': ([], ['participants']),
+        # 档案与角色组供 UserDetailSerializer / ProfileSerializer.get_role_name 使用
+        'participant_details': ([], ['participants__profile', 'participants__groups']),
+        'instructors': ([], ['instructors']),
+        'instructor_details': ([], ['instructors__profile', 'instructors__groups']),
+    }
 
     def get_queryset(self):
-        # 深度优化：一次性取出所有必要数据
-        queryset = self.queryset.select_related(
-            'competition',
-            'certificate',
-            'creator__profile'
-        ).prefetch_related(
-            'participants__profile',  # 预加载参与者的档案
-            'participants__groups',  # 预加载组信息以便 ProfileSerializer 里的 get_role_name 使用
-            'instructors__profile',  # 预加载老师的档案
-            'instructors__groups'
-        )
+        # 深度优化：一次性取出输出字段需要的全部关联数据
+        queryset = self.apply_sparse_relations(self.queryset)
 
         user_query_id = self.request.query_params.get('user_id')
 
         if user_query_id == 'me':
             if self.request.user.is_authenticated:
-                user_query_id = self.request.user.user_id
+                index_rows = UserAwardIndex.objects.filter(user=self.request.user)
             else:
                 return Award.objects.none()
+        elif user_query_id:
+            index_rows = UserAwardIndex.objects.filter(user__user_id=user_query_id)
+        else:
+            return queryset
 
-        if user_query_id:
-            queryset = queryset.filter(
-                Q(participants__user_id=user_query_id) |
-                Q(instructors__user_id=user_query_id)
-            ).distinct()
-
-        return queryset
+        # 走 UserAwardIndex 的 (user, award_date) 索引，IN 子查询天然去重，无需 distinct
+        return queryset.filter(id__in=index_rows.values('award_id'))
 
     def perform_create(self, serializer):
         # 自动关联当前登录用户为录入人
@@ -72,6 +86,7 @@ class AwardReportView(APIView):
     GET /award/report/?group_by=student&start_date=2025-01-01&format=excel
     """
     permission_classes = [IsCompAdmin]
+    replica_actions = ('get',)
 
     def get(self, request):
         group_by = request.query_params.get('group_by', 'student')
@@ -89,28 +104,36 @@ class AwardReportView(APIView):
 
         report_data = []
 
+        # 通过 UserAwardIndex 找出日期范围内有获奖记录的人员，避免关联中间表后再 distinct
+        index_rows = UserAwardIndex.objects.all()
+        if start_date:
+            index_rows = index_rows.filter(award_date__gte=start_date)
+        if end_date:
+            index_rows = index_rows.filter(award_date__lte=end_date)
+
         if group_by == 'student':
             # 使用 Prefetch 对象，将过滤后的奖项存入 'filtered_awards' 属性中
             users = User.objects.filter(
-                student_awards__in=award_queryset
-            ).distinct().prefetch_related(
+                id__in=index_rows.filter(role='participant').values('user_id')
+            ).prefetch_related(
                 'profile',
                 Prefetch('student_awards', queryset=award_queryset, to_attr='filtered_awards')
             )
 
-            for user in users:
+            # 分批读取（PostgreSQL 上为服务端游标），每批单独执行 prefetch
+            for user in users.iterator(chunk_size=2000):
                 # 注意这里使用 to_attr 指定的 'filtered_awards'
                 report_data.append(self._format_user_data(user, user.filtered_awards))
 
         elif group_by == 'teacher':
             users = User.objects.filter(
-                teacher_awards__in=award_queryset
-            ).distinct().prefetch_related(
+                id__in=index_rows.filter(role='instructor').values('user_id')
+            ).prefetch_related(
                 'profile',
                 Prefetch('teacher_awards', queryset=award_queryset, to_attr='filtered_awards')
             )
 
-            for user in users:
+            for user in users.iterator(chunk_size=2000):
                 report_data.append(self._format_user_data(user, user.filtered_awards))
 
         serializer = AwardReportSerializer(report_data, many=True)
@@ -183,6 +206,7 @@ class AwardStatisticsView(APIView):
     获奖信息多维度统计API
     """
     permission_classes = [IsCompAdmin]
+    replica_actions = ('get',)
 
     def get(self, request):
         # 1. 基础总数统计
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CompetitionManagementSysConfig(AppConfig):
+    name = 'competitionManagementSys'
+
+    def ready(self):
+        # 注册数据库连接建立时的初始化钩子
+        from . import db  # noqa: F401
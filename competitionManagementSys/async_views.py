@@ -0,0 +1,93 @@
+"""
+异步只读接口的基类
+
+高频只读接口（未读数、消息列表、级别/类别列表、参与情况）在 ASGI 下以原生异步视图运行，不经过 DRF 的同步请求链：
+- JWT 认证只校验签名，用户通过异步 ORM（aget）读取
+- 查询使用 acount / aget / async for；Django 4.2 的异步 ORM 仍在 sync_to_async 线程中执行 SQL，
+  省下的是视图、认证与序列化在线程池间的切换，连接数也不再受线程池大小限制
+- 在 WSGI 下同样可用，Django 会用 async_to_sync 包装
+错误响应与 DRF 保持一致：未认证 401（带 WWW-Authenticate），参数错误 400，格式均为 {"detail": ...}
+"""
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, HttpResponseBase, JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .renderers import dumps
+
+
+class AsyncAuthError(Exception):
+    def __init__(self, detail):
+        self.detail = detail
+
+
+async def aauthenticate(request):
+    """
+    异步版 JWTAuthentication.authenticate：无凭证返回 None，凭证无效抛出 AsyncAuthError
+    与 simplejwt 相同，按 USER_ID_FIELD 查询用户并拒绝已停用的账号
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError) as exc:
+        raise AsyncAuthError(getattr(exc, 'detail', str(exc)))
+
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        raise AsyncAuthError(InvalidToken('Token contained no recognizable user identification').detail)
+    try:
+        user = await get_user_model().objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except get_user_model().DoesNotExist:
+        raise AsyncAuthError(exceptions.AuthenticationFailed('User not found', code='user_not_found').detail)
+    if not user.is_active:
+        raise AsyncAuthError(exceptions.AuthenticationFailed('User is inactive', code='user_inactive').detail)
+    return user
+
+
+class AsyncReadView(View):
+    """
+    异步只读接口基类：子类实现 async def get(self, request)，返回可 JSON 序列化的数据或 HttpResponse
+    只允许 GET/HEAD（HEAD 由 View.setup 指向 get）；默认要求登录，与 DRF 的 IsAuthenticated 相同
+    """
+    http_method_names = ['get', 'head', 'options']
+    # 与 ReplicaRoutingMiddleware 配合：Django 类视图按 HTTP 方法声明
+    replica_actions = ('get',)
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        try:
+            user = await aauthenticate(request)
+        except AsyncAuthError as exc:
+            return self.unauthorized(exc.detail)
+        if user is None:
+            return self.unauthorized(exceptions.NotAuthenticated().detail)
+        request.user = user
+
+        data = await handler(request, *args, **kwargs)
+        if isinstance(data, HttpResponseBase):
+            return data
+        # 与 DRF 接口使用同一个编码函数（orjson 可用时使用 orjson），输出格式一致
+        return HttpResponse(dumps(data), content_type='application/json')
+
+    @staticmethod
+    def error(detail, status=400):
+        return JsonResponse({'detail': detail}, status=status, json_dumps_params={'ensure_ascii': False})
+
+    @staticmethod
+    def unauthorized(detail):
+        body = detail if isinstance(detail, dict) else {'detail': detail}
+        response = JsonResponse(body, status=401, json_dumps_params={'ensure_ascii': False})
+        response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(None)
+        return response
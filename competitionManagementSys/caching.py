@@ -0,0 +1,16 @@
+"""
+缓存后端检查
+
+读己之写标记（routers）与压缩结果缓存（compression）依赖在所有 worker 进程之间共享的缓存：
+LocMemCache 每个进程各存一份，DummyCache 不保存任何内容，这两种后端下上述功能自动关闭。
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias='default'):
+    """缓存别名对应的后端能否在进程之间共享数据"""
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
@@ -0,0 +1,123 @@
+"""
+JSON 响应压缩
+
+- 按 Accept-Encoding 协商 br（安装了 brotli 时优先）或 gzip，q=0 的编码不使用
+- 只压缩 COMPRESSION_MIN_SIZE 字节以上的 JSON 响应；流式响应（文件下载、导出）与已带 Content-Encoding 的响应不处理
+- 预压缩缓存：COMPRESSION_CACHE_MIN_SIZE 字节以上的响应体按内容摘要缓存压缩结果，
+  报表、获奖列表等内容未变化的大响应只压缩一次；缓存使用 Django 缓存（COMPRESSION_CACHE 别名），
+  该别名为进程内缓存（LocMem/Dummy）时不缓存，每次直接压缩
+接口使用 Authorization 请求头认证而非 Cookie，JSON 响应压缩不存在 BREACH 所需的跨站请求条件
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from . import caching
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只使用 gzip
+    brotli = None
+
+JSON_CONTENT_TYPES = ('application/json', 'application/problem+json')
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def available_encodings():
+    """服务端按优先级支持的编码"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding -> {编码: q}，* 表示其余编码"""
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """返回客户端接受且 q 值最高的编码，q 相同时按服务端优先级；都不接受时返回 None"""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=get_setting('COMPRESSION_BROTLI_QUALITY', 5))
+    # mtime=0 使相同内容的压缩结果一致
+    return gzip.compress(content, compresslevel=get_setting('COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+
+def compress_cached(content, encoding):
+    """大响应按内容摘要缓存压缩结果，相同内容的重复请求不再压缩"""
+    alias = get_setting('COMPRESSION_CACHE', 'default')
+    if len(content) < get_setting('COMPRESSION_CACHE_MIN_SIZE', 64 * 1024) or not caching.is_shared(alias):
+        return compress(content, encoding)
+
+    cache = caches[alias]
+    key = f'compressed:{encoding}:{hashlib.blake2b(content, digest_size=20).hexdigest()}'
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(content, encoding)
+        cache.set(key, compressed, get_setting('COMPRESSION_CACHE_TIMEOUT', 300))
+    return compressed
+
+
+def is_compressible(response):
+    if response.streaming or response.has_header('Content-Encoding') or response.status_code != 200:
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type not in JSON_CONTENT_TYPES:
+        return False
+    return len(response.content) >= get_setting('COMPRESSION_MIN_SIZE', 1024)
+
+
+def compress_response(request, response):
+    """按请求协商压缩响应体；不满足条件时原样返回"""
+    if not is_compressible(response):
+        return response
+    # 是否压缩取决于 Accept-Encoding，即使本次未压缩也需要告诉缓存代理
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+
+    compressed = compress_cached(response.content, encoding)
+    if len(compressed) >= len(response.content):
+        return response
+
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+    # 压缩后字节不同，强 ETag 改为弱 ETag（与 Django GZipMiddleware 相同）
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
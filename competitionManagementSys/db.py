@@ -0,0 +1,40 @@
+"""
+数据库连接初始化
+
+SQLite 连接建立时执行 settings.SQLITE_PRAGMAS 中的 PRAGMA（WAL、synchronous、mmap、busy_timeout、cache_size）
+每个连接建立时挂上 metrics.sql_timer，异步视图经 sync_to_async 在其他线程执行的查询同样计入当前请求
+PostgreSQL 的持久连接、健康检查与服务端游标由 settings.DATABASES 配置，这里无需处理
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import sql_timer
+
+
+def sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """每个新的 SQLite 连接都设置一次；journal_mode=WAL 会持久化到文件，内存数据库上为 memory"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return
+    # 直接使用底层 sqlite3 连接执行，不经过 execute_wrapper，不计入请求的 SQL 统计
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+@receiver(connection_created)
+def install_sql_timer(sender, connection, **kwargs):
+    """execute_wrappers 挂在连接对象上，重连后仍保留，只需添加一次；没有当前请求时 sql_timer 直接放行"""
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
@@ -0,0 +1,61 @@
+"""
+测试数据构造函数，各 app 的 tests.py 共用
+
+只构造用例最常用的基础数据（用户、角色组、档案、竞赛、赛事），业务对象（获奖、团队、申请）仍由各用例按需创建
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.utils import timezone
+
+from competitions.models import Competition, CompetitionCategory, CompetitionEvent, CompetitionLevel
+from userProfile.models import Profile
+
+PASSWORD = 'pass123'
+
+
+def group(name):
+    return Group.objects.get_or_create(name=name)[0]
+
+
+def create_user(user_id, username=None, groups=(), superuser=False, **profile):
+    """
+    创建用户并加入 groups（角色组名称，不存在时创建）
+    传入档案字段（real_name、department 等）时同时创建档案
+    """
+    User = get_user_model()
+    create = User.objects.create_superuser if superuser else User.objects.create_user
+    user = create(user_id=user_id, username=username or user_id, password=PASSWORD)
+    if groups:
+        user.groups.add(*[group(name) for name in groups])
+    if profile:
+        profile.setdefault('department', '计算机学院')
+        Profile.objects.create(user=user, **profile)
+    return user
+
+
+def create_admin(groups=('CompetitionAdministrator',)):
+    """超级管理员，默认同时属于竞赛管理员组（团队列表等按角色组而不是 is_superuser 判断可见范围）"""
+    return create_user('10000000001', 'admin', groups=groups, superuser=True)
+
+
+def create_users(count, prefix='2000000000', username='user', groups=()):
+    """批量创建用户，user_id 为 prefix + 序号"""
+    return [create_user(f'{prefix}{i}', f'{username}{i}', groups=groups) for i in range(count)]
+
+
+def create_competition(title='蓝桥杯', category='程序设计', level='国家级', **fields):
+    fields.setdefault('year', 2024)
+    fields.setdefault('uri', 'https://example.com')
+    return Competition.objects.create(
+        title=title,
+        category=CompetitionCategory.objects.get_or_create(name=category)[0],
+        level=CompetitionLevel.objects.get_or_create(name=level)[0],
+        **fields,
+    )
+
+
+def create_event(competition=None, name='2024', **fields):
+    now = timezone.now()
+    fields.setdefault('start_time', now)
+    fields.setdefault('end_time', now)
+    return CompetitionEvent.objects.create(competition=competition or create_competition(), name=name, **fields)
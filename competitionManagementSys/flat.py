@@ -0,0 +1,106 @@
+"""
+只读列表的扁平序列化
+
+大列表（/award/infos/、/team/info/）的 CPU 时间主要花在 DRF 为每一行、每个嵌套对象实例化字段与逐字段取值上。
+扁平序列化器直接从 .values() 构造 dict，嵌套人员信息按主键批量查询后组装成普通 dict 复用：
+- 输出与对应的 ModelSerializer 字段、格式一致（只用于 GET 列表，写接口与详情仍走 ModelSerializer）
+- 支持 context['sparse_fields']（?fields= / ?expand=），未输出的嵌套字段不查询
+- 计入 RequestMetrics 的序列化耗时，Server-Timing 与 ModelSerializer 一致
+"""
+import abc
+import time
+
+from rest_framework.response import Response
+
+from .metrics import current_metrics
+
+# IN 查询每批的参数个数，避免超过数据库的参数上限
+IN_BATCH_SIZE = 2000
+
+
+def in_batches(values, size=IN_BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class FlatListSerializer(abc.ABC):
+    """
+    子类设置 fields（输出字段及顺序，应与对应 ModelSerializer 的 Meta.fields 相同）并实现 build_rows(queryset, names)
+    build_rows 返回的 dict 可以包含多余的键，输出时按 fields 与 sparse_fields 取值
+    """
+    fields = ()
+
+    def __init__(self, queryset, context=None):
+        self.queryset = queryset
+        self.context = context or {}
+
+    @property
+    def field_names(self):
+        sparse = self.context.get('sparse_fields')
+        if sparse is None:
+            return list(self.fields)
+        return [name for name in self.fields if name in sparse]
+
+    @property
+    def data(self):
+        return self.serialize()
+
+    def serialize(self, order=None):
+        """order 为主键列表时按其顺序输出（流式输出按主键分块时使用）"""
+        metrics = current_metrics.get()
+        started = time.perf_counter()
+        try:
+            names = self.field_names
+            # 与 ModelSerializer 相同，列表查询与预取的耗时计入序列化
+            queryset = self.queryset.select_related(None).prefetch_related(None)
+            rows = self.build_rows(queryset, set(names))
+            if order is not None:
+                position = {pk: index for index, pk in enumerate(order)}
+                rows = sorted(rows, key=lambda row: position[row['id']])
+            return [{name: row[name] for name in names} for row in rows]
+        finally:
+            if metrics is not None and metrics.serializer_depth == 0:
+                metrics.serializer_time += time.perf_counter() - started
+
+    @abc.abstractmethod
+    def build_rows(self, queryset, names):
+        """返回每行一个 dict 的列表；names 为本次需要输出的字段名集合，未包含的嵌套字段不必查询"""
+
+    def file_url(self, storage, name):
+        """与 DRF FileField/ImageField 的输出相同：有 request 时返回绝对地址，无文件时为 None"""
+        if not name:
+            return None
+        url = storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    @staticmethod
+    def related_slugs(through, owner_field, owner_ids, slug_field='user_id'):
+        """
+        多对多中间表按所属对象分组，返回 {所属对象 id: [(用户主键, slug), ...]}
+        按中间表 id 排序，即添加顺序
+        """
+        related = {owner_id: [] for owner_id in owner_ids}
+        for batch in in_batches(owner_ids):
+            rows = (
+                through.objects.filter(**{f'{owner_field}__in': batch})
+                .order_by('id').values_list(owner_field, 'user_id', f'user__{slug_field}')
+            )
+            for owner_id, user_pk, slug in rows:
+                related[owner_id].append((user_pk, slug))
+        return related
+
+
+class FlatListViewMixin:
+    """
+    视图混入：list 动作使用 flat_serializer_class 输出，其余动作仍用 get_serializer_class()
+    启用分页时分页结果是模型实例列表，回退到 ModelSerializer
+    """
+    flat_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.flat_serializer_class is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.flat_serializer_class(queryset, context=self.get_serializer_context()).data)
@@ -0,0 +1,215 @@
+"""
+SQLite FTS5 全文索引的公共实现
+
+各业务模块（档案、竞赛、获奖）声明自己的 FtsIndex，并通过 signals 调用 upsert/delete 保持同步。
+非 SQLite 数据库下所有写操作都是空操作，search() 返回 None，由调用方自行降级。
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import filters
+
+# CJK 字符逐字切分，使中文可以做“子串”匹配而不是整词匹配
+CJK_RE = re.compile(r'([㐀-䶿一-鿿豈-﫿])')
+CJK_RUN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+# 用户输入中对 FTS 语法有特殊含义的字符
+FTS_SPECIAL_RE = re.compile(r'["*^():+\-]')
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不生成拼音词元
+    lazy_pinyin = None
+
+# 每段中文最多生成的拼音后缀词元数，防止超长文本撑大索引
+PINYIN_MAX_SUFFIXES = 32
+
+
+def segment(text):
+    """将文本切分为 FTS 词元：中文按字拆开，其余交给 unicode61 分词器"""
+    if not text:
+        return ''
+    return ' '.join(CJK_RE.sub(r' \1 ', text).split())
+
+
+def pinyin_tokens(*texts):
+    """
+    为文本中的每段中文生成全拼与首字母词元
+    对每个后缀都生成一次，因此 "lqb"、"lanqiao" 都能前缀命中 "第十五届蓝桥杯"
+    """
+    if lazy_pinyin is None:
+        return ''
+
+    tokens = []
+    for text in texts:
+        for run in CJK_RUN_RE.findall(text or ''):
+            full = lazy_pinyin(run)
+            initials = lazy_pinyin(run, style=Style.FIRST_LETTER)
+            for i in range(min(len(run), PINYIN_MAX_SUFFIXES)):
+                tokens.append(''.join(full[i:]))
+                tokens.append(''.join(initials[i:]))
+    # 去重并保持顺序
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def build_match_query(q):
+    """
+    将用户输入转换为 FTS5 MATCH 表达式
+    每个空格分隔的词作为一个带前缀匹配的短语，多个词之间为 AND 关系
+    例如 "张 计算" -> '"张"* "计 算"*'
+    """
+    phrases = []
+    for term in q.split():
+        tokens = segment(FTS_SPECIAL_RE.sub(' ', term))
+        if tokens:
+            phrases.append(f'"{tokens}"*')
+    return ' '.join(phrases)
+
+
+class FtsIndex:
+    """
+    一张 rowid 与业务主键对应的 FTS5 虚拟表
+    columns 与 weights 一一对应，weights 用于 bm25 排序
+    """
+
+    def __init__(self, table, columns, weights=None):
+        self.table = table
+        self.columns = list(columns)
+        self.weights = list(weights) if weights else [1.0] * len(self.columns)
+
+    def _is_sqlite(self, using):
+        return connections[using].vendor == 'sqlite'
+
+    @property
+    def _insert_sql(self):
+        return (
+            f'INSERT INTO {self.table} (rowid, {", ".join(self.columns)}) '
+            f'VALUES (%s, {", ".join(["%s"] * len(self.columns))})'
+        )
+
+    def _row(self, pk, values):
+        return [pk] + [segment(values.get(column) or '') for column in self.columns]
+
+    def create(self, schema_editor):
+        """供迁移调用：创建虚拟表（仅 SQLite）"""
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+            f'{", ".join(self.columns)}, tokenize="unicode61 remove_diacritics 2")'
+        )
+
+    def drop(self, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        schema_editor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def upsert(self, pk, values, using=DEFAULT_DB_ALIAS):
+        """写入/刷新单条记录，values 为 {列名: 原始文本}"""
+        if not self._is_sqlite(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+            cursor.execute(self._insert_sql, self._row(pk, values))
+
+    def upsert_many(self, rows, using=DEFAULT_DB_ALIAS, batch_size=500):
+        """
+        批量写入/刷新，rows 为 (pk, values) 的可迭代对象
+        每 batch_size 条执行一次 DELETE ... IN 与一次 executemany，批大小不超过 SQLite 的参数个数上限
+        """
+        if not self._is_sqlite(using):
+            return
+        rows = [self._row(pk, values) for pk, values in rows]
+        with connections[using].cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    f'DELETE FROM {self.table} WHERE rowid IN ({", ".join(["%s"] * len(batch))})',
+                    [row[0] for row in batch]
+                )
+                cursor.executemany(self._insert_sql, batch)
+
+    def delete(self, pk, using=DEFAULT_DB_ALIAS):
+        if not self._is_sqlite(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def rebuild(self, rows, using=DEFAULT_DB_ALIAS, batch_size=2000):
+        """
+        全量重建索引，rows 为 (pk, values) 的可迭代对象
+        返回写入的条数
+        """
+        if not self._is_sqlite(using):
+            return 0
+
+        total = 0
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            batch = []
+            for pk, values in rows:
+                batch.append(self._row(pk, values))
+                if len(batch) >= batch_size:
+                    cursor.executemany(self._insert_sql, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(self._insert_sql, batch)
+                total += len(batch)
+        return total
+
+    def filter_queryset(self, queryset, match):
+        """
+        与全文索引表做连接过滤，不限制条数，按 bm25 相关度排序
+        索引表的 rowid 即模型主键；MATCH 条件写在 WHERE 中，由 SQLite 以索引表驱动连接
+        """
+        meta = queryset.model._meta
+        quote = connections[queryset.db].ops.quote_name
+        weights = ', '.join(str(w) for w in self.weights)
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table} MATCH %s', f'{self.table}.rowid = {quote(meta.db_table)}.{quote(meta.pk.column)}'],
+            params=[match],
+            select={'search_rank': f'bm25({self.table}, {weights})'},
+            order_by=['search_rank'],
+        )
+
+    def search(self, q, limit=20, using=DEFAULT_DB_ALIAS):
+        """
+        按 bm25 相关度返回命中的主键列表
+        非 SQLite 数据库返回 None，由调用方降级处理
+        """
+        if not self._is_sqlite(using):
+            return None
+
+        match = build_match_query(q or '')
+        if not match:
+            return []
+
+        weights = ', '.join(str(w) for w in self.weights)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {weights}) LIMIT %s',
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class FtsSearchFilter(filters.SearchFilter):
+    """
+    基于全文索引的搜索过滤器，沿用 SearchFilter 的 ?search= 参数
+    视图需声明 search_index (FtsIndex)；非 SQLite 数据库回退到 search_fields 的 icontains 查询
+    与索引表连接过滤，不限制条数（未分页的列表返回全部命中结果），按 bm25 相关度排序
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        q = ' '.join(self.get_search_terms(request))
+        search_index = getattr(view, 'search_index', None)
+        if not q or search_index is None or connections[queryset.db].vendor != 'sqlite':
+            return super().filter_queryset(request, queryset, view)
+
+        match = build_match_query(q)
+        if not match:
+            return queryset.none()
+
+        return search_index.filter_queryset(queryset, match)
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+import shutil
+import statistics
+import subprocess
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from competitions.models import CompetitionEvent
+
+# (名称, 同步 DRF 接口, 异步接口)；{events} 替换为逗号分隔的赛事 ID
+ENDPOINTS = [
+    ('unread-count', '/notification/info/unread-count/', '/notification/async/unread-count/'),
+    ('notifications', '/notification/info/', '/notification/async/list/'),
+    ('levels', '/comp/levels/', '/comp/async/levels/'),
+    ('categories', '/comp/categories/', '/comp/async/categories/'),
+    ('my-participation', '/team/info/my-participation/?events={events}',
+     '/team/async/my-participation/?events={events}'),
+]
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+
+
+def summarize(rows, duration):
+    """hey -o csv 的逐请求结果 -> 吞吐量与延迟分位数；状态码 >= 400 计为错误，不计入延迟"""
+    latencies = sorted(float(row['response-time']) for row in rows if int(row['status-code']) < 400)
+    return {
+        'requests': len(rows),
+        'errors': len(rows) - len(latencies),
+        'rps': round(len(rows) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        '用 hey（https://github.com/rakyll/hey）对比高频只读接口同步（DRF）与异步（原生 async 视图）实现的吞吐量与延迟。'
+        '先自行启动服务，例如 uvicorn competitionManagementSys.asgi:application 或 gunicorn，'
+        '两种实现可以运行在同一 ASGI 服务上，也可用 --sync-url 指向 WSGI 部署，对比完整的同步栈'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True, help='已启动的 ASGI 服务地址，如 http://127.0.0.1:8000')
+        parser.add_argument('--sync-url', help='同步接口使用的服务地址，默认与 --url 相同')
+        parser.add_argument('--user', help='发起请求的用户学号/工号，默认第一个超级管理员')
+        parser.add_argument('--concurrency', type=int, default=50, help='并发连接数')
+        parser.add_argument('--duration', type=int, default=10, help='每个接口的压测秒数')
+        parser.add_argument('--warmup', type=int, default=2, help='每个接口正式压测前的预热秒数')
+        parser.add_argument('--only', nargs='*', choices=[name for name, _, _ in ENDPOINTS], help='只压测指定接口')
+        parser.add_argument('--json', dest='json_path', help='把结果写入 JSON 文件')
+
+    def handle(self, *args, **options):
+        hey = shutil.which('hey')
+        if hey is None:
+            raise CommandError('未找到 hey，请先安装（go install github.com/rakyll/hey@latest 或系统包管理器）')
+
+        user = self.get_user(options['user'])
+        authorization = f'Authorization: Bearer {RefreshToken.for_user(user).access_token}'
+        events = ','.join(str(pk) for pk in CompetitionEvent.objects.order_by('-start_time').values_list('pk', flat=True)[:20])
+        endpoints = [item for item in ENDPOINTS if not options['only'] or item[0] in options['only']]
+        base_url = options['url'].rstrip('/')
+        sync_url = (options['sync_url'] or base_url).rstrip('/')
+
+        def run(url, duration):
+            result = subprocess.run(
+                [hey, '-z', f'{duration}s', '-c', str(options['concurrency']), '-H', authorization, '-o', 'csv', url],
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f'hey 执行失败：{result.stderr.strip()}')
+            return list(csv.DictReader(io.StringIO(result.stdout)))
+
+        self.stdout.write(
+            f'用户 {user.user_id}，并发 {options["concurrency"]}，每个接口 {options["duration"]}s'
+            f'（预热 {options["warmup"]}s）'
+        )
+        self.stdout.write(f'{"接口":<18}{"实现":<7}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"错误":>7}')
+        report = {}
+        for name, sync_path, async_path in endpoints:
+            report[name] = {}
+            for mode, url in [
+                ('sync', sync_url + sync_path.format(events=events)),
+                ('async', base_url + async_path.format(events=events)),
+            ]:
+                if options['warmup']:
+                    run(url, options['warmup'])
+                summary = report[name][mode] = summarize(run(url, options['duration']), options['duration'])
+                self.stdout.write(
+                    f'{name:<18}{mode:<7}{summary["rps"]:>10.1f}{summary["p50_ms"]:>10.2f}'
+                    f'{summary["p95_ms"]:>10.2f}{summary["p99_ms"]:>10.2f}{summary["errors"]:>7}'
+                )
+            sync_rps = report[name]['sync']['rps']
+            if sync_rps:
+                report[name]['speedup'] = round(report[name]['async']['rps'] / sync_rps, 2)
+                self.stdout.write(f'{"":<18}异步/同步吞吐量 {report[name]["speedup"]}x')
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f'结果已写入 {options["json_path"]}')
+
+    def get_user(self, user_id):
+        users = get_user_model().objects.filter(is_active=True)
+        user = users.filter(user_id=user_id).first() if user_id else users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('找不到压测用户，请先执行 seed_synthetic 或通过 --user 指定')
+        return user
@@ -0,0 +1,69 @@
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from award.serializers import AwardSerializer
+from award.views import AwardViewSet
+from competitionManagementSys import renderers
+
+
+def best_of(repeat, func):
+    """重复执行 repeat 次，返回 (最短耗时, 最后一次的结果)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = '对比标准库 JSONRenderer/JSONParser 与 orjson 版本在获奖列表（AwardSerializer）输出上的编码/解码耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=2000, help='参与序列化的获奖记录数')
+        parser.add_argument('--repeat', type=int, default=5, help='每项重复次数，取最短耗时')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('未安装 orjson（pip install orjson），ORJSONRenderer 当前使用标准库实现，无需对比')
+
+        # 与 GET /award/infos/ 相同的查询集与序列化器
+        view = AwardViewSet(action='list', format_kwarg=None)
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        view.request = Request(APIRequestFactory().get('/award/infos/', HTTP_HOST=host))
+        awards = list(view.get_queryset().order_by('-award_date')[:options['limit']])
+        if not awards:
+            raise CommandError('没有获奖记录，请先执行 seed_synthetic')
+
+        started = time.perf_counter()
+        data = AwardSerializer(awards, many=True, context={'request': view.request}).data
+        serialize_time = time.perf_counter() - started
+
+        repeat = options['repeat']
+        stdlib_render, expected = best_of(repeat, lambda: JSONRenderer().render(data))
+        orjson_render, content = best_of(repeat, lambda: renderers.ORJSONRenderer().render(data))
+        if content != expected:
+            raise CommandError('orjson 输出与标准库不一致')
+        stdlib_parse, _ = best_of(repeat, lambda: JSONParser().parse(io.BytesIO(content)))
+        orjson_parse, _ = best_of(repeat, lambda: renderers.ORJSONParser().parse(io.BytesIO(content)))
+
+        self.stdout.write(
+            f'{len(awards)} 条获奖记录，JSON {len(content) / 1024 / 1024:.2f} MB，'
+            f'序列化（to_representation）{serialize_time * 1000:.1f} ms'
+        )
+        for name, stdlib, fast in [('编码', stdlib_render, orjson_render), ('解码', stdlib_parse, orjson_parse)]:
+            self.stdout.write(
+                f'{name}：标准库 {stdlib * 1000:.1f} ms，orjson {fast * 1000:.1f} ms，{stdlib / fast:.1f}x'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'渲染占比（标准库）{stdlib_render / (serialize_time + stdlib_render):.0%} -> '
+            f'（orjson）{orjson_render / (serialize_time + orjson_render):.0%}，输出逐字节一致'
+        ))
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from award.views import AwardViewSet
+from team.views import TeamViewSet
+
+# (名称, 视图集, 请求路径)
+ENDPOINTS = [
+    ('award', AwardViewSet, '/award/infos/'),
+    ('team', TeamViewSet, '/team/info/'),
+]
+
+# 人员列表字段：ModelSerializer 按预取结果的顺序输出，扁平序列化器按中间表顺序，对比时忽略顺序
+PEOPLE_FIELDS = {
+    'participants', 'participant_details', 'instructors', 'instructor_details',
+    'members', 'members_detail', 'teachers', 'teachers_detail',
+}
+
+
+def normalize(rows):
+    def sort_key(item):
+        return item['user_id'] if isinstance(item, dict) else item
+
+    return [
+        {name: sorted(value, key=sort_key) if name in PEOPLE_FIELDS else value for name, value in row.items()}
+        for row in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = '对比获奖/团队列表的 ModelSerializer 与扁平序列化器（查询 + 序列化）耗时，并校验输出一致'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10000, help='参与序列化的行数')
+        parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最短耗时')
+        parser.add_argument('--only', choices=[name for name, _, _ in ENDPOINTS], help='只测一个列表')
+
+    def build_view(self, viewset, path):
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('没有超级管理员，请先执行 seed_synthetic')
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        request = APIRequestFactory().get(path, HTTP_HOST=host)
+        view = viewset(action='list', format_kwarg=None)
+        view.request = Request(request)
+        view.request.user = user
+        return view
+
+    def measure(self, repeat, func):
+        """重复执行 repeat 次，返回 (最短耗时, 查询次数, 最后一次的结果)"""
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+        return min(timings), len(queries), result
+
+    def handle(self, *args, **options):
+        limit, repeat = options['limit'], options['repeat']
+        for name, viewset, path in ENDPOINTS:
+            if options['only'] and name != options['only']:
+                continue
+            view = self.build_view(viewset, path)
+            context = view.get_serializer_context()
+            queryset = view.get_queryset()
+            ids = list(queryset.values_list('id', flat=True)[:limit])
+            if not ids:
+                raise CommandError(f'{path} 没有数据，请先执行 seed_synthetic')
+            queryset = queryset.filter(id__in=ids)
+
+            # 每次用 .all() 复制查询集，避免复用结果缓存，耗时包含查询
+            model_time, model_queries, expected = self.measure(
+                repeat, lambda: view.get_serializer_class()(queryset.all(), many=True, context=context).data
+            )
+            flat_time, flat_queries, data = self.measure(
+                repeat, lambda: view.flat_serializer_class(queryset.all(), context=context).data
+            )
+            if normalize(data) != normalize(expected):
+                raise CommandError(f'{path} 扁平序列化器输出与 ModelSerializer 不一致')
+
+            self.stdout.write(
+                f'{path} {len(ids)} 行：ModelSerializer {model_time * 1000:.0f} ms（{model_queries} 次查询），'
+                f'扁平 {flat_time * 1000:.0f} ms（{flat_queries} 次查询），{model_time / flat_time:.1f}x'
+            )
+        self.stdout.write(self.style.SUCCESS('输出一致'))
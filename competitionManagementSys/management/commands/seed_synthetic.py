@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from competitionManagementSys.synthetic import DEFAULT_PASSWORD, DEFAULT_VOLUMES, SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = '批量生成压测用的合成数据（用户、档案、竞赛、赛事、团队、证书、获奖、申请、通知）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='整体规模，相对默认数据量的比例（默认 1，即 2 万用户 / 5 万获奖）')
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=None,
+                                help=f'{name} 数量，覆盖 --scale 的计算结果（默认 {default} * scale）')
+        parser.add_argument('--seed', type=int, default=2024, help='随机种子，相同参数生成的数据完全一致')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_create 每批写入的行数')
+        parser.add_argument('--skip-files', action='store_true', help='不写入证书图片文件，只生成数据库记录')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='目标数据库别名')
+
+    def handle(self, *args, **options):
+        volumes = {
+            name: options[name] for name in DEFAULT_VOLUMES if options[name] is not None
+        }
+        dataset = SyntheticDataset(
+            volumes=volumes,
+            scale=options['scale'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            using=options['database'],
+            write_files=not options['skip_files'],
+            log=lambda message: self.stdout.write(f'  {message}'),
+        )
+
+        self.stdout.write(self.style.SUCCESS('正在生成合成数据...'))
+        started = time.perf_counter()
+        try:
+            # 整体放在一个事务中，SQLite 下可避免逐批提交带来的 fsync 开销
+            with transaction.atomic(using=options['database']):
+                counts = dataset.generate()
+        except BaseException as e:
+            # 事务已回滚，已写入的证书文件一并删除（包括 Ctrl+C 中断）
+            dataset.delete_files()
+            if isinstance(e, ValueError):
+                raise CommandError(str(e))
+            raise
+
+        for table, count in counts.items():
+            self.stdout.write(f'{table}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'合成数据生成完成，共 {sum(counts.values())} 行，耗时 {time.perf_counter() - started:.1f}s；'
+            f'超级管理员 {dataset.users[0].user_id}，所有合成用户密码均为 {DEFAULT_PASSWORD}'
+        ))
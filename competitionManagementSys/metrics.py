@@ -0,0 +1,239 @@
+"""
+请求级性能指标
+
+- RequestMetrics：单个请求的 SQL 次数、SQL 耗时、最慢 SQL（按指纹归并）、序列化耗时、总耗时
+- MetricsRegistry：按 URL 名称（view_name）聚合的进程内指标，最近 METRICS_WINDOW 个请求的耗时用于计算分位数
+- 数据只保存在当前进程内存中，多进程部署时每个 worker 各自统计，由 Prometheus 按实例汇总
+- 流式响应在响应体发送结束后才记入 MetricsRegistry（含分块查询与序列化），Server-Timing 只反映视图返回前的部分
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# 当前请求的指标对象，供 SQL 包装器与序列化计时使用
+current_metrics = ContextVar('current_metrics', default=None)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+VALUES_RE = re.compile(r'(\([?, ]+\))(?:, \([?, ]+\))+')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    SQL 指纹：去掉字面量与参数，合并 IN 列表与批量 VALUES，使同一类查询归为一条
+    SELECT ... WHERE id IN (%s, %s, %s) LIMIT 21 -> SELECT ... WHERE id IN (...) LIMIT ?
+    """
+    sql = SPACE_RE.sub(' ', sql).strip()
+    sql = STRING_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return VALUES_RE.sub(r'\1, ...', sql)
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RequestMetrics:
+    """单个请求的指标"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.queries = {}
+        # 嵌套序列化（如在 to_representation 中再次访问 .data）只统计最外层
+        self.serializer_depth = 0
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        key = fingerprint(sql)
+        count, total, slowest = self.queries.get(key, (0, 0.0, 0.0))
+        self.queries[key] = (count + 1, total + duration, max(slowest, duration))
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def slowest_queries(self, limit=None):
+        """按总耗时倒序返回 [(指纹, 次数, 总耗时, 单次最大耗时)]"""
+        limit = limit or get_setting('METRICS_TOP_QUERIES', 5)
+        rows = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(sql, count, total, slowest) for sql, (count, total, slowest) in rows]
+
+    def server_timing(self):
+        """
+        生成 Server-Timing 响应头（单位毫秒）
+        列表接口的 queryset 通常在序列化时才求值，因此 serialize 中包含这部分 SQL 耗时
+        """
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries"',
+            f'serialize;dur={self.serializer_time * 1000:.2f}',
+            f'app;dur={max(self.total - self.db_time, 0) * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ])
+
+
+def sql_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper 使用的包装器：把每条 SQL 的耗时记入当前请求"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def install_serializer_timer():
+    """
+    给 DRF BaseSerializer.data 加上计时，统计请求内的序列化耗时
+    只在最外层 .data 计时，ListSerializer 与嵌套序列化不会重复累计
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original, '_timed', False):
+        return
+
+    def timed_data(self):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return original.fget(self)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            if metrics.serializer_depth == 0:
+                metrics.serializer_time += time.perf_counter() - started
+
+    prop = property(timed_data)
+    prop.fget._timed = True
+    BaseSerializer.data = prop
+
+
+class ViewStats:
+    """单个 (view, method) 的累计指标"""
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.statuses = {}
+        self.recent = deque(maxlen=window)
+        # 指纹 -> [出现次数, 总耗时, 单次最大耗时]
+        self.slow_queries = {}
+
+
+class MetricsRegistry:
+    """按 URL 名称聚合的进程内指标"""
+
+    quantiles = (0.5, 0.95, 0.99)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def record(self, view, method, status, metrics):
+        window = get_setting('METRICS_WINDOW', 1000)
+        top = get_setting('METRICS_TOP_QUERIES', 5)
+        with self.lock:
+            stats = self.views.get((view, method))
+            if stats is None:
+                stats = self.views[(view, method)] = ViewStats(window)
+            stats.count += 1
+            stats.total += metrics.total
+            stats.queries += metrics.query_count
+            stats.db_time += metrics.db_time
+            stats.serializer_time += metrics.serializer_time
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.recent.append(metrics.total)
+
+            for sql, count, total, slowest in metrics.slowest_queries(top):
+                row = stats.slow_queries.setdefault(sql, [0, 0.0, 0.0])
+                row[0] += count
+                row[1] += total
+                row[2] = max(row[2], slowest)
+            # 每个视图只保留累计耗时最高的若干条指纹，控制标签基数
+            if len(stats.slow_queries) > top * 4:
+                keep = sorted(stats.slow_queries.items(), key=lambda item: item[1][1], reverse=True)[:top]
+                stats.slow_queries = dict(keep)
+
+    def render_prometheus(self):
+        """输出 Prometheus 文本格式（text/plain; version=0.0.4）"""
+        with self.lock:
+            items = sorted(self.views.items())
+            lines = [
+                '# HELP http_request_duration_seconds Request duration per view (quantiles over recent requests).',
+                '# TYPE http_request_duration_seconds summary',
+            ]
+            for (view, method), stats in items:
+                labels = _labels(view=view, method=method)
+                recent = sorted(stats.recent)
+                for q in self.quantiles:
+                    value = recent[min(int(q * len(recent)), len(recent) - 1)] if recent else 0
+                    lines.append(f'http_request_duration_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.total:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+            for name, help_text, attr in [
+                ('http_request_db_queries_total', 'SQL queries executed per view.', 'queries'),
+                ('http_request_db_duration_seconds_total', 'Time spent in SQL per view.', 'db_time'),
+                ('http_request_serializer_duration_seconds_total', 'Time spent in DRF serializers per view.',
+                 'serializer_time'),
+            ]:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (view, method), stats in items:
+                    value = getattr(stats, attr)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{{_labels(view=view, method=method)}}} {value}')
+
+            lines.append('# HELP http_responses_total Responses per view and status code.')
+            lines.append('# TYPE http_responses_total counter')
+            for (view, method), stats in items:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_responses_total{{{_labels(view=view, method=method, status=status)}}} {count}')
+
+            for name, help_text, index in [
+                ('db_query_duration_seconds_total', 'Time spent in the slowest SQL fingerprints per view.', 1),
+                ('db_query_calls_total', 'Executions of the slowest SQL fingerprints per view.', 0),
+            ]:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (view, method), stats in items:
+                    for sql, row in sorted(stats.slow_queries.items()):
+                        value = f'{row[index]:.6f}' if isinstance(row[index], float) else row[index]
+                        labels = _labels(view=view, method=method, fingerprint=sql[:200])
+                        lines.append(f'{name}{{{labels}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+registry = MetricsRegistry()
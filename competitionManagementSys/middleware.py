@@ -0,0 +1,296 @@
+import abc
+import cProfile
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from . import caching, compression, profiling, routers
+from .metrics import RequestMetrics, current_metrics, get_setting, install_serializer_timer, registry
+
+logger = logging.getLogger(__name__)
+
+
+class HybridMiddleware(abc.ABC):
+    """
+    同时支持 WSGI 与 ASGI 的中间件基类
+    ASGI 下 get_response 为协程函数，__call__ 转交给 __acall__，避免每个请求在中间件链上来回切换线程
+    子类必须同时实现 handle（同步）与 __acall__（异步）
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    @abc.abstractmethod
+    def handle(self, request):
+        """同步请求链：处理请求并返回响应"""
+
+    @abc.abstractmethod
+    async def __acall__(self, request):
+        """异步请求链：处理请求并返回响应"""
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """
+    记录每个请求的 SQL 次数/耗时、最慢 SQL 指纹、序列化耗时和总耗时
+    - 响应头加上 Server-Timing，浏览器开发者工具可直接查看
+    - 按 URL 名称聚合到进程内的 registry，由 /metrics 以 Prometheus 格式输出
+    - 超过 METRICS_SLOW_REQUEST_MS 的请求记录 warning 日志，附带最慢的 SQL
+    应放在 MIDDLEWARE 的最前面，以覆盖其他中间件的耗时
+    SQL 计时器由 db.install_sql_timer 挂在每个连接上，这里只需设置当前请求的指标对象
+
+    流式响应（StreamingHttpResponse）的响应体在本中间件返回之后才生成：
+    - 生成每一块时重新设置当前请求的指标对象，分块查询与序列化照常计入
+    - 最后一块生成完（或客户端断开）后才写入 registry 与慢请求日志，total 包含发送响应体的时间
+    - Server-Timing 随响应头发出，只包含视图返回前的部分，不含分块查询
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        install_serializer_timer()
+
+    def handle(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # sync_to_async 会把当前上下文复制到执行 ORM 的线程，线程内的 SQL 同样记入 metrics
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.finish()
+        response['Server-Timing'] = metrics.server_timing()
+        if response.streaming:
+            meter = self.ameter_stream if response.is_async else self.meter_stream
+            response.streaming_content = meter(request, response, response.streaming_content, metrics)
+        else:
+            self.record(request, response, metrics)
+        return response
+
+    def meter_stream(self, request, response, content, metrics):
+        # 每次取下一块时设置、取完立即恢复：生成器可能在不同的线程/上下文中被恢复执行
+        content = iter(content)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = next(content)
+                except StopIteration:
+                    return
+                finally:
+                    current_metrics.reset(token)
+                yield chunk
+        finally:
+            metrics.finish()
+            self.record(request, response, metrics)
+
+    async def ameter_stream(self, request, response, content, metrics):
+        content = aiter(content)
+        try:
+            while True:
+                token = current_metrics.set(metrics)
+                try:
+                    chunk = await anext(content)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_metrics.reset(token)
+                yield chunk
+        finally:
+            metrics.finish()
+            self.record(request, response, metrics)
+
+    def record(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        registry.record(view, request.method, response.status_code, metrics)
+
+        if metrics.total * 1000 >= get_setting('METRICS_SLOW_REQUEST_MS', 500):
+            logger.warning(
+                'Slow request %s %s (%s): %.1fms, %d queries, %.1fms SQL, %.1fms serialize\n%s',
+                request.method, request.path, view, metrics.total * 1000, metrics.query_count,
+                metrics.db_time * 1000, metrics.serializer_time * 1000,
+                '\n'.join(
+                    f'  {total * 1000:.1f}ms x{count}: {sql}'
+                    for sql, count, total, _ in metrics.slowest_queries()
+                )
+            )
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """
+    大体积 JSON 响应按 Accept-Encoding 压缩为 br / gzip，相同内容的大响应复用缓存中的压缩结果
+    放在 RequestMetricsMiddleware 之后，压缩耗时计入请求总耗时
+    ASGI 下压缩放到线程池执行（zlib/brotli 压缩时释放 GIL），不阻塞事件循环
+    """
+
+    def handle(self, request):
+        return compression.compress_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not compression.is_compressible(response):
+            return response
+        return await sync_to_async(compression.compress_response, thread_sensitive=False)(request, response)
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    管理员按需对单个请求做性能分析（X-Profile 请求头或 ?_profile= 参数，取值 cprofile / sample）
+    - 分析文件保存在 PROFILING_DIR，文件名写入响应头 X-Profile-Id，可通过 /profiles 列出与下载
+    - 非管理员或取值无效时按普通请求处理；未带标记的请求不做任何额外工作
+    放在 RequestMetricsMiddleware 之后，使分析范围覆盖其余中间件与视图
+    ASGI 下 cProfile 只记录事件循环线程，ORM 查询在 sync_to_async 线程中执行，只体现为等待时间
+    """
+
+    @staticmethod
+    def requested_mode(request):
+        mode = request.META.get(profiling.PROFILE_HEADER) or request.GET.get(profiling.PROFILE_PARAM)
+        if not mode or mode.lower() not in profiling.MODES:
+            return None
+        return mode.lower()
+
+    def handle(self, request):
+        mode = self.requested_mode(request)
+        if mode is None or not profiling.is_admin(request):
+            return self.get_response(request)
+
+        profiler, sampler = self.start(mode)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(profiler, sampler)
+        return self.save(request, response, mode, started, profiler, sampler)
+
+    async def __acall__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None or not await sync_to_async(profiling.is_admin)(request):
+            return await self.get_response(request)
+
+        profiler, sampler = self.start(mode)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(profiler, sampler)
+        return self.save(request, response, mode, started, profiler, sampler)
+
+    @staticmethod
+    def start(mode):
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler, None
+        sampler = profiling.make_sampler(get_setting('PROFILING_SAMPLE_INTERVAL', 0.005))
+        sampler.start()
+        return None, sampler
+
+    @staticmethod
+    def stop(profiler, sampler):
+        if profiler is not None:
+            profiler.disable()
+        else:
+            sampler.stop()
+
+    @staticmethod
+    def save(request, response, mode, started, profiler, sampler):
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        name = profiling.profile_filename(request, mode, elapsed_ms)
+        profiling.save_profile(name, profiler=profiler, sampler=sampler)
+        response['X-Profile-Id'] = name
+        return response
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    只读接口的读查询走副本（settings.REPLICA_DATABASE）
+    - 视图类声明 replica_actions：ViewSet 填 action 名（如 'list'），APIView 与 Django 类视图填 HTTP 方法（如 'get'）
+    - 只处理 GET/HEAD；用户写请求成功后，REPLICA_PIN_SECONDS 秒内其读请求固定走主库
+    未配置副本，或 default 缓存不能在进程间共享（无法保证读己之写）时不加载该中间件
+    路由别名保存在 ContextVar 中，在本中间件内设置与恢复；ASGI 下随上下文进入 sync_to_async 线程
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.alias = getattr(settings, 'REPLICA_DATABASE', None)
+        if not self.alias or self.alias not in connections.databases:
+            raise MiddlewareNotUsed
+        if not caching.is_shared():
+            logger.warning('default 缓存为进程内缓存，无法在 worker 之间共享读己之写标记，只读副本路由已关闭')
+            raise MiddlewareNotUsed
+
+    @staticmethod
+    def wants_replica(request):
+        """GET/HEAD 且命中视图声明的 replica_actions 时返回用户标识（匿名为 None），否则返回 False"""
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        try:
+            view_func = resolve(request.path_info).func
+        except Resolver404:
+            return False
+        replica_actions = getattr(routers.get_view_class(view_func), 'replica_actions', ())
+        if not replica_actions or routers.view_action(view_func, request.method) not in replica_actions:
+            return False
+        return routers.request_user_key(request)
+
+    @staticmethod
+    def should_pin(request, response):
+        if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+            return None
+        return routers.request_user_key(request)
+
+    def handle(self, request):
+        user_key = self.wants_replica(request)
+        if user_key is False or (user_key is not None and routers.is_pinned(user_key)):
+            response = self.get_response(request)
+            user_key = self.should_pin(request, response)
+            if user_key is not None:
+                routers.pin_to_primary(user_key)
+            return response
+
+        token = routers.current_read_alias.set(self.alias)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.current_read_alias.reset(token)
+
+    async def __acall__(self, request):
+        user_key = self.wants_replica(request)
+        if user_key is False or (user_key is not None and await routers.ais_pinned(user_key)):
+            response = await self.get_response(request)
+            user_key = self.should_pin(request, response)
+            if user_key is not None:
+                await routers.apin_to_primary(user_key)
+            return response
+
+        token = routers.current_read_alias.set(self.alias)
+        try:
+            return await self.get_response(request)
+        finally:
+            routers.current_read_alias.reset(token)
@@ -0,0 +1,172 @@
+"""
+按需性能分析
+
+管理员在请求上带 `X-Profile: cprofile|sample` 请求头或 `?_profile=cprofile|sample` 参数时，对该请求做性能分析：
+- cprofile：cProfile 全量函数调用统计，保存为 .prof（可用 snakeviz / pstats 查看）
+- sample：定时采样调用栈，保存为 collapsed stack 文本（可用 flamegraph.pl / speedscope 查看）
+  主线程内使用 SIGALRM 定时器采样；非主线程（如 runserver 的多线程模式）退化为后台线程轮询采样
+未带标记的请求只多一次字典查找，不做任何其他处理（见 middleware.ProfilingMiddleware）
+"""
+import os
+import re
+import signal
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = '_profile'
+MODES = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+# 文件名：时间-随机串-方法-视图-耗时ms.扩展名
+FILENAME_RE = re.compile(
+    r'^(?P<created>\d{8}-\d{6})-(?P<id>[0-9a-f]{8})-(?P<method>[A-Z]+)-(?P<view>[\w.-]+)-(?P<ms>\d+)ms'
+    r'(?P<ext>\.prof|\.collapsed)$'
+)
+
+
+def get_profiling_dir():
+    return getattr(settings, 'PROFILING_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def collapse_stack(frame):
+    """把调用栈转为 collapsed 格式：root;caller;callee"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SignalSampler:
+    """使用 SIGALRM 墙钟定时器在主线程中采样（包含等待数据库的时间）"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+
+    def _handler(self, signum, frame):
+        self.stacks[collapse_stack(frame)] += 1
+
+    def start(self):
+        self.previous = signal.signal(signal.SIGALRM, self._handler)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_REAL, 0, 0)
+        signal.signal(signal.SIGALRM, self.previous)
+
+
+class ThreadSampler:
+    """后台线程轮询目标线程的调用栈，用于无法注册信号处理器的工作线程"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.target = threading.get_ident()
+        self.stopped = threading.Event()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+def make_sampler(interval):
+    if threading.current_thread() is threading.main_thread() and hasattr(signal, 'setitimer'):
+        return SignalSampler(interval)
+    return ThreadSampler(interval)
+
+
+def is_admin(request):
+    """与 IsAdmin 一致：超级管理员或 Administrator 角色；中间件阶段需要自行解析 JWT"""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return False
+    if result is None:
+        user = getattr(request, 'user', None)
+    else:
+        user = result[0]
+    if user is None or not user.is_authenticated:
+        return False
+    return user.is_superuser or user.groups.filter(name='Administrator').exists()
+
+
+def list_profiles(limit=50):
+    """按时间倒序列出已保存的分析文件"""
+    directory = get_profiling_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        match = FILENAME_RE.match(name)
+        if not match:
+            continue
+        profiles.append({
+            'name': name,
+            'mode': 'cprofile' if match['ext'] == '.prof' else 'sample',
+            'method': match['method'],
+            'view': match['view'],
+            'duration_ms': int(match['ms']),
+            'created': datetime.strptime(match['created'], '%Y%m%d-%H%M%S').isoformat(),
+            'size': os.path.getsize(os.path.join(directory, name)),
+        })
+        if len(profiles) >= limit:
+            break
+    return profiles
+
+
+def _prune(directory, keep):
+    names = sorted(name for name in os.listdir(directory) if FILENAME_RE.match(name))
+    for name in names[:-keep] if keep else []:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def profile_filename(request, mode, elapsed_ms):
+    match = getattr(request, 'resolver_match', None)
+    view = re.sub(r'[^\w.-]+', '_', match.view_name if match else 'unresolved')
+    return (
+        f'{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}-{request.method}-{view}-{elapsed_ms}ms'
+        f'{MODES[mode]}'
+    )
+
+
+def save_profile(name, profiler=None, sampler=None):
+    """保存 cProfile 统计或采样结果，并清理超出 PROFILING_KEEP 的旧文件"""
+    directory = get_profiling_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    if profiler is not None:
+        profiler.dump_stats(path)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+    _prune(directory, getattr(settings, 'PROFILING_KEEP', 50))
+    return path
@@ -0,0 +1,88 @@
+"""
+基于 orjson 的 DRF 渲染器与解析器
+
+- 输出与 rest_framework.renderers.JSONRenderer 逐字节一致：datetime 交给 DRF 的 JSONEncoder 处理（毫秒精度、UTC 写作 Z），
+  Decimal、惰性翻译字符串、QuerySet 等 orjson 不认识的类型同样回落到 JSONEncoder.default；UUID 由 orjson 直接输出
+- 需要缩进（如 ?format=api、Accept: application/json; indent=4）、关闭 UNICODE_JSON/COMPACT_JSON，
+  或 orjson 无法编码（超过 64 位的整数）时使用标准库实现
+- 未安装 orjson 时两个类的行为与 DRF 默认实现完全相同
+- 与标准库的唯一差异：STRICT_JSON 下 NaN/Infinity 由 orjson 输出为 null，标准库会抛出 ValueError
+"""
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时回退到标准库 json
+    orjson = None
+
+if orjson is not None:
+    # datetime 交给 default 处理，保持 DRF 的格式；dict 的整数键与标准库一样转为字符串
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """
+    紧凑格式的 JSON bytes，非 ASCII 字符不转义，与 JSONRenderer 的默认输出一致
+    供 DRF 之外的视图（异步只读接口、流式接口等）复用
+    """
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            # 与 JSONRenderer 相同，转义 U+2028/U+2029，保证输出是合法的 JavaScript
+            return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return renderers.JSONRenderer().render(data)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer 的 orjson 版本，只在默认的紧凑、UTF-8 输出下启用"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    换行分隔的 JSON（application/x-ndjson）：列表每个元素一行，其他数据（如错误信息）输出为一行
+    流式列表（competitionManagementSys.streaming）逐行写出，不经过本渲染器；这里只用于内容协商与非流式响应
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(dumps(item) + b'\n' for item in items)
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser 的 orjson 版本；请求体不是 UTF-8 时使用标准库解析"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        # orjson 与 STRICT_JSON 一样拒绝 NaN/Infinity
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
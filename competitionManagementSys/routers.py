@@ -0,0 +1,97 @@
+"""
+只读副本路由
+
+报表、统计与列表等只读接口在视图类上声明 replica_actions，由 ReplicaRoutingMiddleware 在请求范围内
+把读查询路由到 settings.REPLICA_DATABASE；其余请求以及所有写操作仍走 default。
+
+读己之写：用户完成一次写请求后，在 REPLICA_PIN_SECONDS 秒内该用户的读请求固定走主库，
+避免主从复制延迟导致刚提交的数据“消失”。固定标记保存在 default 缓存中，该缓存必须在 worker 进程之间共享；
+缓存为 LocMemCache/DummyCache 时无法保证读己之写，ReplicaRoutingMiddleware 不加载，所有读查询走主库。
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+# 当前请求应使用的只读库别名；None 表示使用默认路由（主库）
+current_read_alias = ContextVar('current_read_alias', default=None)
+
+PIN_KEY = 'replica-pin:{}'
+
+
+def request_user_key(request):
+    """
+    从 JWT 中取出用户标识，只校验签名不查询数据库
+    路由决定发生在 DRF 认证之前，且不能为了判断读哪个库先去读库
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def pin_to_primary(user_key):
+    cache.set(PIN_KEY.format(user_key), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned(user_key):
+    return cache.get(PIN_KEY.format(user_key)) is not None
+
+
+async def apin_to_primary(user_key):
+    await cache.aset(PIN_KEY.format(user_key), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+async def ais_pinned(user_key):
+    return await cache.aget(PIN_KEY.format(user_key)) is not None
+
+
+def get_view_class(view_func):
+    """DRF 视图为 view.cls，Django 类视图（如异步只读接口）为 view.view_class"""
+    return getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+
+
+def view_action(view_func, method):
+    """
+    返回视图本次请求对应的动作名：ViewSet 为 action（list/retrieve/...），APIView 与 Django 类视图为小写的 HTTP 方法
+    函数视图返回 None
+    """
+    if get_view_class(view_func) is None:
+        return None
+    actions = getattr(view_func, 'actions', None)
+    if actions is not None:
+        return actions.get(method.lower())
+    return method.lower()
+
+
+class ReplicaRouter:
+    """只有 ReplicaRoutingMiddleware 标记过的请求才会把读查询发往副本，写操作始终走主库"""
+
+    def db_for_read(self, model, **hints):
+        return current_read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库为同一份数据，跨库的对象之间允许建立关联
+        replica = getattr(settings, 'REPLICA_DATABASE', None)
+        databases = {DEFAULT_DB_ALIAS, replica}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
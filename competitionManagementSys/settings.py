@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,10 +56,19 @@ INSTALLED_APPS = [
     'notification.apps.NotificationConfig',
     'notifications',
     'team.apps.TeamConfig',
+    'competitionManagementSys.apps.CompetitionManagementSysConfig',
     'django_cleanup.apps.CleanupConfig'
 ]
 
 MIDDLEWARE = [
+    # 请求耗时/SQL 统计，放在最前面以覆盖其他中间件的耗时
+    'competitionManagementSys.middleware.RequestMetricsMiddleware',
+    # 大体积 JSON 响应 br/gzip 压缩，重复内容复用缓存的压缩结果
+    'competitionManagementSys.middleware.CompressionMiddleware',
+    # 管理员按需性能分析（X-Profile 请求头 / ?_profile= 参数）
+    'competitionManagementSys.middleware.ProfilingMiddleware',
+    # 报表/统计/列表接口的读查询走只读副本
+    'competitionManagementSys.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -92,11 +103,103 @@ WSGI_APPLICATION = 'competitionManagementSys.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_PROFILE=sqlite（默认）：单文件 SQLite，连接建立时由 competitionManagementSys.db 设置 SQLITE_PRAGMAS
+# DB_PROFILE=postgresql：生产环境，需要安装 psycopg（pip install "psycopg[binary]"），连接参数从环境变量读取
+DB_PROFILE = os.environ.get('DB_PROFILE', 'sqlite')
+
+if DB_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'competition'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # 持久连接，避免每个请求重新建立连接；复用前先检查连接是否可用
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            # 导出接口使用 .iterator(chunk_size=...)，在 PostgreSQL 上即为服务端游标，分批读取而不是一次载入内存
+            # 经 PgBouncer 事务池连接时需设置 DB_DISABLE_SERVER_SIDE_CURSORS=1
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS') == '1',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            },
+        }
+    }
+elif DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # 复用连接，使每个连接的 mmap 与页缓存在请求之间保留
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            # sqlite3 模块层面的锁等待时间（秒），与 busy_timeout 保持一致
+            'OPTIONS': {
+                'timeout': 5,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'未知的 DB_PROFILE: {DB_PROFILE}')
+
+# 只读副本：设置 DB_REPLICA_NAME 后启用（SQLite 为副本文件路径，PostgreSQL 为副本库名，主机/端口默认同主库）
+# 本地用 SQLite 测试时复制一份 db.sqlite3 作为副本，或执行 python manage.py migrate --database=replica
+# 测试时副本镜像 default，不单独建库
+if os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_PROFILE == 'postgresql':
+        DATABASES['replica']['HOST'] = os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST'])
+        DATABASES['replica']['PORT'] = os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT'])
+
+DATABASE_ROUTERS = ['competitionManagementSys.routers.ReplicaRouter']
+# 只读接口使用的库别名；未配置副本时为 None，ReplicaRoutingMiddleware 不加载
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+# 用户写请求成功后固定读主库的秒数（读己之写），应大于复制延迟；固定标记保存在 default 缓存中
+REPLICA_PIN_SECONDS = 5
+
+# 缓存：读己之写标记与压缩结果缓存需要在所有 worker 进程之间共享
+# - 设置 REDIS_URL 时使用 Redis（多台机器部署，需安装 redis 包）
+# - 设置 CACHE_DIR 时使用该目录下的文件缓存（同一台机器上的多进程共享）
+# - 都未设置时为 Django 默认的 LocMemCache，副本路由与压缩结果缓存自动关闭（competitionManagementSys.caching）
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
     }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# 每个 SQLite 连接建立时执行的 PRAGMA（competitionManagementSys.db.configure_sqlite）
+# - journal_mode=WAL：写操作不再阻塞读操作，报名高峰时并发读吞吐显著提高（持久化在数据库文件中）
+# - synchronous=NORMAL：WAL 模式下只在 checkpoint 时 fsync，断电最多丢失最近的事务，不会损坏数据库
+# - mmap_size：以内存映射方式读取数据库文件，减少 read() 系统调用与页缓存拷贝
+# - busy_timeout：写锁被占用时等待的毫秒数，而不是立即返回 database is locked
+# - cache_size：负数表示 KiB，即每个连接 64MB 页缓存
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
 }
 
 
@@ -124,7 +227,17 @@ AUTH_USER_MODEL = 'userManage.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':(
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # 安装 orjson 时用其编码/解码 JSON（输出与 DRF 默认实现一致），未安装时自动回退到标准库
+    'DEFAULT_RENDERER_CLASSES': (
+        'competitionManagementSys.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'competitionManagementSys.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 from datetime import timedelta
 
@@ -158,3 +271,31 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# 请求指标（competitionManagementSys.middleware.RequestMetricsMiddleware）
+# 超过该耗时（毫秒）的请求记录 warning 日志
+METRICS_SLOW_REQUEST_MS = 500
+# 计算耗时分位数时保留的最近请求数（每个视图）
+METRICS_WINDOW = 1000
+# 每个请求/视图保留的最慢 SQL 指纹数
+METRICS_TOP_QUERIES = 5
+
+# 按需性能分析（competitionManagementSys.middleware.ProfilingMiddleware）
+# 分析文件保存目录
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+# 最多保留的分析文件数，超出时删除最旧的
+PROFILING_KEEP = 50
+# sample 模式的采样间隔（秒）
+PROFILING_SAMPLE_INTERVAL = 0.005
+
+# 响应压缩（competitionManagementSys.middleware.CompressionMiddleware）
+# 小于该字节数的 JSON 响应不压缩
+COMPRESSION_MIN_SIZE = 1024
+# 大于该字节数的响应按内容摘要缓存压缩结果，相同内容只压缩一次
+COMPRESSION_CACHE_MIN_SIZE = 64 * 1024
+# 压缩结果使用的缓存别名与有效期（秒）；该别名为进程内缓存（LocMem/Dummy）时不缓存压缩结果
+COMPRESSION_CACHE = 'default'
+COMPRESSION_CACHE_TIMEOUT = 300
+# gzip 压缩级别（1-9）与 brotli 质量（0-11）；动态响应取压缩率与 CPU 的折中
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
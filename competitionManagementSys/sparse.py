@@ -0,0 +1,92 @@
+"""
+稀疏字段集：?fields= 选择输出字段，?expand= 控制嵌套详情字段
+
+- ?fields=id,award_level,competition_name  只输出这些字段
+- ?expand=participant_details              嵌套详情字段（序列化器 Meta.expandable_fields）只展开列出的几个；
+  ?expand= 留空表示不展开任何嵌套详情。未传 expand 时嵌套详情是否输出由 fields 决定（未传 fields 时全部输出，与原接口一致）
+- 视图按最终输出的字段裁剪 select_related / prefetch_related：不输出 *_details 时不再预取档案与角色组
+只作用于 GET/HEAD 请求的顶层序列化器，写接口与嵌套序列化器不受影响
+"""
+from rest_framework import serializers
+
+
+def split_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """序列化器混入：只保留 context['sparse_fields'] 中的字段"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.context.get('sparse_fields')
+        if names is None or not self.is_root_serializer():
+            return fields
+        return {name: field for name, field in fields.items() if name in names}
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class SparseFieldsViewMixin:
+    """
+    视图混入：解析 ?fields= / ?expand=，传给序列化器并据此裁剪查询集
+    sparse_relations 声明每个输出字段依赖的关联：{字段: (select_related 列表, prefetch_related 列表)}
+    """
+    sparse_relations = {}
+
+    def get_sparse_fields(self):
+        """返回本次请求输出的字段集合；未使用 fields/expand 参数或非只读请求时返回 None"""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        request = self.request
+        fields_param = request.query_params.get('fields')
+        expand_param = request.query_params.get('expand')
+        if request.method not in ('GET', 'HEAD') or (fields_param is None and expand_param is None):
+            return None
+
+        meta = self.get_serializer_class().Meta
+        all_fields = set(meta.fields)
+        expandable = set(getattr(meta, 'expandable_fields', ()))
+
+        selected = set(split_names(fields_param)) if fields_param is not None else set(all_fields)
+        unknown = selected - all_fields
+        if unknown:
+            raise serializers.ValidationError({'fields': f'未知字段：{", ".join(sorted(unknown))}'})
+
+        if expand_param is not None:
+            expand = set(split_names(expand_param))
+            unknown = expand - expandable
+            if unknown:
+                raise serializers.ValidationError({
+                    'expand': f'不可展开的字段：{", ".join(sorted(unknown))}，可选：{", ".join(sorted(expandable))}'
+                })
+            selected = (selected - expandable) | expand
+        return selected
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def apply_sparse_relations(self, queryset):
+        """只 select_related / prefetch_related 输出字段用到的关联"""
+        names = self.get_sparse_fields()
+        if names is None:
+            names = self.get_serializer_class().Meta.fields
+        select, prefetch = [], []
+        for name in names:
+            related, prefetched = self.sparse_relations.get(name, ((), ()))
+            select.extend(related)
+            prefetch.extend(prefetched)
+        if select:
+            queryset = queryset.select_related(*dict.fromkeys(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+        return queryset
@@ -0,0 +1,116 @@
+"""
+流式 JSON 列表
+
+未分页的大列表（全部获奖、全部用户导出）默认要先取出全部数据、序列化完再发送第一个字节。
+?stream=1 返回同样的 JSON 数组，Accept: application/x-ndjson（或 ?format=ndjson）返回每行一个元素的 NDJSON，两者都：
+- 按 stream_chunk_size 分块读取查询集（QuerySet.iterator(chunk_size)，prefetch_related 按块预取），
+  视图配置了扁平序列化器（flat_serializer_class）时按主键分块调用扁平序列化器
+- 每个元素序列化后立即写出，内存占用与块大小相关，与总行数无关
+- 响应为 StreamingHttpResponse，压缩中间件不处理；开始发送后出错无法再返回错误状态码，客户端只会收到不完整的响应
+只读副本路由在视图返回时已恢复，查询在视图内固定到当时的数据库别名，发送过程中的分块查询仍走同一个库
+发送过程中的分块查询与序列化由 RequestMetricsMiddleware 计入本请求的指标（发送结束后写入 /metrics），
+但 Server-Timing 响应头在发送前已确定，不包含这部分耗时
+"""
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from . import routers
+from .metrics import current_metrics
+from .renderers import NDJSONRenderer, dumps
+
+STREAM_PARAM = 'stream'
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@contextmanager
+def read_alias(alias):
+    """在发送过程中恢复视图执行时的只读库别名"""
+    token = routers.current_read_alias.set(alias)
+    try:
+        yield
+    finally:
+        routers.current_read_alias.reset(token)
+
+
+def json_array(items):
+    yield b'['
+    for index, item in enumerate(items):
+        yield dumps(item) if index == 0 else b',' + dumps(item)
+    yield b']'
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield dumps(item) + b'\n'
+
+
+class StreamingListMixin:
+    """
+    列表视图混入：?stream=1 或协商到 NDJSON 时流式输出 list 结果，否则走原有的 list
+    只用于未分页的列表
+    """
+    stream_chunk_size = 1000
+
+    def get_renderers(self):
+        return [*super().get_renderers(), NDJSONRenderer()]
+
+    def stream_format(self, request):
+        if isinstance(getattr(request, 'accepted_renderer', None), NDJSONRenderer):
+            return 'ndjson'
+        if request.query_params.get(STREAM_PARAM, '').lower() in TRUE_VALUES:
+            return 'json'
+        return None
+
+    def list(self, request, *args, **kwargs):
+        stream_format = self.stream_format(request)
+        if stream_format is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # 固定当前的数据库别名，响应体在视图返回后才生成
+        queryset = queryset.using(queryset.db)
+        # 上下文（含 ?fields= 校验）在视图内生成，参数错误仍返回 400
+        context = self.get_serializer_context()
+        items = self.stream_items(queryset, context, routers.current_read_alias.get())
+        if stream_format == 'ndjson':
+            return StreamingHttpResponse(ndjson_lines(items), content_type=NDJSONRenderer.media_type)
+        return StreamingHttpResponse(json_array(items), content_type='application/json')
+
+    def stream_items(self, queryset, context, alias):
+        flat_serializer_class = getattr(self, 'flat_serializer_class', None)
+        size = self.stream_chunk_size
+
+        if flat_serializer_class is None:
+            serializer = self.get_serializer_class()(context=context)
+            # iterator(chunk_size) 会对每块结果执行 prefetch_related
+            instances = queryset.iterator(chunk_size=size)
+            while True:
+                # 与 ModelSerializer.data 相同，取数（含分块查询与预取）与 to_representation 都计入序列化耗时；
+                # 指标对象由中间件在生成每一块时设置，每次重新获取
+                metrics = current_metrics.get()
+                started = time.perf_counter()
+                try:
+                    instance = next(instances, None)
+                    if instance is None:
+                        return
+                    item = serializer.to_representation(instance)
+                finally:
+                    if metrics is not None and metrics.serializer_depth == 0:
+                        metrics.serializer_time += time.perf_counter() - started
+                yield item
+
+        pks = queryset.values_list('pk', flat=True).iterator(chunk_size=size)
+        for chunk in chunked(pks, size):
+            # 按块内主键顺序输出：排序字段相同的行在子查询中的顺序可能与原查询集不同
+            with read_alias(alias):
+                rows = flat_serializer_class(queryset.filter(pk__in=chunk), context=context).serialize(order=chunk)
+            yield from rows
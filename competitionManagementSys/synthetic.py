@@ -0,0 +1,391 @@
+"""
+合成数据生成器
+
+按给定规模批量生成用户、档案、角色、竞赛、赛事、团队、证书、获奖、申请与通知，用于性能测试与本地复现生产规模数据
+- 所有写入使用 bulk_create 分批插入，不触发 signals；索引表、全文索引与赛事实时统计在最后统一重建
+- 使用固定随机种子，相同参数生成的数据完全一致
+- 证书图片为 1x1 像素的 PNG，仅在 write_files=True 时写入存储；是否写文件不影响生成的数据库记录
+"""
+import random
+import struct
+import time
+import uuid
+import zlib
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from notifications.models import Notification
+
+from apply.models import AwardApplication
+from award.models import Award
+from award.search import rebuild_index as rebuild_award_search
+from award.utils import rebuild_conflict_keys, rebuild_user_award_index
+from certificate.models import Certificate, certificate_upload_path
+from competitions.models import Competition, CompetitionCategory, CompetitionEvent, CompetitionLevel
+from competitions.search import rebuild_index as rebuild_competition_search
+from team.counters import reconcile as reconcile_event_counters
+from team.models import Team
+from userProfile.models import Profile
+from userProfile.search import rebuild_index as rebuild_profile_search
+
+# 与线上规模相当的默认数据量
+DEFAULT_VOLUMES = {
+    'users': 20000,
+    'competitions': 200,
+    'events': 2000,
+    'teams': 20000,
+    'awards': 50000,
+    'certificates': 50000,
+    'applications': 2000,
+    'notifications': 50000,
+}
+
+# 合成用户统一使用的登录密码
+DEFAULT_PASSWORD = 'pass123'
+# 合成用户学工号前缀，避免与真实账号冲突
+USER_ID_PREFIX = '9'
+
+ROLES = ['CompetitionAdministrator', 'Student', 'Teacher']
+CATEGORIES = ['创新类', '算法类', '数学类', '电子类', '创业类', '设计类']
+LEVELS = ['A', 'B', 'C']
+COMPETITION_NAMES = [
+    '蓝桥杯', 'ACM程序设计竞赛', '数学建模竞赛', '挑战杯', '互联网+创新创业大赛', '电子设计竞赛',
+    '计算机设计大赛', '服务外包创新创业大赛', '大学生创新创业训练计划', '机器人大赛',
+]
+AWARD_LEVELS = ['一等奖', '二等奖', '三等奖', '金奖', '银奖', '铜奖', '优秀奖']
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗'
+GIVEN_CHARS = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉萍红'
+DEPARTMENTS = ['计算机学院', '电子信息学院', '数学与统计学院', '机械工程学院', '经济管理学院', '外国语学院']
+MAJORS = ['计算机科学与技术', '软件工程', '人工智能', '电子信息工程', '应用数学', '机械设计', '市场营销']
+TITLES = ['讲师', '副教授', '教授']
+
+EVENT_STATUSES = ['registration', 'screening', 'ongoing', 'awarding', 'archived']
+TEAM_STATUSES = ['draft', 'submitted', 'shortlisted', 'rejected', 'awarded', 'ended']
+
+
+def tiny_png(rgb):
+    """生成一张 1x1 像素、指定颜色的 PNG 图片"""
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(b'\x00' + bytes(rgb)))
+        + chunk(b'IEND', b'')
+    )
+
+
+class SyntheticDataset:
+    """
+    用法：
+        dataset = SyntheticDataset(scale=0.1, seed=2024)
+        counts = dataset.generate()
+    volumes 中未给出的项按 DEFAULT_VOLUMES * scale 计算；certificates 不超过 awards，每张证书绑定一条获奖记录
+    """
+
+    def __init__(self, volumes=None, scale=1.0, seed=2024, batch_size=2000,
+                 using=DEFAULT_DB_ALIAS, write_files=False, log=None):
+        self.volumes = {
+            key: max(int(value * scale), 1) for key, value in DEFAULT_VOLUMES.items()
+        }
+        self.volumes.update(volumes or {})
+        self.seed = seed
+        self.batch_size = batch_size
+        self.using = using
+        self.write_files = write_files
+        # 已写入存储的证书文件，事务回滚时由调用方通过 delete_files() 清理
+        self.written_files = []
+        self.log = log or (lambda message: None)
+        self.random = random.Random(seed)
+        self.base_time = timezone.make_aware(datetime(2025, 1, 1, 8, 0))
+        self.counts = {}
+
+    # ------------------------------------------------------------------
+    def generate(self):
+        """按依赖顺序生成全部数据，返回 {表名: 写入行数}"""
+        User = get_user_model()
+        if User.objects.using(self.using).filter(user_id__startswith=USER_ID_PREFIX, username__startswith='syn').exists():
+            raise ValueError('数据库中已存在合成数据，请先清理后再生成')
+
+        steps = [
+            ('groups', self._create_groups),
+            ('users', self._create_users),
+            ('profiles', self._create_profiles),
+            ('reference', self._create_reference_data),
+            ('competitions', self._create_competitions),
+            ('events', self._create_events),
+            ('teams', self._create_teams),
+            ('certificates', self._create_certificates),
+            ('awards', self._create_awards),
+            ('applications', self._create_applications),
+            ('notifications', self._create_notifications),
+            ('indexes', self._rebuild_indexes),
+        ]
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            self.log(f'{name}: {time.perf_counter() - started:.2f}s')
+        return self.counts
+
+    def delete_files(self):
+        """删除本次生成写入存储的证书文件（数据库事务回滚后文件不会随之消失）"""
+        storage = Certificate._meta.get_field('image_uri').storage
+        for name in self.written_files:
+            storage.delete(name)
+        self.written_files = []
+
+    def _bulk_create(self, model, objs, key=None):
+        created = model.objects.using(self.using).bulk_create(objs, batch_size=self.batch_size)
+        key = key or model._meta.db_table
+        self.counts[key] = self.counts.get(key, 0) + len(created)
+        return created
+
+    def _sample(self, population, low, high):
+        k = min(self.random.randint(low, high), len(population))
+        return self.random.sample(population, k)
+
+    # ------------------------------------------------------------------
+    def _create_groups(self):
+        self.groups = {}
+        for name in ROLES:
+            group, _ = Group.objects.using(self.using).get_or_create(name=name)
+            self.groups[name] = group
+
+    def _create_users(self):
+        User = get_user_model()
+        total = self.volumes['users']
+        password = make_password(DEFAULT_PASSWORD)
+
+        # 角色比例：管理员 1%，教师 9%，其余为学生；第 0 个用户固定为超级管理员
+        admin_count = max(total // 100, 1)
+        teacher_count = max(total * 9 // 100, 1)
+
+        users = []
+        roles = []
+        for i in range(total):
+            if i < admin_count:
+                role = 'CompetitionAdministrator'
+            elif i < admin_count + teacher_count:
+                role = 'Teacher'
+            else:
+                role = 'Student'
+            user_id = f'{USER_ID_PREFIX}{i:010d}'
+            users.append(User(
+                user_id=user_id,
+                username=f'syn{user_id}',
+                password=password,
+                email=f'{user_id}@example.com',
+                is_superuser=(i == 0),
+                is_staff=(i == 0),
+            ))
+            roles.append(role)
+
+        users = self._bulk_create(User, users)
+        through = User.groups.through
+        self._bulk_create(through, [
+            through(user_id=user.pk, group_id=self.groups[role].pk)
+            for user, role in zip(users, roles)
+        ])
+
+        self.users = users
+        self.user_roles = dict(zip((user.pk for user in users), roles))
+        self.admins = [user for user, role in zip(users, roles) if role == 'CompetitionAdministrator']
+        self.teachers = [user for user, role in zip(users, roles) if role == 'Teacher']
+        self.students = [user for user, role in zip(users, roles) if role == 'Student']
+
+    def _create_profiles(self):
+        profiles = []
+        for user in self.users:
+            role = self.user_roles[user.pk]
+            name = self.random.choice(SURNAMES) + ''.join(self.random.choices(GIVEN_CHARS, k=self.random.randint(1, 2)))
+            profiles.append(Profile(
+                user_id=user.user_id,
+                real_name=name,
+                phone=f'13{self.random.randint(0, 999999999):09d}',
+                email=user.email,
+                department=self.random.choice(DEPARTMENTS),
+                major=self.random.choice(MAJORS) if role == 'Student' else None,
+                clazz=f'{self.random.randint(20, 25)}级{self.random.randint(1, 6)}班' if role == 'Student' else None,
+                title=self.random.choice(TITLES) if role == 'Teacher' else None,
+            ))
+        self._bulk_create(Profile, profiles)
+
+    def _create_reference_data(self):
+        self.categories = [
+            CompetitionCategory.objects.using(self.using).get_or_create(name=name)[0] for name in CATEGORIES
+        ]
+        self.levels = [
+            CompetitionLevel.objects.using(self.using).get_or_create(name=name)[0] for name in LEVELS
+        ]
+
+    def _create_competitions(self):
+        competitions = []
+        for i in range(self.volumes['competitions']):
+            year = self.random.randint(2018, 2025)
+            name = COMPETITION_NAMES[i % len(COMPETITION_NAMES)]
+            competitions.append(Competition(
+                title=f'{year}年{name}（{i + 1}）',
+                description=f'{name}是面向全校学生的{self.random.choice(CATEGORIES)}学科竞赛。',
+                year=year,
+                uri=f'https://example.com/competitions/{i + 1}',
+                category=self.random.choice(self.categories),
+                level=self.random.choice(self.levels),
+                creator=self.random.choice(self.admins),
+            ))
+        self.competitions = self._bulk_create(Competition, competitions)
+
+    def _create_events(self):
+        events = []
+        for i in range(self.volumes['events']):
+            competition = self.competitions[i % len(self.competitions)]
+            start = self.base_time - timedelta(days=self.random.randint(0, 2000))
+            events.append(CompetitionEvent(
+                competition=competition,
+                name=f'{competition.title} 第{i // len(self.competitions) + 1}场',
+                start_time=start,
+                end_time=start + timedelta(days=self.random.randint(7, 60)),
+                status=self.random.choice(EVENT_STATUSES),
+            ))
+        self.events = self._bulk_create(CompetitionEvent, events)
+        self.events_by_competition = {}
+        for event in self.events:
+            self.events_by_competition.setdefault(event.competition_id, []).append(event)
+
+    def _create_teams(self):
+        total = self.volumes['teams']
+        per_event = max(-(-total // len(self.events)), 1)
+
+        teams = []
+        for event in self.events:
+            if len(teams) >= total:
+                break
+            # 同一赛事下队长不可重复
+            for leader in self.random.sample(self.students, min(per_event, len(self.students), total - len(teams))):
+                status = self.random.choice(TEAM_STATUSES)
+                has_cert = status in ('shortlisted', 'awarded')
+                teams.append(Team(
+                    event=event,
+                    name=f'{leader.username[-4:]}队-{event.pk}',
+                    leader=leader,
+                    status=status,
+                    applied_award_level=self.random.choice(AWARD_LEVELS) if has_cert else None,
+                    temp_cert_no=f'T{event.pk:06d}{leader.pk:08d}' if has_cert else None,
+                ))
+        teams = self._bulk_create(Team, teams)
+
+        member_rows = []
+        teacher_rows = []
+        for team in teams:
+            for member in self._sample(self.students, 0, 3):
+                if member.pk != team.leader_id:
+                    member_rows.append(Team.members.through(team_id=team.pk, user_id=member.pk))
+            for teacher in self._sample(self.teachers, 0, 2):
+                teacher_rows.append(Team.teachers.through(team_id=team.pk, user_id=teacher.pk))
+        self._bulk_create(Team.members.through, member_rows)
+        self._bulk_create(Team.teachers.through, teacher_rows)
+        self.teams = teams
+
+    def _create_certificates(self):
+        storage = Certificate._meta.get_field('image_uri').storage
+        certificates = []
+        for i in range(min(self.volumes['certificates'], self.volumes['awards'])):
+            cert = Certificate(
+                id=uuid.UUID(int=self.random.getrandbits(128), version=4),
+                cert_no=f'SYN{self.seed}-{i + 1:08d}',
+            )
+            name = certificate_upload_path(cert, 'certificate.png')
+            # 无论是否写文件都抽取颜色，保证随机序列一致
+            rgb = (self.random.randrange(256), self.random.randrange(256), self.random.randrange(256))
+            if self.write_files:
+                name = storage.save(name, ContentFile(tiny_png(rgb)))
+                self.written_files.append(name)
+            cert.image_uri.name = name
+            certificates.append(cert)
+        self.certificates = self._bulk_create(Certificate, certificates)
+
+    def _create_awards(self):
+        certificates = iter(self.certificates)
+        awards = []
+        for _ in range(self.volumes['awards']):
+            competition = self.random.choice(self.competitions)
+            events = self.events_by_competition.get(competition.pk)
+            awards.append(Award(
+                competition=competition,
+                event=self.random.choice(events) if events else None,
+                award_level=self.random.choice(AWARD_LEVELS),
+                award_date=date(competition.year, 1, 1) + timedelta(days=self.random.randint(0, 364)),
+                certificate=next(certificates, None),
+                creator=self.random.choice(self.admins),
+            ))
+        awards = self._bulk_create(Award, awards)
+
+        participant_rows = []
+        instructor_rows = []
+        for award in awards:
+            for user in self._sample(self.students, 1, 3):
+                participant_rows.append(Award.participants.through(award_id=award.pk, user_id=user.pk))
+            for user in self._sample(self.teachers, 0, 2):
+                instructor_rows.append(Award.instructors.through(award_id=award.pk, user_id=user.pk))
+        self._bulk_create(Award.participants.through, participant_rows)
+        self._bulk_create(Award.instructors.through, instructor_rows)
+
+    def _create_applications(self):
+        applications = []
+        for i in range(self.volumes['applications']):
+            applicant = self.random.choice(self.students)
+            competition = self.random.choice(self.competitions)
+            participants = [applicant] + self._sample(self.students, 0, 2)
+            instructors = self._sample(self.teachers, 0, 2)
+            applications.append(AwardApplication(
+                applicant=applicant,
+                cert_image=f'temp/apply/synthetic/{i + 1}.png',
+                cert_no=f'A{i + 1:08d}',
+                award_level=self.random.choice(AWARD_LEVELS),
+                award_date=date(competition.year, 6, 1),
+                payload={
+                    'comp_title': competition.title,
+                    'year': competition.year,
+                    'category_id': competition.category_id,
+                    'level_id': competition.level_id,
+                    'participant_ids': list(dict.fromkeys(user.user_id for user in participants)),
+                    'instructor_ids': [user.user_id for user in instructors],
+                },
+                status=self.random.choices(['pending', 'approved', 'rejected'], weights=[6, 3, 1])[0],
+            ))
+        self._bulk_create(AwardApplication, applications)
+
+    def _create_notifications(self):
+        User = get_user_model()
+        user_type = ContentType.objects.db_manager(self.using).get_for_model(User)
+        team_type = ContentType.objects.db_manager(self.using).get_for_model(Team)
+
+        notifications = []
+        for _ in range(self.volumes['notifications']):
+            team = self.random.choice(self.teams)
+            notifications.append(Notification(
+                recipient_id=team.leader_id,
+                actor_content_type=user_type,
+                actor_object_id=self.random.choice(self.admins).pk,
+                verb=f'您的团队“{team.name}”状态已更新。',
+                target_content_type=team_type,
+                target_object_id=team.pk,
+                unread=self.random.random() < 0.4,
+                timestamp=self.base_time - timedelta(minutes=self.random.randint(0, 500000)),
+            ))
+        self._bulk_create(Notification, notifications)
+
+    def _rebuild_indexes(self):
+        self.counts['sys_user_award_index'] = rebuild_user_award_index(using=self.using)
+        self.counts['sys_award_conflict_key'] = rebuild_conflict_keys(using=self.using)
+        rebuild_profile_search(Profile.objects.using(self.using).all(), using=self.using)
+        rebuild_competition_search(Competition.objects.using(self.using).all(), using=self.using)
+        rebuild_award_search(Award.objects.using(self.using).all(), using=self.using)
+        # 团队为 bulk_create，赛事实时统计统一计算一次
+        reconcile_event_counters(using=self.using)
@@ -0,0 +1,1126 @@
+"""
+接口查询次数与耗时预算
+
+对每个 app 的 urls.py 中的每条路由发起一次有代表性的请求：
+- 断言 SQL 查询次数不超过预算（CaptureQueriesContext），序列化器出现 N+1 时查询数随数据量增长，直接导致测试失败
+- 记录多次请求的耗时分位数，写入 JSON 报告，便于在不同提交之间 diff
+
+环境变量：
+    PERF_SCALE   数据规模，相对 synthetic.DEFAULT_VOLUMES 的比例，默认 0.01；
+                 PERF_SCALE=1 即 2 万用户 / 200 竞赛 / 2000 赛事 / 2 万团队 / 5 万获奖
+    PERF_RUNS    每条路由的请求次数，默认 5
+    PERF_REPORT  报告输出路径；未设置时不写报告，只断言查询预算
+
+运行：python manage.py test competitionManagementSys
+输出报告：PERF_REPORT=perf_report.json python manage.py test competitionManagementSys
+"""
+import io
+import json
+import os
+import pstats
+import re
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .factories import create_admin, create_competition, create_user, create_users
+from .metrics import fingerprint, registry
+from .synthetic import DEFAULT_PASSWORD, SyntheticDataset
+
+PERF_SCALE = float(os.environ.get('PERF_SCALE', '0.01'))
+PERF_RUNS = int(os.environ.get('PERF_RUNS', '5'))
+PERF_REPORT = os.environ.get('PERF_REPORT')
+
+# 不参与预算的 URL 前缀（Django admin 与静态文件）
+SKIPPED_PREFIXES = ('admin/', '^media/')
+
+
+def route_key(pattern):
+    """
+    将路由正则/路径转换为可读的 key
+    'award/^infos/(?P<pk>[^/.]+)/$' -> 'award/infos/<pk>/'
+    'user/users/<int:user_id>/'     -> 'user/users/<user_id>/'
+    """
+    key = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', pattern)
+    key = re.sub(r'<\w+:(\w+)>', r'<\1>', key)
+    return key.replace('^', '').replace('$', '')
+
+
+def iter_route_keys(patterns=None, prefix=''):
+    """遍历项目的全部路由，跳过 admin、静态文件以及 DRF 的 .json 等格式后缀路由"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        full = prefix + str(pattern.pattern)
+        if full.startswith(SKIPPED_PREFIXES):
+            continue
+        if isinstance(pattern, URLResolver):
+            yield from iter_route_keys(pattern.url_patterns, full)
+        elif '<format>' not in route_key(full):
+            yield route_key(full)
+
+
+class Budget:
+    """
+    单条路由的预算
+    user 为 fixtures 中的用户名（None 表示匿名），kwargs/params/data 可以是返回对应值的函数（参数为 fixtures）
+    """
+
+    def __init__(self, max_queries, method='get', user='student', kwargs=None, params=None, data=None, status=200):
+        self.max_queries = max_queries
+        self.method = method
+        self.user = user
+        self.kwargs = kwargs
+        self.params = params
+        self.data = data
+        self.status = status
+
+    @staticmethod
+    def resolve(value, fixtures):
+        return value(fixtures) if callable(value) else value
+
+    def build_url(self, key, fixtures):
+        kwargs = self.resolve(self.kwargs, fixtures) or {}
+        return '/' + re.sub(r'<(\w+)>', lambda m: str(kwargs[m.group(1)]), key)
+
+
+BUDGETS = {
+    # --- userManage ---
+    'user/register/': Budget(12, 'post', user='admin', status=201, data=lambda f: {
+        'user_id': '80000000001', 'username': 'perf-register', 'password': 'pass123456',
+        're_password': 'pass123456', 'real_name': '性能测试', 'department': '计算机学院',
+        'role_names': ['Student'],
+    }),
+    'user/login/': Budget(3, 'post', user=None, data=lambda f: {
+        'user_id': f['student'].user_id, 'password': DEFAULT_PASSWORD,
+    }),
+    'user/token/refresh/': Budget(1, 'post', user=None, data=lambda f: {
+        'refresh': str(RefreshToken.for_user(f['student'])),
+    }),
+    'user/users/': Budget(3, user='admin'),
+    'user/users/<user_id>/': Budget(3, user='admin', kwargs=lambda f: {'user_id': f['student'].user_id}),
+    'user/menu/': Budget(3),
+    'user/change-password/': Budget(1, 'put', data={
+        'old_password': DEFAULT_PASSWORD, 'new_password': 'pass654321', 'confirm_password': 'pass654321',
+    }),
+    'user/statistic/': Budget(3, user='admin'),
+    'user/roles/': Budget(1, user='admin'),
+
+    # --- userProfile ---
+    'user-profile/view/': Budget(4),
+    'user-profile/search/': Budget(3, user='admin', params=lambda f: {'q': f['profile'].real_name[:1]}),
+    'user-profile/by-user-id/<user_id>/': Budget(3, kwargs=lambda f: {'user_id': f['teacher'].user_id}),
+
+    # --- competitions ---
+    'comp/': Budget(0),
+    'comp/info/': Budget(1),
+    'comp/info/<pk>/': Budget(1, kwargs=lambda f: {'pk': f['competition'].pk}),
+    'comp/levels/': Budget(1),
+    'comp/levels/<pk>/': Budget(1, kwargs=lambda f: {'pk': f['level'].pk}),
+    'comp/categories/': Budget(1),
+    'comp/categories/<pk>/': Budget(1, kwargs=lambda f: {'pk': f['category'].pk}),
+    'comp/async/levels/': Budget(2),
+    'comp/async/categories/': Budget(2),
+    'comp/events/': Budget(2),
+    'comp/events/<pk>/': Budget(2, kwargs=lambda f: {'pk': f['registration_event'].pk}),
+    'comp/events/<pk>/next-stage/': Budget(12, 'post', user='admin',
+                                          kwargs=lambda f: {'pk': f['registration_event'].pk}),
+    'comp/events/<pk>/archive/': Budget(30, 'post', user='admin',
+                                        kwargs=lambda f: {'pk': f['awarding_event'].pk}),
+    # 一键转换批量写入证书、获奖记录、人员与通知，查询次数与入围团队数无关
+    'comp/events/<pk>/convert-awards/': Budget(24, 'post', user='admin',
+                                               kwargs=lambda f: {'pk': f['awarding_event'].pk}),
+    'comp/events/<pk>/set-status/': Budget(6, 'post', user='admin', data={'status': 'ongoing'},
+                                           kwargs=lambda f: {'pk': f['registration_event'].pk}),
+
+    # --- certificate ---
+    'cert/': Budget(0),
+    'cert/infos/': Budget(1),
+    'cert/infos/<pk>/': Budget(1, kwargs=lambda f: {'pk': f['certificate'].pk}),
+
+    # --- award ---
+    'award/': Budget(0),
+    'award/infos/': Budget(7, params={'user_id': 'me'}),
+    'award/infos/<pk>/': Budget(7, kwargs=lambda f: {'pk': f['award'].pk}),
+    'award/report/': Budget(4, user='admin', params={'group_by': 'student', 'start_date': '2025-01-01'}),
+    'award/statistics/': Budget(10, user='admin'),
+
+    # --- apply ---
+    'apply/': Budget(0),
+    'apply/award-apply/': Budget(2),
+    'apply/award-apply/<pk>/': Budget(2, kwargs=lambda f: {'pk': f['application'].pk}),
+    'apply/award-approve/': Budget(2, user='admin'),
+    'apply/award-approve/<pk>/': Budget(2, user='admin', kwargs=lambda f: {'pk': f['application'].pk}),
+    'apply/award-approve/batch-reject/': Budget(8, 'post', user='admin',
+                                                data=lambda f: {'ids': f['pending_application_ids']}),
+    'apply/award-approve/<pk>/do_reject/': Budget(8, 'post', user='admin',
+                                                  kwargs=lambda f: {'pk': f['application'].pk}),
+
+    # --- notification ---
+    'notification/': Budget(0),
+    'notification/info/': Budget(5),
+    'notification/info/unread-count/': Budget(1),
+    'notification/info/mark-all-as-read/': Budget(1, 'post'),
+    'notification/info/<pk>/': Budget(4, 'patch', data={'unread': False},
+                                      kwargs=lambda f: {'pk': f['notification'].pk}),
+    'notification/info/<pk>/mark-as-read/': Budget(4, 'post', kwargs=lambda f: {'pk': f['notification'].pk}),
+    # 异步接口比 DRF 版本多一次按 JWT 读取用户的查询
+    'notification/async/unread-count/': Budget(2),
+    'notification/async/list/': Budget(6),
+
+    # --- team ---
+    'team/': Budget(0),
+    'team/info/': Budget(10),
+    'team/info/<pk>/': Budget(10, kwargs=lambda f: {'pk': f['draft_team'].pk}),
+    'team/info/my-participation/': Budget(2, params=lambda f: {
+        'events': ','.join(str(event.pk) for event in f['events'][:20]),
+    }),
+    'team/async/my-participation/': Budget(3, params=lambda f: {
+        'events': ','.join(str(event.pk) for event in f['events'][:20]),
+    }),
+    'team/info/export-works/': Budget(4, user='admin', params=lambda f: {'event_id': f['awarding_event'].pk}),
+    'team/info/bulk-review-shortlist/': Budget(12, 'post', user='admin',
+                                               data=lambda f: {'approve': f['submitted_team_ids']}),
+    'team/info/<pk>/review-shortlist/': Budget(14, 'post', user='admin', data={'action': 'approve'},
+                                               kwargs=lambda f: {'pk': f['submitted_team_ids'][0]}),
+    'team/info/<pk>/review-award/': Budget(27, 'post', user='admin', data={'action': 'award'},
+                                           kwargs=lambda f: {'pk': f['shortlisted_team'].pk}),
+    'team/info/<pk>/reset-to-draft/': Budget(14, 'post', user='admin',
+                                             kwargs=lambda f: {'pk': f['ended_team'].pk}),
+    'team/info/<pk>/submit-registration/': Budget(11, 'post', kwargs=lambda f: {'pk': f['draft_team'].pk}),
+    'team/info/<pk>/update-info/': Budget(12, 'patch', data={'name': '性能测试队'},
+                                          kwargs=lambda f: {'pk': f['draft_team'].pk}),
+
+    # --- 监控 ---
+    'metrics': Budget(0, user='admin'),
+    'profiles': Budget(0, user='admin'),
+}
+
+# 不做预算的路由及原因；新增路由必须出现在 BUDGETS 或这里，否则测试失败
+UNBUDGETED = {
+    'apply/award-approve/batch-approve/': '需要真实的证书文件，由审批流程的功能测试覆盖',
+    'apply/award-approve/<pk>/do_approve/': '需要真实的证书文件，由审批流程的功能测试覆盖',
+    'team/info/<pk>/upload-files/': 'multipart 文件上传，耗时主要取决于文件大小',
+    'profiles/<name>': '下载本地分析文件，不访问数据库',
+}
+
+
+def shared_cache(testcase):
+    """
+    进程间共享的缓存：临时目录中的文件缓存，测试结束后删除
+    默认的 LocMemCache 下副本路由与压缩结果缓存不启用，测试这两项功能时使用
+    """
+    directory = tempfile.TemporaryDirectory()
+    testcase.addCleanup(directory.cleanup)
+    return override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name},
+    })
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+# 改密码等接口的密码哈希本身就超过慢请求阈值，耗时已记录在报告中，不再输出慢请求日志
+@override_settings(METRICS_SLOW_REQUEST_MS=60_000)
+class EndpointBudgetTests(TestCase):
+    """每条路由的查询次数预算与耗时记录"""
+
+    report = {}
+
+    @classmethod
+    def setUpClass(cls):
+        # 作品与证书附件写入临时目录：导出作品、评奖与一键转换需要读取真实文件
+        media = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth import get_user_model
+        from apply.models import AwardApplication
+        from award.models import Award
+        from certificate.models import Certificate
+        from competitions.models import CompetitionCategory, CompetitionEvent, CompetitionLevel
+        from team.models import Team
+
+        started = time.perf_counter()
+        dataset = SyntheticDataset(scale=PERF_SCALE, seed=2024)
+        cls.volumes = dataset.generate()
+        cls.seed_seconds = time.perf_counter() - started
+
+        User = get_user_model()
+        admin = User.objects.get(pk=dataset.users[0].pk)
+
+        # 选取互不相同的赛事下的团队，并把它们调整到各个接口需要的状态
+        teams = []
+        seen_events = set()
+        for team in Team.objects.select_related('leader').order_by('id'):
+            if team.event_id not in seen_events:
+                seen_events.add(team.event_id)
+                teams.append(team)
+            if len(teams) == 4:
+                break
+        draft_team, submitted_team, shortlisted_team, ended_team = teams
+
+        Team.objects.filter(pk=draft_team.pk).update(status='draft')
+        CompetitionEvent.objects.filter(pk=draft_team.event_id).update(status='registration')
+        submitted_team_ids = list(
+            Team.objects.filter(event_id=submitted_team.event_id).values_list('id', flat=True)[:5]
+        )
+        Team.objects.filter(pk__in=submitted_team_ids).update(status='submitted')
+        # 评奖阶段的赛事：若干入围团队带作品与完整的证书信息，供导出作品、终审评奖与一键转换使用
+        CompetitionEvent.objects.filter(pk=shortlisted_team.event_id).update(status='awarding')
+        storage = Team._meta.get_field('works').storage
+        for team in Team.objects.filter(event_id=shortlisted_team.event_id).order_by('id')[:5]:
+            Team.objects.filter(pk=team.pk).update(
+                status='shortlisted', converted_award=None, applied_award_level='一等奖',
+                temp_cert_no=f'PERF-{team.pk:08d}',
+                works=storage.save(f'temp/team_works/{team.pk}.zip', ContentFile(b'works')),
+                attachment=storage.save(f'temp/temp_certs/{team.pk}.png', ContentFile(b'png')),
+            )
+        Team.objects.filter(pk=ended_team.pk).update(status='ended')
+        CompetitionEvent.objects.filter(pk=ended_team.event_id).update(status='ongoing')
+
+        student = draft_team.leader
+        application = AwardApplication.objects.order_by('id').first()
+        AwardApplication.objects.filter(pk=application.pk).update(applicant=student, status='pending')
+        pending_application_ids = list(
+            AwardApplication.objects.filter(status='pending').values_list('id', flat=True)[:5]
+        )
+
+        award = Award.objects.order_by('id').first()
+        award.participants.add(student)
+
+        certificate = Certificate.objects.order_by('cert_no').first()
+
+        notification = student.notifications.order_by('id').first()
+        if notification is None:
+            from notification.utils import bulk_notify
+            notification = bulk_notify(admin, [(student.pk, '性能测试通知', None)])[0]
+
+        cls.fixtures = {
+            'admin': admin,
+            'student': student,
+            'teacher': User.objects.get(pk=dataset.teachers[0].pk),
+            'profile': student.profile,
+            'competition': dataset.competitions[0],
+            'category': CompetitionCategory.objects.order_by('id').first(),
+            'level': CompetitionLevel.objects.order_by('id').first(),
+            'events': dataset.events,
+            'registration_event': CompetitionEvent.objects.get(pk=draft_team.event_id),
+            'awarding_event': CompetitionEvent.objects.get(pk=shortlisted_team.event_id),
+            'certificate': certificate,
+            'award': award,
+            'application': application,
+            'pending_application_ids': pending_application_ids,
+            'notification': notification,
+            'draft_team': draft_team,
+            'submitted_team_ids': submitted_team_ids,
+            'shortlisted_team': shortlisted_team,
+            'ended_team': ended_team,
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if PERF_REPORT and cls.report:
+            with open(PERF_REPORT, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'scale': PERF_SCALE,
+                    'runs': PERF_RUNS,
+                    'volumes': cls.volumes,
+                    'seed_seconds': round(cls.seed_seconds, 2),
+                    'routes': dict(sorted(cls.report.items())),
+                }, f, ensure_ascii=False, indent=2)
+
+    def _request(self, key, budget, user):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+            # 异步接口不经过 DRF，按真实请求携带 JWT（DRF 接口仍以 force_authenticate 为准）
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        url = budget.build_url(key, self.fixtures)
+        method = getattr(client, budget.method)
+        params = budget.resolve(budget.params, self.fixtures)
+        data = budget.resolve(budget.data, self.fixtures)
+        if budget.method == 'get':
+            return method(url, params)
+        return method(url, data, format='json')
+
+    def _measure(self, key, budget):
+        """
+        执行 PERF_RUNS 次请求，每次都在 savepoint 中执行并回滚，写接口可重复测量
+        查询次数取最后一次（进程内缓存已预热）的结果
+        """
+        timings = []
+        for _ in range(PERF_RUNS):
+            # 每次请求重新取出用户，避免上一次请求对内存中对象的修改（如改密码）影响下一次
+            user = None
+            if budget.user:
+                user = type(self.fixtures[budget.user]).objects.get(pk=self.fixtures[budget.user].pk)
+            sid = transaction.savepoint()
+            try:
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    response = self._request(key, budget, user)
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                transaction.savepoint_rollback(sid)
+        return response, len(ctx), timings
+
+    def test_every_route_is_budgeted(self):
+        routes = set(iter_route_keys())
+        missing = sorted(routes - set(BUDGETS) - set(UNBUDGETED))
+        stale = sorted((set(BUDGETS) | set(UNBUDGETED)) - routes)
+        self.assertEqual(missing, [], '以下路由缺少查询预算')
+        self.assertEqual(stale, [], '以下预算对应的路由已不存在')
+
+    def test_query_budgets(self):
+        for key, budget in BUDGETS.items():
+            with self.subTest(route=key):
+                response, queries, timings = self._measure(key, budget)
+                type(self).report[key] = {
+                    'method': budget.method.upper(),
+                    'status': response.status_code,
+                    'queries': queries,
+                    'max_queries': budget.max_queries,
+                    'p50_ms': round(statistics.median(timings), 2),
+                    'p95_ms': round(percentile(timings, 95), 2),
+                    'p99_ms': round(percentile(timings, 99), 2),
+                    'max_ms': round(max(timings), 2),
+                }
+                self.assertEqual(response.status_code, budget.status, getattr(response, 'data', None))
+                self.assertLessEqual(queries, budget.max_queries, f'{key} 查询次数超出预算')
+
+
+class SeedSyntheticCommandTests(TestCase):
+    """seed_synthetic 命令：是否写文件不影响生成的数据，失败回滚时删除已写入的证书文件"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def seed(self, *args):
+        call_command('seed_synthetic', '--scale', '0.001', *args, stdout=io.StringIO())
+
+    def files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def snapshot(self, *args):
+        """生成一次数据并记录与主键无关的内容，随后回滚"""
+        from apply.models import AwardApplication
+        from award.models import Award
+        from notifications.models import Notification
+
+        with transaction.atomic():
+            self.seed(*args)
+            data = (
+                list(Award.objects.order_by('id').values_list('award_level', 'award_date', 'certificate__cert_no')),
+                list(AwardApplication.objects.order_by('id').values_list('cert_no', 'status', 'payload')),
+                list(Notification.objects.order_by('id').values_list('verb', 'unread', 'timestamp')),
+            )
+            transaction.set_rollback(True)
+        return data
+
+    def test_skip_files_gives_same_data(self):
+        self.assertEqual(self.snapshot('--skip-files'), self.snapshot())
+
+    def test_files_written(self):
+        from certificate.models import Certificate
+
+        self.seed()
+        self.assertEqual(len(self.files()), Certificate.objects.count())
+        # 已有合成数据时拒绝重复生成，且不留下新文件
+        files = self.files()
+        with self.assertRaisesMessage(CommandError, '已存在合成数据'):
+            self.seed()
+        self.assertEqual(self.files(), files)
+
+    def test_failure_removes_files(self):
+        from certificate.models import Certificate
+
+        with mock.patch.object(SyntheticDataset, '_create_notifications', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.seed()
+        self.assertFalse(Certificate.objects.exists())
+        self.assertEqual(self.files(), [])
+
+
+class RequestMetricsTests(TestCase):
+    """请求指标中间件与 /metrics 接口"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin(groups=())
+        cls.student = create_user('10000000002', 'student', groups=('Student',))
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) AND "a"."name" = \'x\' LIMIT 21'),
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) AND "a"."name" = ? LIMIT ?'
+        )
+        self.assertEqual(
+            fingerprint('INSERT INTO "a" ("x", "y") VALUES (%s, %s), (%s, %s), (%s, %s)'),
+            'INSERT INTO "a" ("x", "y") VALUES (?, ?), ...'
+        )
+
+    def test_server_timing_header(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/comp/levels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+')
+
+    def test_metrics_is_admin_only(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_metrics_prometheus_output(self):
+        self.client.force_authenticate(self.student)
+        self.client.get('/comp/levels/')
+        self.client.get('/comp/levels/')
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="competitionlevel-list",method="GET"} 2', body)
+        self.assertIn('http_responses_total{view="competitionlevel-list",method="GET",status="200"} 2', body)
+        self.assertIn('db_query_calls_total{view="competitionlevel-list",method="GET",fingerprint="SELECT', body)
+
+    def test_streaming_response(self):
+        # 流式列表的分块查询在视图返回后才执行，发送结束后连同序列化耗时一起计入
+        from award.models import Award
+
+        competition = create_competition()
+        for user in create_users(3, prefix='100000000'):
+            Award.objects.create(competition=competition, award_level='一等奖', award_date='2024-06-01').participants.add(user)
+        self.client.force_authenticate(self.admin)
+        for path, view in [('/user/users/?stream=1', 'user_list'), ('/award/infos/?stream=1', 'award-list')]:
+            with self.subTest(path), mock.patch('competitionManagementSys.streaming.StreamingListMixin.stream_chunk_size', 2):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(path)
+                    self.assertNotIn((view, 'GET'), registry.views)
+                    header_queries = int(re.search(r'"(\d+) queries"', response['Server-Timing']).group(1))
+                    b''.join(response.streaming_content)
+
+                stats = registry.views[(view, 'GET')]
+                self.assertEqual(stats.count, 1)
+                self.assertEqual(stats.queries, len(ctx.captured_queries))
+                self.assertGreater(stats.queries, header_queries)
+                self.assertGreater(stats.serializer_time, 0)
+
+
+class ProfilingTests(TestCase):
+    """按需性能分析中间件与 /profiles 接口"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin(groups=())
+        cls.student = create_user('10000000002', 'student', groups=('Student',))
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        settings_override = override_settings(PROFILING_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+    def authorize(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def test_not_triggered_without_flag(self):
+        self.authorize(self.admin)
+        response = self.client.get('/comp/levels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_ignored_for_non_admin(self):
+        self.authorize(self.student)
+        response = self.client.get('/comp/levels/', HTTP_X_PROFILE='cprofile')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_cprofile(self):
+        self.authorize(self.admin)
+        response = self.client.get('/comp/levels/', HTTP_X_PROFILE='cprofile')
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        self.assertRegex(name, r'-GET-competitionlevel-list-\d+ms\.prof$')
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertTrue(stats.total_calls > 0)
+
+    def test_sample_and_listing(self):
+        self.authorize(self.admin)
+        response = self.client.get('/comp/levels/?_profile=sample')
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Profile-Id']
+        self.assertTrue(name.endswith('.collapsed'))
+
+        response = self.client.get('/profiles')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['name'], name)
+        self.assertEqual(response.data[0]['mode'], 'sample')
+        self.assertEqual(response.data[0]['view'], 'competitionlevel-list')
+
+        response = self.client.get(f'/profiles/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/profiles/..%2Fdb.sqlite3').status_code, 404)
+
+    def test_listing_is_admin_only(self):
+        self.authorize(self.student)
+        self.assertEqual(self.client.get('/profiles').status_code, 403)
+
+
+class DatabaseProfileTests(TestCase):
+    """SQLite 连接初始化（settings.SQLITE_PRAGMAS）"""
+
+    def pragma(self, cursor, name):
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('仅适用于 SQLite')
+        with connection.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'synchronous'), 1)  # NORMAL
+            self.assertEqual(self.pragma(cursor, 'busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+            self.assertEqual(self.pragma(cursor, 'cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_file_database_uses_wal(self):
+        import tempfile
+
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        if connection.vendor != 'sqlite':
+            self.skipTest('仅适用于 SQLite')
+        with tempfile.TemporaryDirectory() as tmp:
+            wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(tmp, 'wal.sqlite3')}, 'wal')
+            try:
+                with wrapper.cursor() as cursor:
+                    self.assertEqual(self.pragma(cursor, 'journal_mode'), 'wal')
+                    self.assertEqual(self.pragma(cursor, 'mmap_size'), settings.SQLITE_PRAGMAS['mmap_size'])
+            finally:
+                wrapper.close()
+
+
+class QueryPlanTests(TestCase):
+    """热点查询的执行计划必须命中对应的复合/部分索引（SQLite EXPLAIN QUERY PLAN）"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth import get_user_model
+
+        cls.user = get_user_model().objects.create_user(user_id='10000000001', username='user', password='pass123')
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('执行计划断言基于 SQLite')
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index}', plan)
+        self.assertNotIn('USE TEMP B-TREE', plan, '排序未能利用索引')
+
+    def test_team_event_status(self):
+        from team.models import Team
+
+        self.assertUsesIndex(Team.objects.filter(event_id=1, status='shortlisted'), 'team_event_status_idx')
+
+    def test_award_date_range_and_ordering(self):
+        from award.models import Award
+
+        self.assertUsesIndex(
+            Award.objects.filter(award_date__gte='2024-01-01', award_date__lte='2024-12-31'), 'award_date_idx'
+        )
+        self.assertUsesIndex(Award.objects.all()[:20], 'award_date_idx')
+
+    def test_application_applicant_status(self):
+        from apply.models import AwardApplication
+
+        self.assertUsesIndex(
+            AwardApplication.objects.filter(applicant=self.user, status='pending'), 'apply_applicant_status_idx'
+        )
+
+    def test_notification_list(self):
+        self.assertUsesIndex(self.user.notifications.all(), 'notif_recipient_ts_idx')
+
+    def test_notification_unread_count(self):
+        """有统计信息后，未读数使用只包含未读消息的部分索引"""
+        from django.contrib.contenttypes.models import ContentType
+        from notifications.models import Notification
+
+        actor_type = ContentType.objects.get_for_model(self.user)
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=self.user, actor_content_type=actor_type, actor_object_id=str(self.user.pk),
+                verb='通知', unread=(i % 20 == 0)
+            )
+            for i in range(400)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.user.notifications.unread().count(), 20)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {ctx.captured_queries[0]["sql"]}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('notif_recipient_unread_idx', plan)
+
+
+class ReplicaRoutingTests(TestCase):
+    """只读副本路由与读己之写"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth import get_user_model
+
+        cls.user = get_user_model().objects.create_user(user_id='10000000001', username='user', password='pass123')
+
+    def setUp(self):
+        from django.test import override_settings
+
+        # 测试环境没有第二个库，把副本别名指向 default，通过别名是否被设置来判断路由结果
+        for settings_override in (override_settings(REPLICA_DATABASE='default'), shared_cache(self)):
+            settings_override.enable()
+            self.addCleanup(settings_override.disable)
+        self.token = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+
+    def run_request(self, method, path, status=200):
+        from django.http import HttpResponse
+        from rest_framework.test import APIRequestFactory
+
+        from .middleware import ReplicaRoutingMiddleware
+        from .routers import current_read_alias
+
+        seen = []
+
+        def get_response(request):
+            seen.append(current_read_alias.get())
+            return HttpResponse(status=status)
+
+        request = getattr(APIRequestFactory(), method)(path, HTTP_AUTHORIZATION=self.token)
+        ReplicaRoutingMiddleware(get_response)(request)
+        self.assertIsNone(current_read_alias.get(), '请求结束后应恢复默认路由')
+        return seen[0]
+
+    def test_not_loaded_without_replica(self):
+        from django.core.exceptions import MiddlewareNotUsed
+        from django.test import override_settings
+
+        from .middleware import ReplicaRoutingMiddleware
+
+        with override_settings(REPLICA_DATABASE=None):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicaRoutingMiddleware(lambda request: None)
+
+    def test_not_loaded_with_process_local_cache(self):
+        from django.core.exceptions import MiddlewareNotUsed
+        from django.test import override_settings
+
+        from .middleware import ReplicaRoutingMiddleware
+
+        # 进程内缓存无法在 worker 之间共享固定标记，不能保证读己之写
+        for backend in ('locmem.LocMemCache', 'dummy.DummyCache'):
+            caches = {'default': {'BACKEND': f'django.core.cache.backends.{backend}'}}
+            with override_settings(CACHES=caches), self.assertLogs('competitionManagementSys.middleware', 'WARNING'):
+                with self.assertRaises(MiddlewareNotUsed):
+                    ReplicaRoutingMiddleware(lambda request: None)
+
+    def test_router_follows_request_alias(self):
+        from award.models import Award
+
+        from .routers import ReplicaRouter, current_read_alias
+
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Award))
+        token = current_read_alias.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Award), 'replica')
+            self.assertEqual(router.db_for_write(Award), 'default')
+        finally:
+            current_read_alias.reset(token)
+
+    def test_read_only_actions_use_replica(self):
+        self.assertEqual(self.run_request('get', '/comp/levels/'), 'default')
+        self.assertEqual(self.run_request('get', '/award/statistics/'), 'default')
+        # 未声明的动作（详情）仍走主库
+        self.assertIsNone(self.run_request('get', '/comp/levels/1/'))
+
+    def test_pinned_to_primary_after_write(self):
+        self.run_request('post', '/comp/levels/', status=201)
+        self.assertIsNone(self.run_request('get', '/comp/levels/'))
+
+    def test_failed_write_does_not_pin(self):
+        self.run_request('post', '/comp/levels/', status=400)
+        self.assertEqual(self.run_request('get', '/comp/levels/'), 'default')
+
+
+class AsyncReadViewTests(TestCase):
+    """异步只读接口在 ASGI 请求链上运行：返回与 DRF 版本相同，认证失败同为 401，SQL 计入请求指标"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+
+        from competitions.models import Competition, CompetitionCategory, CompetitionEvent, CompetitionLevel
+        from notification.utils import bulk_notify
+        from team.models import Team
+
+        User = get_user_model()
+        cls.user = User.objects.create_user(user_id='10000000001', username='user', password='pass123')
+        cls.other = User.objects.create_user(user_id='10000000002', username='other', password='pass123')
+        level = CompetitionLevel.objects.create(name='国家级', description='A 类')
+        category = CompetitionCategory.objects.create(name='程序设计')
+        competition = Competition.objects.create(
+            title='蓝桥杯', year=2024, uri='https://example.com', category=category, level=level
+        )
+        now = timezone.now()
+        cls.events = [
+            CompetitionEvent.objects.create(competition=competition, name=str(i), start_time=now, end_time=now)
+            for i in range(2)
+        ]
+        team = Team.objects.create(event=cls.events[0], name='A', leader=cls.other)
+        team.members.add(cls.user)
+        bulk_notify(cls.other, [(cls.user.pk, f'通知{i}', team) for i in range(3)])
+
+    def setUp(self):
+        from django.test import AsyncClient
+
+        # AsyncClient 的请求头需按请求传入
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.async_client = AsyncClient()
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+    async def test_requires_authentication(self):
+        from django.test import AsyncClient
+
+        response = await AsyncClient().get('/notification/async/unread-count/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        response = await AsyncClient().get('/comp/async/levels/', headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    async def test_read_only(self):
+        response = await self.async_client.post('/comp/async/levels/', headers=self.headers)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_same_payload_as_sync_views(self):
+        from asgiref.sync import sync_to_async
+
+        pairs = [
+            ('/notification/async/unread-count/', '/notification/info/unread-count/'),
+            ('/notification/async/list/', '/notification/info/'),
+            ('/comp/async/levels/', '/comp/levels/'),
+            ('/comp/async/categories/', '/comp/categories/'),
+            (f'/team/async/my-participation/?event={self.events[0].pk}',
+             f'/team/info/my-participation/?event={self.events[0].pk}'),
+            (f'/team/async/my-participation/?events={self.events[0].pk},{self.events[1].pk}',
+             f'/team/info/my-participation/?events={self.events[0].pk},{self.events[1].pk}'),
+        ]
+        for async_path, sync_path in pairs:
+            response = await self.async_client.get(async_path, headers=self.headers)
+            expected = await sync_to_async(self.sync_client.get)(sync_path)
+            self.assertEqual(response.status_code, 200, async_path)
+            self.assertEqual(response.json(), expected.json(), async_path)
+
+        response = await self.async_client.get('/team/async/my-participation/?events=a', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': '赛事 ID 格式错误'})
+
+    async def test_queries_recorded_in_async_request(self):
+        # 查询在 sync_to_async 线程中执行，仍计入 Server-Timing：读取用户 + 通知 + actor/target 预取
+        response = await self.async_client.get('/notification/async/list/', headers=self.headers)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="4 queries"')
+
+    async def test_replica_routing_in_async_request(self):
+        from django.http import HttpResponse
+        from django.test import AsyncRequestFactory, override_settings
+
+        from .middleware import ReplicaRoutingMiddleware
+        from .routers import current_read_alias
+
+        seen = []
+
+        async def get_response(request):
+            seen.append(current_read_alias.get())
+            return HttpResponse()
+
+        with override_settings(REPLICA_DATABASE='default'), shared_cache(self):
+            middleware = ReplicaRoutingMiddleware(get_response)
+            await middleware(AsyncRequestFactory().get('/comp/async/levels/', headers=self.headers))
+            await middleware(AsyncRequestFactory().get('/comp/levels/1/', headers=self.headers))
+        self.assertEqual(seen, ['default', None])
+        self.assertIsNone(current_read_alias.get())
+
+    def test_hybrid_middleware_requires_both_paths(self):
+        from django.http import HttpResponse
+
+        from .middleware import HybridMiddleware
+
+        class SyncOnly(HybridMiddleware):
+            def handle(self, request):
+                return self.get_response(request)
+
+        # 只实现同步路径的子类在加载时即报错，而不是等到第一个 ASGI 请求
+        with self.assertRaises(TypeError):
+            SyncOnly(lambda request: HttpResponse())
+
+
+class ORJSONRendererTests(TestCase):
+    """orjson 渲染器/解析器与 DRF 默认实现输出一致；未安装 orjson 时即为默认实现"""
+
+    def sample(self):
+        import datetime
+        import decimal
+        import uuid
+
+        from django.utils.translation import gettext_lazy
+        from rest_framework.exceptions import ErrorDetail
+        from rest_framework.utils.serializer_helpers import ReturnDict
+
+        return ReturnDict({
+            'created_at': datetime.datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 5, 1, 8, 30),
+            'award_date': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 30, 15, 500000),
+            'certificate': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'score': decimal.Decimal('95.50'),
+            'label': gettext_lazy('Active'),
+            'errors': [ErrorDetail('必填项', code='required')],
+            'counts': {1: '一等奖', 2: '二等奖'},
+            'text': '行分隔符 段分隔符 ',
+            'big': 2 ** 70,
+        }, serializer=None)
+
+    def test_same_output_as_json_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from .renderers import ORJSONRenderer, dumps
+
+        data = self.sample()
+        expected = JSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+        self.assertEqual(dumps([data, None, 1.5]), JSONRenderer().render([data, None, 1.5]))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent_uses_stdlib(self):
+        from .renderers import ORJSONRenderer
+
+        content = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(content, b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        import io
+
+        from rest_framework.exceptions import ParseError
+
+        from .renderers import ORJSONParser
+
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"名称": [1, 2.5, null]}'.encode())), {'名称': [1, 2.5, None]})
+        self.assertEqual(
+            parser.parse(io.BytesIO('{"a": "é"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'}),
+            {'a': 'é'}
+        )
+        for body in [b'{"a": ', b'{"a": NaN}']:
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+    def test_fallback_without_orjson(self):
+        from unittest import mock
+
+        from rest_framework.renderers import JSONRenderer
+
+        from . import renderers
+
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.ORJSONRenderer().render(self.sample()), JSONRenderer().render(self.sample()))
+
+    def test_registered_for_api_views(self):
+        from django.contrib.auth import get_user_model
+
+        from .renderers import ORJSONRenderer
+
+        user = get_user_model().objects.create_user(user_id='10000000001', username='user', password='pass123')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/comp/levels/')
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        response = client.post('/user/login/', {'user_id': '10000000001', 'password': 'pass123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+class CompressionTests(TestCase):
+    """大体积 JSON 响应按 Accept-Encoding 压缩，相同内容复用缓存的压缩结果"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.payload = [{'id': i, 'name': f'第{i}届蓝桥杯', 'level': '国家级'} for i in range(2000)]
+
+    def run_middleware(self, response, accept_encoding='gzip, deflate'):
+        from django.test import RequestFactory
+
+        from .middleware import CompressionMiddleware
+
+        request = RequestFactory().get('/award/infos/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, data=None):
+        from django.http import JsonResponse
+        return JsonResponse(self.payload if data is None else data, safe=False)
+
+    def test_gzip(self):
+        import gzip
+
+        original = self.json_response().content
+        response = self.run_middleware(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(original) / 5)
+        self.assertEqual(gzip.decompress(response.content), original)
+
+    def test_negotiation(self):
+        from . import compression
+
+        self.assertIsNone(compression.choose_encoding(''))
+        self.assertIsNone(compression.choose_encoding('identity'))
+        self.assertIsNone(compression.choose_encoding('gzip;q=0, br;q=0'))
+        self.assertEqual(compression.choose_encoding('deflate, *;q=0.5'), compression.available_encodings()[0])
+        self.assertEqual(compression.choose_encoding('br;q=0.5, gzip'), 'gzip')
+        if compression.brotli is not None:
+            self.assertEqual(compression.choose_encoding('gzip, br'), 'br')
+        else:
+            self.assertEqual(compression.choose_encoding('gzip, br'), 'gzip')
+
+    def test_skipped_responses(self):
+        import io
+
+        from django.http import FileResponse, HttpResponse
+
+        small = self.run_middleware(self.json_response({'a': 1}))
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+        not_accepted = self.run_middleware(self.json_response(), accept_encoding='')
+        self.assertFalse(not_accepted.has_header('Content-Encoding'))
+        self.assertEqual(not_accepted['Vary'], 'Accept-Encoding')
+
+        html = self.run_middleware(HttpResponse('x' * 10000))
+        self.assertFalse(html.has_header('Content-Encoding'))
+
+        stream = self.run_middleware(
+            FileResponse(io.BytesIO(b'x' * 10000), content_type='application/json')
+        )
+        self.assertFalse(stream.has_header('Content-Encoding'))
+
+        error = self.json_response()
+        error.status_code = 400
+        self.assertFalse(self.run_middleware(error).has_header('Content-Encoding'))
+
+    def test_precompressed_cache(self):
+        from unittest import mock
+
+        from django.test import override_settings
+
+        from . import compression
+
+        with override_settings(COMPRESSION_CACHE_MIN_SIZE=1024), shared_cache(self), \
+                mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.run_middleware(self.json_response())
+            second = self.run_middleware(self.json_response())
+            self.assertEqual(compress.call_count, 1)
+            self.assertEqual(first.content, second.content)
+
+            self.run_middleware(self.json_response(self.payload[:1000]))
+            self.assertEqual(compress.call_count, 2)
+
+    def test_no_cache_on_process_local_backend(self):
+        import gzip
+        from unittest import mock
+
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        from . import compression
+
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=caches, COMPRESSION_CACHE_MIN_SIZE=1024), \
+                mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.run_middleware(self.json_response())
+            second = self.run_middleware(self.json_response())
+            self.assertEqual(compress.call_count, 2)
+            self.assertEqual(gzip.decompress(first.content), gzip.decompress(second.content))
+            self.assertEqual(len(cache._cache), 0)
+
+    def test_api_response(self):
+        import gzip
+        import json
+
+        from django.contrib.auth import get_user_model
+        from django.test import override_settings
+
+        from competitions.models import CompetitionLevel
+
+        user = get_user_model().objects.create_user(user_id='10000000001', username='user', password='pass123')
+        CompetitionLevel.objects.bulk_create([CompetitionLevel(name=f'级别{i}') for i in range(20)])
+        client = APIClient()
+        client.force_authenticate(user)
+        with override_settings(COMPRESSION_MIN_SIZE=100):
+            response = client.get('/comp/levels/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 20)
+
+    async def test_async_response(self):
+        import gzip
+
+        from asgiref.sync import sync_to_async
+        from django.contrib.auth import get_user_model
+        from django.test import AsyncClient, override_settings
+
+        from competitions.models import CompetitionCategory
+
+        user = await get_user_model().objects.acreate(user_id='10000000001', username='user')
+        await CompetitionCategory.objects.abulk_create([CompetitionCategory(name=f'类别{i}') for i in range(20)])
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(user).access_token))()
+        with override_settings(COMPRESSION_MIN_SIZE=100):
+            response = await AsyncClient().get('/comp/async/categories/', headers={
+                'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip',
+            })
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('类别19'.encode(), gzip.decompress(response.content))
@@ -20,6 +20,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import MetricsView, ProfileDownloadView, ProfileListView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('user/', include('userManage.urls')),
@@ -30,6 +32,9 @@ urlpatterns = [
     path('apply/', include('apply.urls')),
     path('notification/', include('notification.urls')),
     path('team/', include('team.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('profiles', ProfileListView.as_view(), name='profile-list'),
+    path('profiles/<str:name>', ProfileDownloadView.as_view(), name='profile-download'),
 ]
 
 if settings.DEBUG:
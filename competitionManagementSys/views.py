@@ -0,0 +1,52 @@
+import os
+
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from userManage.permissions import IsAdmin
+from .metrics import registry
+from .profiling import FILENAME_RE, get_profiling_dir, list_profiles
+
+
+class MetricsView(APIView):
+    """
+    当前进程的请求指标，Prometheus 文本格式
+    GET /metrics
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileListView(APIView):
+    """
+    最近的按需性能分析文件
+    GET /profiles?limit=50
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        try:
+            limit = max(int(request.query_params.get('limit', 50)), 1)
+        except ValueError:
+            return Response({'detail': 'limit 必须是整数'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list_profiles(limit))
+
+
+class ProfileDownloadView(APIView):
+    """
+    下载性能分析文件（.prof 为 cProfile 统计，.collapsed 为采样调用栈）
+    GET /profiles/<name>
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request, name):
+        if not FILENAME_RE.match(name):
+            raise Http404
+        path = os.path.join(get_profiling_dir(), name)
+        if not os.path.isfile(path):
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
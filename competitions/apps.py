@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CompetitionsConfig(AppConfig):
     name = 'competitions'
+
+    def ready(self):
+        # 注册全文检索索引的同步信号
+        from . import signals  # noqa: F401
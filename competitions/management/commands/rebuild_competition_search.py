@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from award.models import Award
+from award.search import rebuild_index as rebuild_award_index
+from competitions.models import Competition
+from competitions.search import rebuild_index as rebuild_competition_index
+
+
+class Command(BaseCommand):
+    help = '全量重建竞赛与获奖记录的检索索引（批量导入数据或安装 pypinyin 后执行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='目标数据库别名')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            competitions = rebuild_competition_index(Competition.objects.using(using).all(), using=using)
+            awards = rebuild_award_index(Award.objects.using(using).all(), using=using)
+        self.stdout.write(self.style.SUCCESS(f'检索索引重建完成：竞赛 {competitions} 条，获奖记录 {awards} 条'))
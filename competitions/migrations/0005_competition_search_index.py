@@ -0,0 +1,80 @@
+import re
+from itertools import groupby
+
+from django.db import migrations
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不生成拼音词元
+    lazy_pinyin = None
+
+# 迁移是历史快照：表结构、分词/拼音规则与回填 SQL 都写在这里，不引用运行时的 competitions.search，
+# 后者之后的修改不会影响本迁移的执行结果
+
+CREATE_FTS_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS sys_competition_fts USING fts5('
+    'title, description, events, pinyin, tokenize="unicode61 remove_diacritics 2")'
+)
+INSERT_FTS_SQL = 'INSERT INTO sys_competition_fts (rowid, title, description, events, pinyin) VALUES (%s, %s, %s, %s, %s)'
+SELECT_COMPETITIONS_SQL = (
+    'SELECT c.id, c.title, c.description, e.name FROM sys_competition c '
+    'LEFT JOIN sys_competition_event e ON e.competition_id = c.id ORDER BY c.id, e.id'
+)
+
+CJK_RE = re.compile(r'([㐀-䶿一-鿿豈-﫿])')
+CJK_RUN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+PINYIN_MAX_SUFFIXES = 32
+
+
+def segment(text):
+    if not text:
+        return ''
+    return ' '.join(CJK_RE.sub(r' \1 ', text).split())
+
+
+def pinyin_tokens(*texts):
+    if lazy_pinyin is None:
+        return ''
+    tokens = []
+    for text in texts:
+        for run in CJK_RUN_RE.findall(text or ''):
+            full = lazy_pinyin(run)
+            initials = lazy_pinyin(run, style=Style.FIRST_LETTER)
+            for i in range(min(len(run), PINYIN_MAX_SUFFIXES)):
+                tokens.append(''.join(full[i:]))
+                tokens.append(''.join(initials[i:]))
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(CREATE_FTS_SQL)
+    with connection.cursor() as cursor:
+        cursor.execute(SELECT_COMPETITIONS_SQL)
+        rows = []
+        for (pk, title, description), group in groupby(cursor.fetchall(), key=lambda row: row[:3]):
+            event_names = [row[3] for row in group if row[3] is not None]
+            rows.append([
+                pk, segment(title), segment(description), segment(' '.join(event_names)),
+                pinyin_tokens(title, *event_names),
+            ])
+        cursor.executemany(INSERT_FTS_SQL, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS sys_competition_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0004_alter_competition_id_alter_competitioncategory_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+# 迁移是历史快照：团队状态取值与统计方式写在这里，不引用运行时的 team.counters，
+# 后者之后的修改不会影响本迁移的回填结果
+TEAM_STATUSES = ('draft', 'submitted', 'shortlisted', 'rejected', 'awarded', 'ended')
+COUNTER_FIELDS = [f'team_{status}_count' for status in TEAM_STATUSES] + ['participant_count', 'teacher_count']
+
+
+def populate_counters(apps, schema_editor):
+    using = schema_editor.connection.alias
+    CompetitionEvent = apps.get_model('competitions', 'CompetitionEvent')
+    Team = apps.get_model('team', 'Team')
+
+    counters = {
+        pk: dict.fromkeys(COUNTER_FIELDS, 0)
+        for pk in CompetitionEvent.objects.using(using).values_list('pk', flat=True)
+    }
+
+    teams = Team.objects.using(using).all()
+    for row in teams.values('event_id', 'status').annotate(n=models.Count('id')).order_by():
+        if row['event_id'] in counters and row['status'] in TEAM_STATUSES:
+            counters[row['event_id']][f'team_{row["status"]}_count'] = row['n']
+
+    # 参赛人数：队长与成员去重；指导老师人数：按用户去重
+    participants = set(teams.values_list('event_id', 'leader_id').iterator(chunk_size=5000))
+    participants.update(
+        Team.members.through.objects.using(using).values_list('team__event_id', 'user_id').iterator(chunk_size=5000)
+    )
+    teachers = set(
+        Team.teachers.through.objects.using(using).values_list('team__event_id', 'user_id').iterator(chunk_size=5000)
+    )
+    for field, pairs in (('participant_count', participants), ('teacher_count', teachers)):
+        for event_id, _ in pairs:
+            if event_id in counters:
+                counters[event_id][field] += 1
+
+    events = [CompetitionEvent(pk=pk, **values) for pk, values in counters.items()]
+    CompetitionEvent.objects.using(using).bulk_update(events, COUNTER_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competitions', '0005_competition_search_index'),
+        ('team', '0005_team_event_status_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_draft_count',
+            field=models.IntegerField(default=0, verbose_name='草稿团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_submitted_count',
+            field=models.IntegerField(default=0, verbose_name='待初筛团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_shortlisted_count',
+            field=models.IntegerField(default=0, verbose_name='入围团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_rejected_count',
+            field=models.IntegerField(default=0, verbose_name='初筛驳回团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_awarded_count',
+            field=models.IntegerField(default=0, verbose_name='获奖团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='team_ended_count',
+            field=models.IntegerField(default=0, verbose_name='参赛结束团队数'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='participant_count',
+            field=models.IntegerField(default=0, verbose_name='参赛人数(实时)'),
+        ),
+        migrations.AddField(
+            model_name='competitionevent',
+            name='teacher_count',
+            field=models.IntegerField(default=0, verbose_name='指导老师人数(实时)'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
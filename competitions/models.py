@@ -93,6 +93,18 @@ class CompetitionEvent(models.Model):
     final_participants_count = models.IntegerField(default=0, verbose_name="最终参赛人数(归档后)")
     final_winners_count = models.IntegerField(default=0, verbose_name="最终获奖人数(归档后)")
 
+    # --- 实时统计 (由 team.counters 在团队变更时同步维护，列表页无需再关联团队表计算) ---
+    # 各状态的团队数，字段名为 team_<Team.status>_count
+    team_draft_count = models.IntegerField(default=0, verbose_name="草稿团队数")
+    team_submitted_count = models.IntegerField(default=0, verbose_name="待初筛团队数")
+    team_shortlisted_count = models.IntegerField(default=0, verbose_name="入围团队数")
+    team_rejected_count = models.IntegerField(default=0, verbose_name="初筛驳回团队数")
+    team_awarded_count = models.IntegerField(default=0, verbose_name="获奖团队数")
+    team_ended_count = models.IntegerField(default=0, verbose_name="参赛结束团队数")
+    # 队长 + 成员去重后的人数、指导老师去重后的人数
+    participant_count = models.IntegerField(default=0, verbose_name="参赛人数(实时)")
+    teacher_count = models.IntegerField(default=0, verbose_name="指导老师人数(实时)")
+
     class Meta:
         db_table = 'sys_competition_event'
         verbose_name = "赛事场次"
@@ -0,0 +1,40 @@
+"""
+竞赛全文检索（竞赛名称、简介、赛事场次名称、拼音/首字母）
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from competitionManagementSys.fts import FtsIndex, pinyin_tokens
+
+competition_index = FtsIndex(
+    'sys_competition_fts',
+    ['title', 'description', 'events', 'pinyin'],
+    weights=[10.0, 1.0, 4.0, 6.0],
+)
+
+
+def _competition_values(competition, event_names):
+    return {
+        'title': competition.title,
+        'description': competition.description,
+        'events': ' '.join(event_names),
+        'pinyin': pinyin_tokens(competition.title, *event_names),
+    }
+
+
+def index_competition(competition, using=DEFAULT_DB_ALIAS):
+    """写入/刷新单个竞赛的索引（含其全部赛事场次名称）"""
+    event_names = list(competition.events.using(using).values_list('name', flat=True))
+    competition_index.upsert(competition.pk, _competition_values(competition, event_names), using=using)
+
+
+def remove_competition(competition_id, using=DEFAULT_DB_ALIAS):
+    competition_index.delete(competition_id, using=using)
+
+
+def rebuild_index(competitions, using=DEFAULT_DB_ALIAS):
+    """全量重建索引，返回写入的条数"""
+    rows = (
+        (c.pk, _competition_values(c, [e.name for e in c.events.all()]))
+        for c in competitions.prefetch_related('events').iterator(chunk_size=2000)
+    )
+    return competition_index.rebuild(rows, using=using)
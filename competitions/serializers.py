@@ -29,6 +29,13 @@ class CompetitionCategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+# CompetitionEvent 上的实时统计字段（team.counters 维护）
+LIVE_COUNTER_FIELDS = [
+    'team_draft_count', 'team_submitted_count', 'team_shortlisted_count', 'team_rejected_count',
+    'team_awarded_count', 'team_ended_count', 'participant_count', 'teacher_count',
+]
+
+
 class CompetitionEventSerializer(serializers.ModelSerializer):
     competition_title = serializers.ReadOnlyField(source='competition.title')
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -38,7 +45,8 @@ class CompetitionEventSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'competition', 'competition_title', 'name',
             'start_time', 'end_time', 'status', 'status_display',
-            'final_participants_count', 'final_winners_count'
+            'final_participants_count', 'final_winners_count',
+            *LIVE_COUNTER_FIELDS
         ]
-        # 将 status 加入只读，强制走模型默认值或后端逻辑
-        read_only_fields = ['status', 'final_participants_count', 'final_winners_count']
\ No newline at end of file
+        # 将 status 加入只读，强制走模型默认值或后端逻辑；实时统计由团队变更同步维护
+        read_only_fields = ['status', 'final_participants_count', 'final_winners_count', *LIVE_COUNTER_FIELDS]
\ No newline at end of file
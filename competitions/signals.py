@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Competition, CompetitionEvent
+from .search import index_competition, remove_competition
+
+
+@receiver(post_save, sender=Competition)
+def sync_competition_search_index(sender, instance, using, raw=False, **kwargs):
+    """竞赛新增/修改后刷新检索索引"""
+    if raw:
+        return
+    index_competition(instance, using=using)
+
+
+@receiver(post_delete, sender=Competition)
+def remove_competition_search_index(sender, instance, using, **kwargs):
+    remove_competition(instance.pk, using=using)
+
+
+@receiver(post_save, sender=CompetitionEvent)
+@receiver(post_delete, sender=CompetitionEvent)
+def sync_event_search_index(sender, instance, using, raw=False, update_fields=None, **kwargs):
+    """赛事场次名称也参与竞赛检索，场次变化时刷新所属竞赛的索引（仅修改状态等字段时跳过）"""
+    if raw or (update_fields is not None and not {'name', 'competition'} & set(update_fields)):
+        return
+    competition = Competition.objects.using(using).filter(pk=instance.competition_id).first()
+    if competition:
+        index_competition(competition, using=using)
@@ -1,3 +1,173 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from notifications.models import Notification
+from rest_framework.test import APIClient
+
+from award.models import Award
+from competitionManagementSys.factories import create_admin, create_competition, create_event, create_user, create_users
+from team.models import Team
+from .models import CompetitionEvent
+
+
+class CompetitionSearchTests(TestCase):
+    """竞赛 ?search= 全文检索：名称、简介、场次名称与拼音，索引随竞赛与场次变更同步"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('20000000000', groups=('Student',))
+        cls.lanqiao = create_competition('第十五届蓝桥杯', description='程序设计竞赛')
+        cls.acm = create_competition('程序设计大赛', description='蓝桥杯选拔')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def search(self, q):
+        response = self.client.get('/comp/info/', {'search': q})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [item['id'] for item in response.json()]
+
+    def test_ranking_and_pinyin(self):
+        # 名称命中排在简介命中之前
+        self.assertEqual(self.search('蓝桥'), [self.lanqiao.pk, self.acm.pk])
+        self.assertEqual(self.search('lqb'), [self.lanqiao.pk])
+        self.assertEqual(self.search('程序 大赛'), [self.acm.pk])
+
+    def test_index_follows_events(self):
+        event = create_event(self.acm, '春季选拔赛')
+        self.assertEqual(self.search('春季'), [self.acm.pk])
+        self.assertEqual(self.search('chunji'), [self.acm.pk])
+
+        event.delete()
+        self.assertEqual(self.search('春季'), [])
+
+        self.lanqiao.delete()
+        self.assertEqual(self.search('蓝桥'), [self.acm.pk])
+
+
+class EventArchiveTests(TestCase):
+    """归档赛事：统计正式参赛人数与获奖人数，写入赛事并删除团队"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.users = create_users(5)
+        cls.event = create_event(status='awarding')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_archive(self):
+        a, b, c, d, e = self.users
+        awarded = Team.objects.create(event=self.event, name='A', leader=a, status='awarded')
+        awarded.members.add(a, b)
+        Team.objects.create(event=self.event, name='B', leader=c, status='ended')
+        # 草稿团队不计入参赛人数
+        Team.objects.create(event=self.event, name='C', leader=d, status='draft')
+
+        award = Award.objects.create(competition=self.event.competition, event=self.event,
+                                     award_level='一等奖', award_date='2024-06-01')
+        award.participants.add(a, b)
+        # 其他赛事的获奖不计入
+        other = Award.objects.create(competition=self.event.competition, award_level='一等奖', award_date='2024-06-01')
+        other.participants.add(e)
+
+        response = self.client.post(f'/comp/events/{self.event.pk}/archive/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.json()['participants'], response.json()['winners']), (3, 2))
+
+        self.event.refresh_from_db()
+        self.assertEqual(
+            (self.event.status, self.event.final_participants_count, self.event.final_winners_count),
+            ('archived', 3, 2)
+        )
+        self.assertFalse(Team.objects.filter(event=self.event).exists())
+        # 获奖记录保留，场次关联不受影响
+        self.assertEqual(list(Award.objects.filter(event=self.event)), [award])
+
+    def test_not_awarding(self):
+        CompetitionEvent.objects.filter(pk=self.event.pk).update(status='ongoing')
+        response = self.client.post(f'/comp/events/{self.event.pk}/archive/')
+        self.assertEqual(response.status_code, 400)
+
+
+class EventNextStageTests(TestCase):
+    """推进赛事阶段：一次批量插入向所有参赛成员与指导老师发送通知"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.users = create_users(4)
+        cls.event = create_event(status='registration')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_notifies_participants(self):
+        a, b, c, teacher = self.users
+        team = Team.objects.create(event=self.event, name='A', leader=a, status='submitted')
+        team.members.add(a, b)
+        team.teachers.add(teacher)
+        Team.objects.create(event=self.event, name='B', leader=c, status='submitted')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'/comp/events/{self.event.pk}/next-stage/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['current_status'], 'screening')
+
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "notifications_notification"')]
+        self.assertEqual(len(inserts), 1)
+        for user in self.users:
+            notification = user.notifications.get()
+            self.assertEqual((notification.actor, notification.target), (self.admin, self.event))
+            self.assertIn('初筛', notification.verb)
+
+    def test_no_participants(self):
+        response = self.client.post(f'/comp/events/{self.event.pk}/next-stage/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.exists())
+
+
+class EventStatusSaveTests(TestCase):
+    """修改赛事状态只写 status 字段，不刷新竞赛与获奖的检索索引；修改名称仍会刷新"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.event = create_event(name='春季赛', status='registration')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        patchers = [mock.patch('competitions.signals.index_competition'), mock.patch('award.signals.index_awards')]
+        self.index_competition, self.index_awards = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_set_status(self):
+        # 其他请求在此期间修改了名称，状态接口不能把旧名称写回去
+        CompetitionEvent.objects.filter(pk=self.event.pk).update(name='秋季赛')
+        response = self.client.post(f'/comp/events/{self.event.pk}/set-status/', {'status': 'ongoing'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.status, self.event.name), ('ongoing', '秋季赛'))
+        self.index_competition.assert_not_called()
+        self.index_awards.assert_not_called()
+
+    def test_next_stage(self):
+        response = self.client.post(f'/comp/events/{self.event.pk}/next-stage/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.index_competition.assert_not_called()
+        self.index_awards.assert_not_called()
 
-# Create your tests here.
+    def test_rename_reindexes(self):
+        self.event.name = '秋季赛'
+        self.event.save(update_fields=['name'])
+        self.index_competition.assert_called_once()
+        self.index_awards.assert_called_once()
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
-from .views import CompetitionViewSet, CompetitionLevelViewSet, CompetitionCategoryViewSet, CompetitionEventViewSet
+from .views import CompetitionViewSet, CompetitionLevelViewSet, CompetitionCategoryViewSet, CompetitionEventViewSet, \
+    AsyncCompetitionLevelListView, AsyncCompetitionCategoryListView
 
 router = routers.DefaultRouter()
 router.register('info', CompetitionViewSet)
@@ -10,4 +11,7 @@ router.register(r'events', CompetitionEventViewSet, basename='competition-event'
 
 urlpatterns = [
     path('', include(router.urls)),
+    # 异步只读接口，ASGI 下不占用同步线程池
+    path('async/levels/', AsyncCompetitionLevelListView.as_view(), name='async-level-list'),
+    path('async/categories/', AsyncCompetitionCategoryListView.as_view(), name='async-category-list'),
 ]
\ No newline at end of file
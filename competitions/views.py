@@ -3,25 +3,32 @@ from django.db import transaction
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from notifications.signals import notify
 from django.contrib.auth import get_user_model
 
 
 from award.models import Award
+from competitionManagementSys.async_views import AsyncReadView
+from competitionManagementSys.fts import FtsSearchFilter
+from notification.utils import bulk_notify
 from .models import Competition, CompetitionLevel, CompetitionCategory, CompetitionEvent
 from .serializers import CompetitionSerializer, CompetitionLevelSerializer, CompetitionCategorySerializer, \
     CompetitionEventSerializer
+from .search import competition_index
+from team import counters as team_counters
+from team.utils import convert_event_awards
 from userManage.permissions import IsCompAdminOrReadOnly
 
 
 User = get_user_model()
 class CompetitionViewSet(viewsets.ModelViewSet):
-    queryset = Competition.objects.all()
+    queryset = Competition.objects.select_related('category', 'level', 'creator')
     serializer_class = CompetitionSerializer
+    replica_actions = ('list',)
 
-    # 1. 指定过滤器后端
-    filter_backends = [filters.SearchFilter]
-    # 2. 指定搜索字段，'title' 前面可以加修饰符
+    # 1. 指定过滤器后端：?search= 走全文索引（支持拼音/首字母，如 lqb -> 蓝桥杯）
+    filter_backends = [FtsSearchFilter]
+    search_index = competition_index
+    # 2. 非 SQLite 数据库时回退到的模糊搜索字段
     search_fields = ['title']
 
     # 设置权限
@@ -53,6 +60,7 @@ class CompetitionLevelViewSet(viewsets.ModelViewSet):
     # 设置权限
     permission_classes = [IsCompAdminOrReadOnly]
     serializer_class = CompetitionLevelSerializer
+    replica_actions = ('list',)
 
 
 class CompetitionCategoryViewSet(viewsets.ModelViewSet):
@@ -60,11 +68,27 @@ class CompetitionCategoryViewSet(viewsets.ModelViewSet):
     # 设置权限
     permission_classes = [IsCompAdminOrReadOnly]
     serializer_class = CompetitionCategorySerializer
+    replica_actions = ('list',)
+
+
+class AsyncCompetitionLevelListView(AsyncReadView):
+    """级别列表的异步版本：GET /comp/async/levels/，字段与 CompetitionLevelSerializer 相同"""
+
+    async def get(self, request):
+        return [row async for row in CompetitionLevel.objects.values('id', 'name', 'description')]
+
+
+class AsyncCompetitionCategoryListView(AsyncReadView):
+    """类别列表的异步版本：GET /comp/async/categories/"""
+
+    async def get(self, request):
+        return [row async for row in CompetitionCategory.objects.values('id', 'name')]
 
 
 class CompetitionEventViewSet(viewsets.ModelViewSet):
     queryset = CompetitionEvent.objects.all().order_by('-start_time')
     serializer_class = CompetitionEventSerializer
+    replica_actions = ('list',)
 
     permission_classes = [IsCompAdminOrReadOnly]
 
@@ -89,27 +113,22 @@ class CompetitionEventViewSet(viewsets.ModelViewSet):
         if not all_user_ids:
             return
 
-        # 4. 获取对应的用户对象列表
-        recipients = User.objects.filter(id__in=all_user_ids)
-
-        # 5. 批量发送通知
+        # 4. 批量发送通知（一次 bulk_create，不再逐个接收者插入）
         # verb: 动作描述, target: 关联的对象(当前赛事)
-        notify.send(
-            sender=self.request.user,  # 发送者通常是当前操作的管理员
-            recipient=recipients,  # 接收者可以是 QuerySet 或 List
-            verb=message,
-            target=event
-        )
+        bulk_notify(self.request.user, [(user_id, message, event) for user_id in all_user_ids])
 
     def get_queryset(self):
         user = self.request.user
+        # competition_title 取自所属竞赛，一并查出
+        queryset = CompetitionEvent.objects.select_related('competition').order_by('-start_time')
+
         # 管理员可以看到所有
         if user.is_staff or user.groups.filter(name__in=['CompetitionAdministrator']).exists():
-            return CompetitionEvent.objects.all().order_by('-start_time')
+            return queryset
 
         # 学生和教师只能看到归档以前的所有阶段
         # 包含：registration, screening, ongoing, awarding
-        return CompetitionEvent.objects.exclude(status='archived').order_by('-start_time')
+        return queryset.exclude(status='archived')
 
     def perform_create(self, serializer):
         serializer.save(status='registration')
@@ -152,15 +171,16 @@ class CompetitionEventViewSet(viewsets.ModelViewSet):
                     # 2. 淘汰逻辑：
                     # 只要不在晋级名单里的，全部改为 ended
                     # 这样 draft, submitted, rejected 且未被管理员标记为 shortlisted 的人都会被淘汰
-                    event.teams.exclude(id__in=passed_ids).update(status='ended')
+                    # update 不触发信号，用 update_status 同步赛事的实时统计
+                    team_counters.update_status(event.teams.exclude(id__in=passed_ids), 'ended')
 
                     # 3. 晋级逻辑：
                     # 将名单内的人员状态从 shortlisted 重置为 draft，开启下一轮提交
-                    event.teams.filter(id__in=passed_ids).update(status='draft')
+                    team_counters.update_status(event.teams.filter(id__in=passed_ids), 'draft')
 
-            # 更新赛事阶段
+            # 更新赛事阶段（只写状态字段，不触发检索索引刷新）
             event.status = next_status
-            event.save()
+            event.save(update_fields=['status'])
 
             # 3. 发送全员通知
             if next_status in status_messages:
@@ -174,6 +194,26 @@ class CompetitionEventViewSet(viewsets.ModelViewSet):
             return Response({"detail": "已到达评奖阶段，下一步请执行归档操作"},
                             status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['post'], url_path='convert-awards')
+    def convert_awards(self, request, pk=None):
+        """
+        管理员接口：评奖阶段一键将所有证书信息完整的入围团队转为正式获奖记录
+        POST /comp/events/{id}/convert-awards/
+        证书信息不完整或证书编号重复的团队会被跳过并在 skipped 中列出
+        """
+        event = self.get_object()
+
+        if event.status != 'awarding':
+            return Response({"detail": "赛事不在获奖阶段"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = convert_event_awards(event, request.user)
+        except Exception as e:
+            return Response({"detail": f"批量转换失败，数据已回滚: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(result)
+
     @action(detail=True, methods=['post'], url_path='set-status')
     def set_specific_status(self, request, pk=None):
         """
@@ -188,7 +228,7 @@ class CompetitionEventViewSet(viewsets.ModelViewSet):
             return Response({"detail": "无效的状态值"}, status=status.HTTP_400_BAD_REQUEST)
 
         event.status = target_status
-        event.save()
+        event.save(update_fields=['status'])
         return Response({"detail": f"状态已成功修改为: {event.get_status_display()}"})
     @action(detail=True, methods=['post'], url_path='archive')
     def archive_event(self, request, pk=None):
@@ -233,17 +273,20 @@ class CompetitionEventViewSet(viewsets.ModelViewSet):
                 # 3. 统计获奖人数 (直接从已生成的 Award 记录中统计人员去重)
                 # 这样比统计 Team 更准确，因为 Award 记录了最终确定的名单
                 awarded_users = get_user_model().objects.filter(
-                    Q(awards_as_participant__event=event)
+                    student_awards__event=event
                 ).distinct()
                 event.final_winners_count = awarded_users.count()
 
                 # --- B. 更新赛事状态 ---
                 event.status = 'archived'
-                event.save()
+                event.save(update_fields=['status', 'final_participants_count', 'final_winners_count'])
 
                 # --- C. 自动销毁关联的所有团队记录 ---
                 # 警告：由于 C 操作会级联删除 Team，务必确保 A 操作在 C 之前完成
-                event.teams.all().delete()
+                # 批量删除时不逐条维护实时统计，删除后统一校正一次
+                with team_counters.suspended():
+                    event.teams.all().delete()
+                team_counters.reconcile(event_ids=[event.pk])
 
             return Response({
                 "message": "赛事已成功归档",
@@ -0,0 +1,42 @@
+"""
+为 django-notifications 的 Notification 表补充索引
+- (recipient, -timestamp)：消息列表按接收人筛选并按时间倒序，无需额外排序
+- recipient WHERE unread：未读数只扫描未读消息的部分索引（SQLite/PostgreSQL 支持，其余数据库忽略条件）
+(recipient, unread) 复合索引已由 notifications 0008 迁移提供
+
+为什么用 RunPython + schema_editor 而不是 AddIndex：
+- Notification 属于第三方包，不能修改它的 Meta，也不能往它的迁移目录里加迁移；
+  AddIndex 只能作用于本 app 的模型状态，放在这里会找不到 notifications.Notification
+- 直接建索引不写入迁移状态，notifications 的 makemigrations 不会感知也不会试图删除它们；
+  索引名使用 notif_ 前缀，避免与上游今后新增的索引重名
+反向操作删除这两个索引，migrate notification zero 后表结构恢复为上游原样
+"""
+from django.db import migrations, models
+
+INDEXES = [
+    models.Index(fields=['recipient', '-timestamp'], name='notif_recipient_ts_idx'),
+    models.Index(fields=['recipient'], condition=models.Q(unread=True), name='notif_recipient_unread_idx'),
+]
+
+
+def add_indexes(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    for index in INDEXES:
+        schema_editor.add_index(Notification, index)
+
+
+def remove_indexes(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    for index in INDEXES:
+        schema_editor.remove_index(Notification, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0009_alter_notification_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
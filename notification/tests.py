@@ -1,3 +1,67 @@
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from competitionManagementSys.factories import create_admin, create_event, create_user
+from notification.utils import bulk_notify
+
+
+class NotificationListTests(TestCase):
+    """消息列表：actor/target 按类型批量预取，查询次数与消息条数无关"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        cls.student = create_user('20000000000', groups=('Student',))
+        cls.event = create_event()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def get(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/notification/info/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), len(ctx.captured_queries)
+
+    def test_list(self):
+        bulk_notify(self.admin, [(self.student.pk, '赛事已开始', self.event)])
+        bulk_notify(self.teacher, [(self.student.pk, '请补充材料', None)])
+        data, queries = self.get()
+        self.assertEqual(
+            sorted((item['actor_name'], item['verb'], item['target_object']) for item in data),
+            [(self.teacher.username, '请补充材料', None),
+             ('admin', '赛事已开始', {'id': self.event.pk, 'type': 'CompetitionEvent'})]
+        )
+
+        bulk_notify(self.admin, [(self.student.pk, f'通知{i}', create_event(name=str(i))) for i in range(5)])
+        bulk_notify(self.teacher, [(self.student.pk, f'提醒{i}', self.teacher) for i in range(3)])
+        data, more_queries = self.get()
+        self.assertEqual(len(data), 10)
+        # 新增了一种 target 类型（用户），多一次预取查询
+        self.assertEqual(more_queries, queries + 1)
+
+
+class NotificationIndexMigrationTests(TransactionTestCase):
+    """notification 0001 在第三方表上建的索引可以随迁移回退删除、再次前进重建"""
+
+    INDEXES = {'notif_recipient_ts_idx', 'notif_recipient_unread_idx'}
+
+    def indexes(self):
+        from notifications.models import Notification
+
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, Notification._meta.db_table))
+
+    def test_reverse_and_forward(self):
+        self.assertLessEqual(self.INDEXES, self.indexes())
+        try:
+            call_command('migrate', 'notification', 'zero', verbosity=0)
+            self.assertFalse(self.INDEXES & self.indexes())
+        finally:
+            call_command('migrate', 'notification', verbosity=0)
+        self.assertLessEqual(self.INDEXES, self.indexes())
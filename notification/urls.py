@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificationViewSet  # 确保导入正确
+from .views import NotificationViewSet, AsyncUnreadCountView, AsyncNotificationListView  # 确保导入正确
 
 # 1. 初始化 Router
 router = DefaultRouter()
@@ -12,4 +12,7 @@ router.register(r'info', NotificationViewSet, basename='notification')
 # 3. 将 router.urls 加入到 urlpatterns
 urlpatterns = [
     path('', include(router.urls)),
+    # 异步只读接口，ASGI 下不占用同步线程池
+    path('async/unread-count/', AsyncUnreadCountView.as_view(), name='async-unread-count'),
+    path('async/list/', AsyncNotificationListView.as_view(), name='async-notification-list'),
 ]
\ No newline at end of file
@@ -6,6 +6,7 @@ from rest_framework import viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from competitionManagementSys.async_views import AsyncReadView
 from .serializers import NotificationSerializer
 
 
@@ -16,8 +17,8 @@ class NotificationViewSet(mixins.ListModelMixin,
     serializer_class = NotificationSerializer
 
     def get_queryset(self):
-        # 只看当前用户的消息
-        return self.request.user.notifications.all()
+        # 只看当前用户的消息；actor/target 为 GenericForeignKey，按类型批量预取，避免逐条查询
+        return self.request.user.notifications.all().prefetch_related('actor', 'target')
 
     @action(detail=False, methods=['get'],url_path='unread-count')
     def unread_count(self, request):
@@ -36,4 +37,25 @@ class NotificationViewSet(mixins.ListModelMixin,
     def mark_all_as_read(self, request):
         """全部标记已读: /notification/info/mark-all-as-read/"""
         self.request.user.notifications.mark_all_as_read()
-        return Response({'status': 'all marked as read'})
\ No newline at end of file
+        return Response({'status': 'all marked as read'})
+
+
+class AsyncUnreadCountView(AsyncReadView):
+    """未读消息数的异步版本: /notification/async/unread-count/"""
+
+    async def get(self, request):
+        return {'unread_count': await request.user.notifications.unread().acount()}
+
+
+class AsyncNotificationListView(AsyncReadView):
+    """
+    消息列表的异步版本: /notification/async/list/，返回格式与 /notification/info/ 相同
+    async for 在 sync_to_async 中一次完成查询与 actor/target 预取，之后的序列化不再访问数据库
+    """
+
+    async def get(self, request):
+        notifications = [
+            notification async for notification in
+            request.user.notifications.all().prefetch_related('actor', 'target')
+        ]
+        return NotificationSerializer(notifications, many=True).data
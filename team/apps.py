@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TeamConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team'
+
+    def ready(self):
+        # 注册赛事实时统计的同步信号
+        from . import signals  # noqa: F401
@@ -0,0 +1,149 @@
+"""
+赛事实时统计（CompetitionEvent.team_<status>_count / participant_count / teacher_count）
+
+- 各状态团队数：按 (赛事, 状态) 的增减量用 F() 原子加减，与触发它的写操作处于同一事务
+- 参赛人数/指导老师人数需要去重，无法靠 ±1 维护：在写操作后锁定赛事行，重新统计该赛事（只涉及一个赛事的索引范围）
+- 单条 save/delete 与 members/teachers 的 m2m_changed 由 signals 处理；QuerySet.update/bulk_update 不触发信号，
+  调用方使用 update_status / move_status_counts 同步计数
+- suspended() 内暂停信号维护（如归档时批量删除团队），之后由调用方 reconcile
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F
+
+from competitions.models import CompetitionEvent
+from .models import Team
+
+# Team.status -> CompetitionEvent 上的计数字段
+STATUS_FIELDS = {status: f'team_{status}_count' for status, _ in Team.STATUS_CHOICES}
+COUNTER_FIELDS = list(STATUS_FIELDS.values()) + ['participant_count', 'teacher_count']
+
+_suspended = ContextVar('team_counters_suspended', default=False)
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+@contextmanager
+def suspended():
+    """暂停信号对计数的维护，由调用方在结束后 reconcile"""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def apply_status_deltas(deltas, using=DEFAULT_DB_ALIAS):
+    """deltas 为 {(event_id, status): 增减量}，每个赛事一条 UPDATE"""
+    per_event = defaultdict(Counter)
+    for (event_id, status), delta in deltas.items():
+        if delta and event_id is not None and status in STATUS_FIELDS:
+            per_event[event_id][STATUS_FIELDS[status]] += delta
+
+    for event_id, changes in per_event.items():
+        changes = {field: F(field) + delta for field, delta in changes.items() if delta}
+        if changes:
+            CompetitionEvent.objects.using(using).filter(pk=event_id).update(**changes)
+
+
+def move_status_counts(moved, status, using=DEFAULT_DB_ALIAS):
+    """moved 为 {(event_id, 原状态): 团队数}，把这些团队计入新状态"""
+    deltas = Counter()
+    for (event_id, old_status), count in moved.items():
+        deltas[(event_id, old_status)] -= count
+        deltas[(event_id, status)] += count
+    apply_status_deltas(deltas, using=using)
+
+
+def update_status(queryset, status):
+    """
+    QuerySet.update(status=...) 的计数版本，返回更新的行数
+    先锁定待更新的团队并统计原状态，再更新并调整计数，三步在同一事务内
+    """
+    using = queryset.db
+    with transaction.atomic(using=using):
+        moved = Counter(queryset.select_for_update().values_list('event_id', 'status'))
+        updated = queryset.update(status=status)
+        move_status_counts(moved, status, using=using)
+    return updated
+
+
+def refresh_people_counts(event_ids, using=DEFAULT_DB_ALIAS):
+    """
+    重新统计赛事的参赛人数（队长 + 成员去重）与指导老师人数
+    先锁定赛事行，使并发的成员变更依次统计，后提交的事务一定能看到先提交的结果
+    """
+    event_ids = sorted({event_id for event_id in event_ids if event_id is not None})
+    if not event_ids:
+        return
+
+    with transaction.atomic(using=using):
+        for event_id in event_ids:
+            if not CompetitionEvent.objects.using(using).select_for_update().filter(pk=event_id).exists():
+                continue
+            leaders = Team.objects.using(using).filter(event_id=event_id).values('leader_id')
+            members = Team.members.through.objects.using(using).filter(team__event_id=event_id).values('user_id')
+            teachers = (
+                Team.teachers.through.objects.using(using)
+                .filter(team__event_id=event_id).values('user_id').distinct()
+            )
+            CompetitionEvent.objects.using(using).filter(pk=event_id).update(
+                participant_count=leaders.union(members).count(),
+                teacher_count=teachers.count(),
+            )
+
+
+def compute_counters(using=DEFAULT_DB_ALIAS, event_ids=None):
+    """全量计算赛事统计，返回 {event_id: {字段: 值}}"""
+    events = CompetitionEvent.objects.using(using).all()
+    teams = Team.objects.using(using).all()
+    members = Team.members.through.objects.using(using).all()
+    teachers = Team.teachers.through.objects.using(using).all()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+        teams = teams.filter(event_id__in=event_ids)
+        members = members.filter(team__event_id__in=event_ids)
+        teachers = teachers.filter(team__event_id__in=event_ids)
+
+    counters = {event_id: dict.fromkeys(COUNTER_FIELDS, 0) for event_id in events.values_list('pk', flat=True)}
+
+    for row in teams.values('event_id', 'status').annotate(n=Count('id')).order_by():
+        if row['event_id'] in counters and row['status'] in STATUS_FIELDS:
+            counters[row['event_id']][STATUS_FIELDS[row['status']]] = row['n']
+
+    participants = set(teams.values_list('event_id', 'leader_id').iterator(chunk_size=5000))
+    participants.update(members.values_list('team__event_id', 'user_id').iterator(chunk_size=5000))
+    for event_id, _ in participants:
+        if event_id in counters:
+            counters[event_id]['participant_count'] += 1
+
+    for event_id, _ in set(teachers.values_list('team__event_id', 'user_id').iterator(chunk_size=5000)):
+        if event_id in counters:
+            counters[event_id]['teacher_count'] += 1
+    return counters
+
+
+def reconcile(using=DEFAULT_DB_ALIAS, event_ids=None, batch_size=500):
+    """按团队表重新计算并写回赛事统计，返回 [(event_id, {字段: (原值, 新值)})]，只包含有偏差的赛事"""
+    counters = compute_counters(using=using, event_ids=event_ids)
+
+    drifted = []
+    changed = []
+    events = CompetitionEvent.objects.using(using).filter(pk__in=counters).only('pk', *COUNTER_FIELDS)
+    for event in events.iterator(chunk_size=batch_size):
+        diff = {
+            field: (getattr(event, field), value)
+            for field, value in counters[event.pk].items() if getattr(event, field) != value
+        }
+        if diff:
+            for field, (_, value) in diff.items():
+                setattr(event, field, value)
+            drifted.append((event.pk, diff))
+            changed.append(event)
+    CompetitionEvent.objects.using(using).bulk_update(changed, COUNTER_FIELDS, batch_size=batch_size)
+    return drifted
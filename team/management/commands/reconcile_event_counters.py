@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from team.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = '根据团队表重新计算赛事实时统计（各状态团队数、参赛人数、指导老师人数），并修正有偏差的赛事'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='只校正指定赛事，默认全部')
+        parser.add_argument('--dry-run', action='store_true', help='只输出偏差，不写回')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='目标数据库别名')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            drifted = reconcile(using=using, event_ids=options['event_ids'] or None)
+            for event_id, diff in drifted:
+                changes = ', '.join(f'{field}: {old} -> {new}' for field, (old, new) in diff.items())
+                self.stdout.write(f'赛事 {event_id}: {changes}')
+            if options['dry_run']:
+                transaction.set_rollback(True, using=using)
+
+        verb = '发现' if options['dry_run'] else '已修正'
+        self.stdout.write(self.style.SUCCESS(f'赛事实时统计校正完成，{verb} {len(drifted)} 个赛事存在偏差'))
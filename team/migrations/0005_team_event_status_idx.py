@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0004_alter_team_applied_award_level_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['event', 'status'], name='team_event_status_idx'),
+        ),
+    ]
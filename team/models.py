@@ -29,6 +29,10 @@ class Team(models.Model):
                 name='unique_leader_per_event'
             )
         ]
+        indexes = [
+            # 赛事推进、归档、作品导出均按 (赛事, 状态) 筛选团队
+            models.Index(fields=['event', 'status'], name='team_event_status_idx'),
+        ]
 
     # 2. 人员结构 (与 Award 对应)
     name = models.CharField(max_length=100, verbose_name="团队名称")
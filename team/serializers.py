@@ -4,14 +4,17 @@ import time
 from django.utils.text import get_valid_filename
 from rest_framework import serializers
 
-from userProfile.serializers import UserDetailSerializer
+from competitionManagementSys.flat import FlatListSerializer
+from competitionManagementSys.sparse import SparseFieldsMixin
+from userManage.fields import BatchSlugRelatedField
+from userProfile.serializers import UserDetailSerializer, build_user_details
 from .models import Team
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # 基础信息显示
     leader_user_id = serializers.ReadOnlyField(source='leader.user_id')
     event_name = serializers.ReadOnlyField(source='event.name')
@@ -22,12 +25,13 @@ class TeamSerializer(serializers.ModelSerializer):
     members_detail = UserDetailSerializer(source='members', many=True, read_only=True)
     teachers_detail = UserDetailSerializer(source='teachers', many=True, read_only=True)
 
-    # 录入字段（写时使用 user_id 列表）
-    members = serializers.SlugRelatedField(
+    # 录入字段（写时使用 user_id 列表，一次查询批量解析；老师同时校验 Teacher 角色）
+    members = BatchSlugRelatedField(
         required=False, many=True, queryset=User.objects.all(), slug_field='user_id'
     )
-    teachers = serializers.SlugRelatedField(
-        required=False, many=True, queryset=User.objects.all(), slug_field='user_id'
+    teachers = BatchSlugRelatedField(
+        required=False, many=True, queryset=User.objects.all(), slug_field='user_id',
+        role='Teacher', role_label='指导老师'
     )
 
     class Meta:
@@ -41,6 +45,8 @@ class TeamSerializer(serializers.ModelSerializer):
             'attachment', 'status', 'status_display', 'converted_award'
         ]
         read_only_fields = ['leader', 'status', 'converted_award']
+        # ?expand= 可控制的嵌套详情字段
+        expandable_fields = ['leader_detail', 'members_detail', 'teachers_detail']
 
     def validate_works(self, value):
         """处理作品上传重命名：队名.后缀"""
@@ -51,13 +57,6 @@ class TeamSerializer(serializers.ModelSerializer):
             value.name = f"{safe_name}{ext}"
         return value
 
-    def validate_teachers(self, value):
-        """确保老师角色校验"""
-        for user in value:
-            if not user.groups.filter(name='Teacher').exists():
-                raise serializers.ValidationError(f"用户 {user.user_id} 不是指导老师角色。")
-        return value
-
     def validate(self, data):
         user = self.context['request'].user
         instance = self.instance
@@ -77,6 +76,62 @@ class TeamSerializer(serializers.ModelSerializer):
         return data
 
 
+class TeamListSerializer(FlatListSerializer):
+    """团队列表（GET /team/info/）的扁平序列化器，输出与 TeamSerializer 一致"""
+    fields = TeamSerializer.Meta.fields
+
+    def build_rows(self, queryset, names):
+        rows = list(queryset.values(
+            'id', 'event_id', 'event__name', 'name', 'leader_id', 'leader__user_id', 'works',
+            'applied_award_level', 'temp_cert_no', 'attachment', 'status', 'converted_award_id'
+        ))
+        team_ids = [row['id'] for row in rows]
+        members = teachers = {}
+        if names & {'members', 'members_detail'}:
+            members = self.related_slugs(Team.members.through, 'team_id', team_ids)
+        if names & {'teachers', 'teachers_detail'}:
+            teachers = self.related_slugs(Team.teachers.through, 'team_id', team_ids)
+
+        with_leader_detail = 'leader_detail' in names
+        with_members_detail = 'members_detail' in names
+        with_teachers_detail = 'teachers_detail' in names
+        details = {}
+        if with_leader_detail or with_members_detail or with_teachers_detail:
+            user_pks = {row['leader_id'] for row in rows} if with_leader_detail else set()
+            for people, needed in ((members, with_members_detail), (teachers, with_teachers_detail)):
+                if needed:
+                    user_pks.update(pk for pairs in people.values() for pk, _ in pairs)
+            details = build_user_details(user_pks)
+
+        status_labels = dict(Team.STATUS_CHOICES)
+        works_storage = Team._meta.get_field('works').storage
+        attachment_storage = Team._meta.get_field('attachment').storage
+        for row in rows:
+            team_id = row['id']
+            team_members = members.get(team_id, ())
+            team_teachers = teachers.get(team_id, ())
+            yield {
+                'id': team_id,
+                'event': row['event_id'],
+                'event_name': row['event__name'],
+                'name': row['name'],
+                'leader': row['leader_id'],
+                'leader_user_id': row['leader__user_id'],
+                'leader_detail': details[row['leader_id']] if with_leader_detail else None,
+                'members': [slug for _, slug in team_members],
+                'members_detail': [details[pk] for pk, _ in team_members] if with_members_detail else None,
+                'teachers': [slug for _, slug in team_teachers],
+                'teachers_detail': [details[pk] for pk, _ in team_teachers] if with_teachers_detail else None,
+                'works': self.file_url(works_storage, row['works']),
+                'applied_award_level': row['applied_award_level'],
+                'temp_cert_no': row['temp_cert_no'],
+                'attachment': self.file_url(attachment_storage, row['attachment']),
+                'status': row['status'],
+                'status_display': status_labels.get(row['status'], row['status']),
+                'converted_award': row['converted_award_id'],
+            }
+
+
 class TeamFileUploadSerializer(serializers.ModelSerializer):
     """
     专门用于补传文件或修改申报奖项的序列化器
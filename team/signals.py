@@ -0,0 +1,104 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters
+from .models import Team
+
+# 影响赛事统计的字段
+COUNTED_FIELDS = {'event', 'event_id', 'status', 'leader', 'leader_id'}
+
+
+def _counted_fields_unchanged(update_fields):
+    return update_fields is not None and not (set(update_fields) & COUNTED_FIELDS)
+
+
+def _loaded_state(instance):
+    """(event_id, status, leader_id)；有字段被延迟加载时返回 None，保存前再从数据库读取"""
+    values = instance.__dict__
+    if instance.pk is None or not all(name in values for name in ('event_id', 'status', 'leader_id')):
+        return None
+    return values['event_id'], values['status'], values['leader_id']
+
+
+@receiver(post_init, sender=Team)
+def remember_counted_state(sender, instance, **kwargs):
+    instance._counted_state = _loaded_state(instance)
+
+
+@receiver(pre_save, sender=Team)
+def capture_counted_state(sender, instance, using, raw=False, update_fields=None, **kwargs):
+    instance._counted_before = None
+    if raw or counters.is_suspended() or instance._state.adding or _counted_fields_unchanged(update_fields):
+        return
+    state = getattr(instance, '_counted_state', None)
+    if state is None:
+        state = (
+            Team.objects.using(using).filter(pk=instance.pk)
+            .values_list('event_id', 'status', 'leader_id').first()
+        )
+    instance._counted_before = state
+
+
+@receiver(post_save, sender=Team)
+def sync_event_counters_on_save(sender, instance, using, created=False, raw=False, update_fields=None, **kwargs):
+    """新建团队、状态/赛事/队长变化时更新赛事统计"""
+    if raw or counters.is_suspended() or (not created and _counted_fields_unchanged(update_fields)):
+        return
+    before = None if created else instance._counted_before
+    after = (instance.event_id, instance.status, instance.leader_id)
+    instance._counted_state = after
+    if before == after:
+        return
+
+    deltas = Counter({(after[0], after[1]): 1})
+    if before is not None:
+        deltas[(before[0], before[1])] -= 1
+    counters.apply_status_deltas(deltas, using=using)
+
+    if before is None or before[0] != after[0] or before[2] != after[2]:
+        counters.refresh_people_counts({after[0], before[0] if before else None}, using=using)
+
+
+@receiver(post_delete, sender=Team)
+def sync_event_counters_on_delete(sender, instance, using, **kwargs):
+    if counters.is_suspended():
+        return
+    counters.apply_status_deltas({(instance.event_id, instance.status): -1}, using=using)
+    counters.refresh_people_counts({instance.event_id}, using=using)
+
+
+def _sync_people_counts(field_name, instance, action, reverse, pk_set, using):
+    """
+    成员/指导老师变化后重新统计人数
+    正向：team.members.add(user)，instance 为 Team
+    反向：user.joined_teams.add(team)，instance 为 User，pk_set 为团队 id；clear 时在 pre_clear 记下涉及的赛事
+    """
+    if counters.is_suspended():
+        return
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            counters.refresh_people_counts({instance.event_id}, using=using)
+        return
+
+    if action == 'pre_clear':
+        instance._counted_clear_events = set(
+            Team.objects.using(using).filter(**{field_name: instance.pk}).values_list('event_id', flat=True)
+        )
+    elif action in ('post_add', 'post_remove') and pk_set:
+        counters.refresh_people_counts(
+            set(Team.objects.using(using).filter(pk__in=pk_set).values_list('event_id', flat=True)), using=using
+        )
+    elif action == 'post_clear':
+        counters.refresh_people_counts(getattr(instance, '_counted_clear_events', set()), using=using)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def sync_event_counters_on_members_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    _sync_people_counts('members', instance, action, reverse, pk_set, using)
+
+
+@receiver(m2m_changed, sender=Team.teachers.through)
+def sync_event_counters_on_teachers_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    _sync_people_counts('teachers', instance, action, reverse, pk_set, using)
@@ -1,3 +1,468 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from competitionManagementSys.factories import create_admin, create_event, create_user, create_users
+from award.models import Award, AwardConflictKey, UserAwardIndex
+from award.search import award_index
+from certificate.models import Certificate
+from competitions.models import Competition, CompetitionCategory, CompetitionEvent, CompetitionLevel
+from . import counters
+from .models import Team
+from .utils import convert_event_awards
+
+User = get_user_model()
+
+
+class EventCounterTests(TestCase):
+    """赛事实时统计随团队变更同步，且与全量重新计算的结果一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        competition = Competition.objects.create(
+            title='蓝桥杯', year=2024, uri='https://example.com',
+            category=CompetitionCategory.objects.create(name='程序设计'),
+            level=CompetitionLevel.objects.create(name='国家级'),
+        )
+        now = timezone.now()
+        cls.event = CompetitionEvent.objects.create(
+            competition=competition, name='2024', start_time=now, end_time=now, status='registration'
+        )
+        cls.other_event = CompetitionEvent.objects.create(
+            competition=competition, name='2025', start_time=now, end_time=now, status='registration'
+        )
+        cls.users = [
+            User.objects.create_user(user_id=f'1000000000{i}', username=f'user{i}', password='pass123')
+            for i in range(6)
+        ]
+
+    def assertCounters(self, event, **expected):
+        event.refresh_from_db()
+        for field, value in expected.items():
+            self.assertEqual(getattr(event, field), value, field)
+        self.assertEqual(counters.reconcile(event_ids=[self.event.pk, self.other_event.pk]), [], '与全量计算存在偏差')
+
+    def test_save_and_members(self):
+        a, b, c, teacher = self.users[:4]
+        team = Team.objects.create(event=self.event, name='A', leader=a, status='submitted')
+        self.assertCounters(self.event, team_submitted_count=1, participant_count=1, teacher_count=0)
+
+        team.members.add(a, b)
+        team.teachers.add(teacher)
+        self.assertCounters(self.event, participant_count=2, teacher_count=1)
+
+        # 反向添加：同一用户在同一赛事的多个团队中只计一次
+        other = Team.objects.create(event=self.event, name='B', leader=c)
+        b.joined_teams.add(other)
+        self.assertCounters(self.event, team_draft_count=1, team_submitted_count=1, participant_count=3)
+
+        # b 退出所有团队；a 不再是成员但仍是队长
+        b.joined_teams.clear()
+        self.assertCounters(self.event, participant_count=2)
+        team.members.remove(a)
+        team.teachers.clear()
+        self.assertCounters(self.event, participant_count=2, teacher_count=0)
+
+    def test_status_and_event_changes(self):
+        team = Team.objects.create(event=self.event, name='A', leader=self.users[0], status='submitted')
+        team.status = 'shortlisted'
+        team.save()
+        self.assertCounters(self.event, team_submitted_count=0, team_shortlisted_count=1)
+
+        # 只更新不相关字段时不做任何统计更新
+        with self.assertNumQueries(1):
+            team.name = 'A2'
+            team.save(update_fields=['name'])
+
+        # 延迟加载 status 的实例保存时从数据库读取原状态
+        deferred = Team.objects.only('id', 'name').get(pk=team.pk)
+        deferred.event = self.other_event
+        deferred.save()
+        self.assertCounters(self.event, team_shortlisted_count=0, participant_count=0)
+        self.assertCounters(self.other_event, team_shortlisted_count=1, participant_count=1)
+
+        team.refresh_from_db()
+        team.delete()
+        self.assertCounters(self.other_event, team_shortlisted_count=0, participant_count=0)
+
+    def test_update_status(self):
+        for i in range(3):
+            Team.objects.create(event=self.event, name=str(i), leader=self.users[i], status='submitted')
+        updated = counters.update_status(Team.objects.filter(event=self.event).exclude(name='0'), 'ended')
+        self.assertEqual(updated, 2)
+        self.assertCounters(self.event, team_submitted_count=1, team_ended_count=2)
+
+    def test_suspended_and_reconcile(self):
+        with counters.suspended():
+            Team.objects.create(event=self.event, name='A', leader=self.users[0], status='submitted')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.team_submitted_count, 0)
+
+        drifted = counters.reconcile(event_ids=[self.event.pk])
+        self.assertEqual(drifted, [(self.event.pk, {'team_submitted_count': (0, 1), 'participant_count': (0, 1)})])
+        self.assertCounters(self.event, team_submitted_count=1, participant_count=1)
+
+
+class TeamListTests(TestCase):
+    """团队列表：扁平序列化器输出与 TeamSerializer 一致，?fields= / ?expand= 裁剪输出并减少查询"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        students = [
+            create_user(f'2000000000{i}', f'student{i}', groups=('Student',), real_name=f'student{i}')
+            for i in range(3)
+        ]
+        teacher = create_user('30000000000', 'teacher', groups=('Teacher',), real_name='teacher', title='讲师')
+        event = create_event()
+        team = Team.objects.create(event=event, name='队伍', leader=students[0], works='team_works/a.zip')
+        team.members.add(*students[1:])
+        team.teachers.add(teacher)
+        Team.objects.create(event=event, name='空队伍', leader=students[2], status='submitted')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_same_as_detail(self):
+        items = self.client.get('/team/info/').json()
+        self.assertEqual(len(items), 2)
+        for item in items:
+            self.assertEqual(item, self.client.get(f'/team/info/{item["id"]}/').json())
+        self.assertEqual({item['status_display'] for item in items}, {'草稿', '已报名/待初筛'})
+
+    def test_sparse_fields(self):
+        full = self.get('/team/info/', 7)
+        self.assertIn('members_detail', full[0])
+
+        data = self.get('/team/info/?fields=id,name,status_display,event_name,leader_user_id', 2)
+        self.assertEqual(set(data[0]), {'id', 'name', 'status_display', 'event_name', 'leader_user_id'})
+        data = self.client.get('/team/info/?fields=id,members').json()
+        self.assertEqual({tuple(item) for item in data}, {('id', 'members')})
+
+        data = self.get(f'/team/info/{full[0]["id"]}/?expand=leader_detail', 5)
+        self.assertIn('leader_detail', data)
+        self.assertNotIn('members_detail', data)
+        self.assertEqual(data['members'], full[0]['members'])
+
+    def test_invalid_expand(self):
+        response = self.client.get('/team/info/?expand=name')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expand', response.json())
+
+
+class TeamVisibilityTests(TestCase):
+    """团队列表可见范围：队长 / 队员 / 指导老师各自只看到关联的团队且不重复，竞赛管理员看到全部"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.leader, cls.member, cls.stranger = create_users(3, groups=('Student',))
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        event = create_event()
+        cls.team = Team.objects.create(event=event, name='A', leader=cls.leader)
+        # 队长同时也在队员名单中，不应重复出现
+        cls.team.members.add(cls.leader, cls.member)
+        cls.team.teachers.add(cls.teacher)
+        cls.other = Team.objects.create(event=event, name='B', leader=cls.stranger)
+
+    def visible(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/team/info/?fields=id')
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['id'] for item in response.json())
+
+    def test_visibility(self):
+        self.assertEqual(self.visible(self.leader), [self.team.pk])
+        self.assertEqual(self.visible(self.member), [self.team.pk])
+        self.assertEqual(self.visible(self.teacher), [self.team.pk])
+        self.assertEqual(self.visible(self.stranger), [self.other.pk])
+        self.assertEqual(self.visible(self.admin), [self.team.pk, self.other.pk])
+
+    def test_detail_outside_visibility(self):
+        client = APIClient()
+        client.force_authenticate(self.member)
+        self.assertEqual(client.get(f'/team/info/{self.team.pk}/').status_code, 200)
+        self.assertEqual(client.get(f'/team/info/{self.other.pk}/').status_code, 404)
+
+
+class ParticipationTests(TestCase):
+    """my-participation：单个赛事与 ?events= 批量查询"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student, cls.leader = create_users(2, groups=('Student',))
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        competition = create_event().competition
+        cls.led_event, cls.joined_event, cls.empty_event = [
+            create_event(competition, name) for name in ('A', 'B', 'C')
+        ]
+        cls.own_team = Team.objects.create(event=cls.led_event, name='自己的队', leader=cls.student, status='submitted')
+        # 同一赛事下既是别队队员又是本队队长时，优先返回自己担任队长的团队
+        other = Team.objects.create(event=cls.led_event, name='别的队', leader=cls.leader)
+        other.members.add(cls.student)
+        cls.joined_team = Team.objects.create(event=cls.joined_event, name='加入的队', leader=cls.leader)
+        cls.joined_team.members.add(cls.student)
+        cls.joined_team.teachers.add(cls.teacher)
+
+    def get(self, user, query, status=200):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(f'/team/info/my-participation/?{query}')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_single_event(self):
+        with self.assertNumQueries(1):
+            data = self.get(self.student, f'event={self.led_event.pk}')
+        self.assertEqual(data, {
+            'is_leader': True, 'is_member': True, 'is_teacher': False,
+            'team_id': self.own_team.pk, 'team_status': 'submitted', 'can_create': False,
+        })
+
+    def test_events(self):
+        ids = f'{self.led_event.pk},{self.joined_event.pk},{self.empty_event.pk}'
+        with self.assertNumQueries(1):
+            data = self.get(self.student, f'events={ids}')
+        self.assertEqual(set(data), {str(self.led_event.pk), str(self.joined_event.pk), str(self.empty_event.pk)})
+        self.assertEqual(data[str(self.led_event.pk)]['team_id'], self.own_team.pk)
+        joined = data[str(self.joined_event.pk)]
+        self.assertEqual((joined['is_leader'], joined['is_member'], joined['team_id'], joined['can_create']),
+                         (False, True, self.joined_team.pk, True))
+        self.assertEqual(data[str(self.empty_event.pk)]['team_id'], None)
+
+        teacher = self.get(self.teacher, f'events={ids}')
+        self.assertTrue(teacher[str(self.joined_event.pk)]['is_teacher'])
+        self.assertFalse(teacher[str(self.led_event.pk)]['is_teacher'])
+
+    def test_invalid(self):
+        self.assertIn('detail', self.get(self.student, '', status=400))
+        self.assertIn('detail', self.get(self.student, 'events=1,x', status=400))
+        self.assertIn('detail', self.get(self.student, 'events=,', status=400))
+
+
+class BulkShortlistReviewTests(TestCase):
+    """批量初筛：整批校验、两条 UPDATE 完成流转、通知批量写入、实时统计同步"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.leaders = create_users(4, groups=('Student',))
+        cls.event = create_event(status='registration')
+        cls.teams = [
+            Team.objects.create(event=cls.event, name=f'队伍{i}', leader=leader, status='submitted')
+            for i, leader in enumerate(cls.leaders)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, data, status=200):
+        response = self.client.post('/team/info/bulk-review-shortlist/', data, format='json')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def statuses(self):
+        return list(Team.objects.order_by('id').values_list('status', flat=True))
+
+    def test_approve_and_reject(self):
+        a, b, c, _ = self.teams
+        data = self.post({'approve': [a.pk, b.pk], 'reject': [{'id': c.pk, 'reason': '材料不全'}]})
+        self.assertEqual(data, {'approved': 2, 'rejected': 1})
+        self.assertEqual(self.statuses(), ['shortlisted', 'shortlisted', 'rejected', 'submitted'])
+        self.assertEqual(self.leaders[2].notifications.get().verb, '很遗憾，您的团队“队伍2”未通过初筛。原因：材料不全')
+        self.assertEqual(self.leaders[0].notifications.count(), 1)
+        self.assertFalse(self.leaders[3].notifications.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(
+            (self.event.team_submitted_count, self.event.team_shortlisted_count, self.event.team_rejected_count),
+            (1, 2, 1)
+        )
+
+    def test_whole_batch_is_validated(self):
+        a, b, c, d = self.teams
+        Team.objects.filter(pk=d.pk).update(status='draft')
+        self.assertIn(str(d.pk), self.post({'approve': [a.pk, d.pk]}, status=400)['detail'])
+        self.assertIn('99999', self.post({'approve': [a.pk, 99999]}, status=404)['detail'])
+        self.post({'approve': [a.pk], 'reject': [{'id': a.pk}]}, status=400)
+        self.post({'approve': ['x']}, status=400)
+        self.post({'approve': a.pk}, status=400)
+        self.post({}, status=400)
+        self.assertEqual(self.statuses(), ['submitted', 'submitted', 'submitted', 'draft'])
+
+    def test_concurrent_change_rolls_back(self):
+        a, b, _, _ = self.teams
+        real_update_status = counters.update_status
+
+        def changed_meanwhile(queryset, status):
+            # 校验通过后另一请求先处理了 b
+            Team.objects.filter(pk=b.pk).update(status='shortlisted')
+            return real_update_status(queryset, status)
+
+        with mock.patch('team.views.update_status', side_effect=changed_meanwhile):
+            self.post({'approve': [a.pk, b.pk]}, status=409)
+        self.assertEqual(Team.objects.get(pk=a.pk).status, 'submitted')
+        self.assertFalse(self.leaders[0].notifications.exists())
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.leaders[0])
+        self.post({'approve': [self.teams[0].pk]}, status=403)
+
+
+class ReviewAwardTests(TestCase):
+    """终审评奖：入围团队结束参赛或获奖，团队只加载一次"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.leader = create_user('20000000000', groups=('Student',))
+        cls.event = create_event(status='awarding')
+        cls.team = Team.objects.create(event=cls.event, name='队伍', leader=cls.leader, status='shortlisted')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def post(self, action, status=200):
+        response = self.client.post(f'/team/info/{self.team.pk}/review-award/', {'action': action}, format='json')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_finish(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.post('finish')['status'], 'ended')
+        team_selects = [q['sql'] for q in ctx.captured_queries
+                        if q['sql'].startswith('SELECT') and f'FROM "{Team._meta.db_table}"' in q['sql']]
+        self.assertEqual(len(team_selects), 1)
+        self.assertEqual(Team.objects.get(pk=self.team.pk).status, 'ended')
+        self.assertEqual(self.leader.notifications.get().target, self.team)
+
+    def test_rejected(self):
+        # 证书信息不完整
+        self.post('award', status=400)
+        self.post('unknown', status=400)
+        Team.objects.filter(pk=self.team.pk).update(status='submitted')
+        self.assertEqual(self.post('finish', status=400)['detail'], '只有入围团队可以进行获奖操作')
+        CompetitionEvent.objects.filter(pk=self.event.pk).update(status='ongoing')
+        self.assertEqual(self.post('finish', status=400)['detail'], '赛事不在获奖阶段')
+        self.assertEqual(Team.objects.get(pk=self.team.pk).status, 'submitted')
+
+
+class ConvertEventAwardsTests(TestCase):
+    """评奖阶段一键转换：批量写入获奖及各类索引，跳过不完整/重复的团队，失败时删除已复制的证书文件"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.leaders = create_users(4, groups=('Student',))
+        cls.member = create_user('20000000009', groups=('Student',))
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+        cls.event = create_event(name='决赛', status='awarding')
+        Certificate.objects.create(cert_no='C-EXIST', image_uri='certificates/exist.png')
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.complete = self.create_team(0, 'C-001', '一等奖')
+        self.complete.members.add(self.leaders[0], self.member)
+        self.complete.teachers.add(self.teacher)
+        self.second = self.create_team(1, 'C-002', '二等奖')
+        self.incomplete = self.create_team(2, '', '三等奖')
+        self.duplicate = self.create_team(3, 'C-EXIST', '三等奖')
+
+    def create_team(self, index, cert_no, level):
+        team = Team(event=self.event, name=f'队伍{index}', leader=self.leaders[index], status='shortlisted',
+                    temp_cert_no=cert_no, applied_award_level=level)
+        team.attachment.save(f'cert{index}.png', ContentFile(b'png'), save=False)
+        team.save()
+        return team
+
+    def certificate_files(self):
+        directory = os.path.join(default_storage.location, 'certificate')
+        return sorted(name for _, _, names in os.walk(directory) for name in names)
+
+    def test_convert(self):
+        result = convert_event_awards(self.event, self.admin)
+        self.assertEqual(result['converted'], 2)
+        self.assertEqual({item['id']: item['reason'] for item in result['skipped']}, {
+            self.incomplete.pk: '证书信息不完整', self.duplicate.pk: '证书编号 C-EXIST 重复',
+        })
+
+        self.complete.refresh_from_db()
+        award = self.complete.converted_award
+        self.assertEqual((self.complete.status, award.award_level, award.certificate.cert_no),
+                         ('awarded', '一等奖', 'C-001'))
+        # 队长即使也在队员名单中只记录一次
+        self.assertEqual(list(award.participants.order_by('user_id')), [self.leaders[0], self.member])
+        self.assertEqual(list(award.instructors.all()), [self.teacher])
+        self.assertEqual(len(self.certificate_files()), 2)
+        with award.certificate.image_uri.open('rb') as f:
+            self.assertEqual(f.read(), b'png')
+
+        # bulk_create 不触发信号，各类索引与统计由转换流程维护
+        self.assertEqual(UserAwardIndex.objects.filter(award=award).count(), 3)
+        self.assertEqual(AwardConflictKey.objects.filter(award=award).count(), 2)
+        self.second.refresh_from_db()
+        self.assertEqual(sorted(award_index.search('决赛')), [award.pk, self.second.converted_award_id])
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.team_shortlisted_count, self.event.team_awarded_count), (2, 2))
+        self.assertEqual(self.leaders[0].notifications.get().target, award)
+
+        # 已转换的团队不会重复转换
+        self.assertEqual(convert_event_awards(self.event, self.admin)['converted'], 0)
+
+    def test_failure_removes_copied_files(self):
+        with mock.patch('team.utils.bulk_notify', side_effect=RuntimeError('notify failed')):
+            with self.assertRaises(RuntimeError):
+                convert_event_awards(self.event, self.admin)
+        self.assertEqual(self.certificate_files(), [])
+        self.assertFalse(Award.objects.exists())
+        self.assertEqual(Certificate.objects.count(), 1)
+        self.assertEqual(Team.objects.filter(status='shortlisted').count(), 4)
+
+    def test_copy_failure_removes_copied_files(self):
+        save = default_storage.save
+        calls = []
+
+        def fail_second(name, content, *args, **kwargs):
+            calls.append(name)
+            if len(calls) == 2:
+                raise OSError('disk full')
+            return save(name, content, *args, **kwargs)
+
+        with mock.patch.object(default_storage, 'save', side_effect=fail_second):
+            with self.assertRaises(OSError):
+                convert_event_awards(self.event, self.admin)
+        self.assertEqual(self.certificate_files(), [])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(f'/comp/events/{self.event.pk}/convert-awards/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['converted'], 2)
+
+        CompetitionEvent.objects.filter(pk=self.event.pk).update(status='ongoing')
+        response = client.post(f'/comp/events/{self.event.pk}/convert-awards/')
+        self.assertEqual(response.status_code, 400)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TeamViewSet  # 确保导入路径正确
+from .views import TeamViewSet, AsyncMyParticipationView  # 确保导入路径正确
 
 # 1. 初始化路由器
 router = DefaultRouter()
@@ -12,4 +12,6 @@ router.register(r'info', TeamViewSet, basename='team')
 # 3. 包含路由器生成的 URL
 urlpatterns = [
     path('', include(router.urls)),
+    # 异步只读接口，ASGI 下不占用同步线程池
+    path('async/my-participation/', AsyncMyParticipationView.as_view(), name='async-my-participation'),
 ]
\ No newline at end of file
@@ -0,0 +1,207 @@
+import os
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from award.models import Award
+from award.search import index_awards
+from award.utils import add_conflict_keys, add_index_rows
+from certificate.models import Certificate
+from notification.utils import bulk_notify
+from .counters import move_status_counts
+from .models import Team
+
+
+def convert_event_awards(event, operator):
+    """
+    将赛事下所有证书信息完整的入围团队批量转为正式获奖记录
+    1. 事务外：把团队上传的证书文件复制到证书目录
+    2. 事务内：bulk_create 证书、获奖记录、人员中间表，bulk_update 团队状态，批量发送通知
+    3. 事务失败时删除第 1 步复制出的文件（补偿）
+    返回 {"converted": 成功数量, "skipped": [{"id", "name", "reason"}]}
+    """
+    teams = list(
+        Team.objects.filter(event=event, status='shortlisted', converted_award__isnull=True)
+        .only('id', 'name', 'leader_id', 'status', 'temp_cert_no', 'attachment', 'applied_award_level')
+        .order_by('id')
+    )
+
+    skipped = []
+    candidates = []
+    for team in teams:
+        if not team.temp_cert_no or not team.attachment or not team.applied_award_level:
+            skipped.append({"id": team.id, "name": team.name, "reason": "证书信息不完整"})
+        else:
+            candidates.append(team)
+
+    # 证书编号唯一：与已有证书或同批次其他团队重复的都跳过
+    existing_nos = set(
+        Certificate.objects.filter(cert_no__in=[t.temp_cert_no for t in candidates])
+        .values_list('cert_no', flat=True)
+    )
+    seen_nos = set()
+    ready = []
+    for team in candidates:
+        if team.temp_cert_no in existing_nos or team.temp_cert_no in seen_nos:
+            skipped.append({"id": team.id, "name": team.name, "reason": f"证书编号 {team.temp_cert_no} 重复"})
+            continue
+        seen_nos.add(team.temp_cert_no)
+        ready.append(team)
+
+    if not ready:
+        return {"converted": 0, "skipped": skipped}
+
+    # 一次查询取出全部队员与指导老师
+    team_ids = [team.id for team in ready]
+    members = {team_id: [] for team_id in team_ids}
+    teachers = {team_id: [] for team_id in team_ids}
+    for team_id, user_id in Team.members.through.objects.filter(team_id__in=team_ids).values_list('team_id', 'user_id'):
+        members[team_id].append(user_id)
+    for team_id, user_id in Team.teachers.through.objects.filter(team_id__in=team_ids).values_list('team_id', 'user_id'):
+        teachers[team_id].append(user_id)
+
+    # --- 1. 事务外复制证书文件 ---
+    certificates = []
+    promoted_files = []
+    storage = Certificate._meta.get_field('image_uri').storage
+    try:
+        for team in ready:
+            cert = Certificate(cert_no=team.temp_cert_no)
+            filename = os.path.basename(team.attachment.name)
+            with team.attachment.open('rb') as source:
+                name = cert.image_uri.field.generate_filename(cert, filename)
+                cert.image_uri.name = storage.save(name, source)
+            promoted_files.append(cert.image_uri.name)
+            certificates.append(cert)
+    except Exception:
+        for name in promoted_files:
+            storage.delete(name)
+        raise
+
+    # --- 2. 事务内批量写库 ---
+    award_date = timezone.now().date()
+    try:
+        with transaction.atomic():
+            Certificate.objects.bulk_create(certificates)
+
+            awards = Award.objects.bulk_create([
+                Award(
+                    competition_id=event.competition_id,
+                    event=event,
+                    certificate=cert,
+                    award_level=team.applied_award_level,
+                    award_date=award_date,
+                    creator=operator
+                )
+                for team, cert in zip(ready, certificates)
+            ])
+
+            participant_rows = []
+            instructor_rows = []
+            for team, award in zip(ready, awards):
+                for user_id in dict.fromkeys([team.leader_id] + members[team.id]):
+                    participant_rows.append((user_id, award.id))
+                for user_id in dict.fromkeys(teachers[team.id]):
+                    instructor_rows.append((user_id, award.id))
+
+            Award.participants.through.objects.bulk_create([
+                Award.participants.through(user_id=user_id, award_id=award_id)
+                for user_id, award_id in participant_rows
+            ])
+            Award.instructors.through.objects.bulk_create([
+                Award.instructors.through(user_id=user_id, award_id=award_id)
+                for user_id, award_id in instructor_rows
+            ])
+
+            # bulk_create 不触发 signals，手动维护用户获奖索引、防重索引与检索索引
+            add_index_rows('participant', participant_rows)
+            add_index_rows('instructor', instructor_rows)
+            add_conflict_keys(participant_rows)
+            index_awards(Award.objects.filter(pk__in=[award.pk for award in awards]))
+
+            for team, award in zip(ready, awards):
+                team.converted_award = award
+                team.status = 'awarded'
+            Team.objects.bulk_update(ready, ['converted_award', 'status'])
+            # bulk_update 不触发信号，手动同步赛事的实时统计（ready 均为该赛事的入围团队）
+            move_status_counts(Counter({(event.pk, 'shortlisted'): len(ready)}), 'awarded')
+
+            bulk_notify(operator, [
+                (team.leader_id, f'您的获奖申请已通过！奖项：{team.applied_award_level}。', award)
+                for team, award in zip(ready, awards)
+            ])
+    except Exception:
+        for name in promoted_files:
+            storage.delete(name)
+        raise
+
+    return {"converted": len(ready), "skipped": skipped}
+
+
+def parse_participation_params(params):
+    """
+    解析参与情况接口的参数，返回 (是否单个赛事, 赛事 ID 集合, 错误信息)
+    单个赛事：?event=1；批量：?events=1,2,3
+    """
+    single_event = params.get('event')
+    raw_ids = single_event or params.get('events')
+    if not raw_ids:
+        return single_event, set(), "请提供 event 或 events 参数"
+
+    try:
+        event_ids = {int(x) for x in raw_ids.split(',') if x.strip()}
+    except ValueError:
+        event_ids = set()
+    if not event_ids:
+        return single_event, set(), "赛事 ID 格式错误"
+    return bool(single_event), event_ids, None
+
+
+def participation_queryset(user, event_ids):
+    """
+    一次查询取出用户在多个赛事下关联的团队
+    队员/指导老师身份通过 Exists() 子查询标注，只命中中间表的 (team_id, user_id) 索引
+    同步视图直接迭代，异步视图用 async for 迭代
+    """
+    return Team.objects.filter(event_id__in=event_ids).annotate(
+        is_member=Exists(Team.members.through.objects.filter(team_id=OuterRef('pk'), user=user)),
+        is_teacher=Exists(Team.teachers.through.objects.filter(team_id=OuterRef('pk'), user=user)),
+    ).filter(
+        Q(leader=user) | Q(is_member=True) | Q(is_teacher=True)
+    ).values('id', 'event_id', 'status', 'leader_id', 'is_member', 'is_teacher')
+
+
+def build_participation(user, event_ids, teams, single_event=False):
+    """
+    汇总 participation_queryset 的结果
+    单个赛事返回该赛事的参与情况，批量返回 {"1": {...}, "2": {...}}
+    """
+    result = {
+        event_id: {
+            "is_leader": False,
+            "is_member": False,
+            "is_teacher": False,
+            "team_id": None,
+            "team_status": None,
+            "can_create": True  # 方便前端直接判断是否显示“创建团队”按钮
+        }
+        for event_id in event_ids
+    }
+
+    for team in teams:
+        data = result[team['event_id']]
+        is_leader = team['leader_id'] == user.pk
+        data['is_leader'] |= is_leader
+        data['is_member'] |= team['is_member']
+        data['is_teacher'] |= team['is_teacher']
+        # 同一赛事下有多个关联团队时，优先返回自己担任队长的团队
+        if data['team_id'] is None or is_leader:
+            data['team_id'] = team['id']
+            data['team_status'] = team['status']
+        data['can_create'] = not data['is_leader']
+
+    if single_event and len(result) == 1:
+        return next(iter(result.values()))
+    return {str(event_id): data for event_id, data in result.items()}
@@ -3,7 +3,6 @@ import os
 import zipfile
 
 from django.db import transaction
-from django.db.models import Q
 from django.http import FileResponse
 from django.utils import timezone
 from django.utils.text import get_valid_filename
@@ -14,15 +13,36 @@ from rest_framework.response import Response
 
 from award.models import Award
 from certificate.models import Certificate
+from competitionManagementSys.async_views import AsyncReadView
+from competitionManagementSys.flat import FlatListViewMixin
+from competitionManagementSys.sparse import SparseFieldsViewMixin
 from team.models import Team
-from .serializers import TeamSerializer, TeamFileUploadSerializer
+from .counters import update_status
+from .utils import build_participation, parse_participation_params, participation_queryset
+from .serializers import TeamSerializer, TeamFileUploadSerializer, TeamListSerializer
 from competitions.models import CompetitionEvent
+from notification.utils import bulk_notify
 
 
-class TeamViewSet(viewsets.ModelViewSet):
+class TeamViewSet(FlatListViewMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
+    # 列表使用扁平序列化器（输出一致），详情与写接口仍用 TeamSerializer
+    flat_serializer_class = TeamListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ('list',)
+
+    # 输出字段 -> (select_related, prefetch_related)；?fields= / ?expand= 未用到的关联不再查询
+    sparse_relations = {
+        'event_name': (['event'], []),
+        'leader_user_id': (['leader'], []),
+        # 档案与角色组供 UserDetailSerializer / ProfileSerializer.get_role_name 使用
+        'leader_detail': (['leader__profile'], ['leader__groups']),
+        'members': ([], ['members']),
+        'members_detail': ([], ['members__profile', 'members__groups']),
+        'teachers': ([], ['teachers']),
+        'teachers_detail': ([], ['teachers__profile', 'teachers__groups']),
+    }
 
     def is_comp_admin_user(self, user):
         """内部辅助方法：判断是否为竞赛管理员"""
@@ -32,21 +52,29 @@ class TeamViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """查询优化：学生看自己的队，老师看指导的队，管理员看全部"""
         user = self.request.user
-        # 基础查询集：使用 select_related 关联一对一，prefetch_related 关联多对多
-        queryset = Team.objects.select_related(
-            'leader__profile',
-            'event'
-        ).prefetch_related(
-            'members__profile',
-            'teachers__profile'
-        )
+        # 基础查询集：按输出字段 select_related 关联一对一，prefetch_related 关联多对多
+        queryset = self.apply_sparse_relations(Team.objects.all())
 
         if self.is_comp_admin_user(user):
             return queryset
 
-        return queryset.filter(
-            Q(leader=user) | Q(members=user) | Q(teachers=user)
-        ).distinct()
+        return queryset.filter(id__in=self.get_visible_team_ids(user))
+
+    def get_visible_team_ids(self, user):
+        """
+        用户可见的团队 ID：队长 / 队员 / 指导老师 三路索引查询 UNION 去重
+        替代 Q(leader) | Q(members) | Q(teachers) + distinct() 对两张中间表的联表去重，
+        结果缓存在 request 上，同一请求内多次 get_queryset 只查一次
+        """
+        cache = getattr(self.request, '_visible_team_ids', None)
+        if cache is None:
+            cache = self.request._visible_team_ids = {}
+        if user.pk not in cache:
+            led = Team.objects.filter(leader=user).values_list('id', flat=True)
+            joined = Team.members.through.objects.filter(user=user).values_list('team_id', flat=True)
+            guided = Team.teachers.through.objects.filter(user=user).values_list('team_id', flat=True)
+            cache[user.pk] = list(led.union(joined, guided))
+        return cache[user.pk]
 
     @action(detail=True, methods=['patch'], url_path='upload-files')
     def upload_files(self, request, pk=None):
@@ -146,6 +174,70 @@ class TeamViewSet(viewsets.ModelViewSet):
 
         return Response(TeamSerializer(team).data)
 
+    @action(detail=False, methods=['post'], url_path='bulk-review-shortlist')
+    def bulk_review_shortlist(self, request):
+        """
+        管理员接口：批量初筛审核
+        POST /team/info/bulk-review-shortlist/
+        data: {"approve": [1, 2, 3], "reject": [{"id": 4, "reason": "可选理由"}]}
+        所有团队必须处于待初筛状态，否则整批不执行
+        """
+        if not self.is_comp_admin_user(request.user):
+            return Response({"detail": "权限不足"}, status=status.HTTP_403_FORBIDDEN)
+
+        approve = request.data.get('approve', [])
+        reject = request.data.get('reject', [])
+        if not isinstance(approve, list) or not isinstance(reject, list):
+            return Response({"detail": "approve 与 reject 必须为列表"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            approve_ids = {int(team_id) for team_id in approve}
+            reject_reasons = {int(item['id']): item.get('reason') or '无' for item in reject}
+        except (TypeError, ValueError, KeyError):
+            return Response({"detail": "团队 ID 格式错误"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not approve_ids and not reject_reasons:
+            return Response({"detail": "请提供需要审核的团队"}, status=status.HTTP_400_BAD_REQUEST)
+
+        conflict = approve_ids & set(reject_reasons)
+        if conflict:
+            return Response({"detail": f"团队不能同时通过和驳回: {sorted(conflict)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # 1. 一次查询校验所有团队的状态
+        all_ids = approve_ids | set(reject_reasons)
+        teams = {
+            team.id: team
+            for team in Team.objects.filter(id__in=all_ids).only('id', 'name', 'status', 'leader_id')
+        }
+        missing = sorted(all_ids - set(teams))
+        if missing:
+            return Response({"detail": f"以下团队不存在: {missing}"}, status=status.HTTP_404_NOT_FOUND)
+        invalid = sorted(team_id for team_id, team in teams.items() if team.status != 'submitted')
+        if invalid:
+            return Response({"detail": f"以下团队当前状态不可进行初筛: {invalid}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # 2. 两条 UPDATE ... WHERE id IN 完成状态流转，通知在同一事务内批量写入
+        notices = []
+        for team_id in approve_ids:
+            team = teams[team_id]
+            notices.append((team.leader_id, f'恭喜！您的团队“{team.name}”已通过初筛，获得参赛资格。', team))
+        for team_id, reason in reject_reasons.items():
+            team = teams[team_id]
+            notices.append((team.leader_id, f'很遗憾，您的团队“{team.name}”未通过初筛。原因：{reason}', team))
+
+        with transaction.atomic():
+            approved = update_status(Team.objects.filter(id__in=approve_ids, status='submitted'), 'shortlisted')
+            rejected = update_status(Team.objects.filter(id__in=reject_reasons, status='submitted'), 'rejected')
+            if approved != len(approve_ids) or rejected != len(reject_reasons):
+                # 校验后状态被并发修改，整批回滚
+                transaction.set_rollback(True)
+                return Response({"detail": "部分团队状态已变化，请刷新后重试"}, status=status.HTTP_409_CONFLICT)
+            bulk_notify(request.user, notices)
+
+        return Response({"approved": approved, "rejected": rejected})
+
     # ---------------------------------------------------------
     # 阶段二：获奖审核 (针对证书和奖项)
     # ---------------------------------------------------------
@@ -162,7 +254,6 @@ class TeamViewSet(viewsets.ModelViewSet):
         if not self.is_comp_admin_user(request.user):
             return Response({"detail": "权限不足"}, status=status.HTTP_403_FORBIDDEN)
 
-        team = self.get_object()
         if team.status != 'shortlisted':
             return Response({"detail": "只有入围团队可以进行获奖操作"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -259,24 +350,16 @@ class TeamViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='my-participation')
     def my_participation(self, request):
         """
-        判断当前用户是否在特定竞赛活动下创建了团队
-        GET /team/info/my_participation/?event=1
+        判断当前用户是否在特定竞赛活动下创建/加入/指导了团队
+        单个赛事：GET /team/info/my-participation/?event=1
+        批量查询：GET /team/info/my-participation/?events=1,2,3  -> {"1": {...}, "2": {...}}
         """
-        event_id = request.query_params.get('event')
-
-        if not event_id:
-            return Response({"detail": "请提供 event 参数"}, status=status.HTTP_400_BAD_REQUEST)
+        single_event, event_ids, error = parse_participation_params(request.query_params)
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 检查是否是该竞赛的队长
-        is_leader = Team.objects.filter(event_id=event_id, leader=request.user).exists()
-
-        is_member = Team.objects.filter(event_id=event_id, members=request.user).exists()
-
-        return Response({
-            "is_leader": is_leader,
-            "is_member": is_member,
-            "can_create": not is_leader  # 方便前端直接判断是否显示“创建团队”按钮
-        })
+        teams = participation_queryset(request.user, event_ids)
+        return Response(build_participation(request.user, event_ids, teams, single_event))
 
     @action(detail=True, methods=['post'], url_path='submit-registration')
     def submit_registration(self, request, pk=None):
@@ -339,7 +422,8 @@ class TeamViewSet(viewsets.ModelViewSet):
         # 4. 在内存中创建 Zip 文件
         buffer = io.BytesIO()
         with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for team in teams:
+            # 分批读取团队记录（PostgreSQL 上为服务端游标）
+            for team in teams.iterator(chunk_size=200):
                 # 获取文件原始后缀
                 ext = os.path.splitext(team.works.name)[1]
                 # 清理队名中的非法字符（使用之前讨论的 get_valid_filename）
@@ -400,4 +484,18 @@ class TeamViewSet(viewsets.ModelViewSet):
             "detail": "团队已重置为草稿状态",
             "status": team.status,
             "team": TeamSerializer(team).data
-        })
\ No newline at end of file
+        })
+
+class AsyncMyParticipationView(AsyncReadView):
+    """
+    my-participation 的异步版本，参数与返回格式相同
+    GET /team/async/my-participation/?event=1 或 ?events=1,2,3
+    """
+
+    async def get(self, request):
+        single_event, event_ids, error = parse_participation_params(request.GET)
+        if error:
+            return self.error(error)
+
+        teams = [team async for team in participation_queryset(request.user, event_ids)]
+        return build_participation(request.user, event_ids, teams, single_event)
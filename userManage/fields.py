@@ -0,0 +1,72 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BatchManyRelatedField(serializers.ManyRelatedField):
+    """将整个列表交给子字段一次性解析，而不是逐项查询"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        return self.child_relation.to_internal_value_many(list(data))
+
+
+class BatchSlugRelatedField(serializers.SlugRelatedField):
+    """
+    批量解析的 SlugRelatedField（many=True 时生效）
+    - 所有 slug 通过一次 __in 查询解析，缺失的值一并报告
+    - 指定 role 时，再用一次 groups 中间表查询校验角色（仅适用于用户模型）
+    用法：BatchSlugRelatedField(many=True, queryset=User.objects.all(), slug_field='user_id', role='Teacher')
+    """
+    default_error_messages = {
+        'does_not_exist_many': '以下 {slug_name} 不存在: {values}',
+        'invalid_role': '以下用户不是{role_label}角色: {values}',
+    }
+
+    def __init__(self, role=None, role_label=None, **kwargs):
+        self.role = role
+        self.role_label = role_label or role
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchManyRelatedField(**list_kwargs)
+
+    def to_internal_value_many(self, data):
+        if any(not isinstance(item, (str, int)) or isinstance(item, bool) for item in data):
+            self.fail('invalid')
+
+        values = [smart_str(item) for item in data]
+        if not values:
+            return []
+
+        found = {
+            smart_str(self.to_representation(obj)): obj
+            for obj in self.get_queryset().filter(**{f'{self.slug_field}__in': set(values)})
+        }
+
+        missing = [value for value in dict.fromkeys(values) if value not in found]
+        if missing:
+            self.fail('does_not_exist_many', slug_name=self.slug_field, values=missing)
+
+        if self.role:
+            model = self.get_queryset().model
+            user_ids = {obj.pk for obj in found.values()}
+            allowed = set(
+                model.groups.through.objects
+                .filter(user_id__in=user_ids, group__name=self.role)
+                .values_list('user_id', flat=True)
+            )
+            invalid = [value for value in dict.fromkeys(values) if found[value].pk not in allowed]
+            if invalid:
+                self.fail('invalid_role', role_label=self.role_label, values=invalid)
+
+        return [found[value] for value in values]
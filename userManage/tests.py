@@ -1,3 +1,96 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from competitionManagementSys.factories import create_admin, create_user, create_users
+from .fields import BatchSlugRelatedField
+from .views import UserListView
+
+User = get_user_model()
+
+
+class MembersSerializer(serializers.Serializer):
+    students = BatchSlugRelatedField(many=True, queryset=User.objects.all(), slug_field='user_id')
+    teachers = BatchSlugRelatedField(
+        required=False, many=True, queryset=User.objects.all(), slug_field='user_id',
+        role='Teacher', role_label='指导老师'
+    )
+
+
+class UserListStreamingTests(TestCase):
+    """用户列表 ?stream=1 / NDJSON 流式输出与普通列表内容一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        create_users(5, groups=('Student',))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        patcher = mock.patch.object(UserListView, 'stream_chunk_size', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_json_array(self):
+        expected = self.client.get('/user/users/').json()
+        response = self.client.get('/user/users/?stream=1')
+        self.assertEqual(json.loads(self.read(response)), expected)
+
+    def test_ndjson(self):
+        expected = self.client.get('/user/users/').json()
+        lines = self.read(self.client.get('/user/users/?format=ndjson')).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+        self.assertEqual(len(lines), 6)
+
+
+class BatchSlugRelatedFieldTests(TestCase):
+    """user_id 列表一次查询解析，缺失值与角色不符的值一并报告"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = create_users(3, groups=('Student',))
+        cls.teacher = create_user('30000000000', groups=('Teacher',))
+
+    def validate(self, data):
+        serializer = MembersSerializer(data=data)
+        serializer.is_valid()
+        return serializer
+
+    def test_resolves_in_order(self):
+        ids = ['20000000002', '20000000000', '20000000002']
+        # 学生一次查询；老师一次查询用户、一次查询角色
+        with self.assertNumQueries(3):
+            serializer = self.validate({'students': ids, 'teachers': ['30000000000']})
+        self.assertEqual(serializer.errors, {})
+        self.assertEqual(
+            [user.pk for user in serializer.validated_data['students']],
+            [self.students[2].pk, self.students[0].pk, self.students[2].pk]
+        )
+        self.assertEqual(serializer.validated_data['teachers'], [self.teacher])
+
+    def test_missing_and_invalid_role(self):
+        serializer = self.validate({'students': ['20000000000', 'x1', 'x2', 'x1'], 'teachers': [
+            '30000000000', '20000000000', '20000000001',
+        ]})
+        self.assertEqual(serializer.errors['students'], ['以下 user_id 不存在: [\'x1\', \'x2\']'])
+        self.assertEqual(
+            serializer.errors['teachers'], ['以下用户不是指导老师角色: [\'20000000000\', \'20000000001\']']
+        )
 
-# Create your tests here.
+    def test_empty_and_wrong_types(self):
+        with self.assertNumQueries(0):
+            serializer = self.validate({'students': []})
+        self.assertEqual(serializer.validated_data['students'], [])
+        self.assertIn('students', self.validate({'students': [{'user_id': '20000000000'}]}).errors)
+        self.assertIn('students', self.validate({'students': [True]}).errors)
+        self.assertIn('students', self.validate({'students': '20000000000'}).errors)
@@ -11,6 +11,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from competitionManagementSys.streaming import StreamingListMixin
 from .models import Menu
 from .serializers import (
     RegisterSerializer,
@@ -53,10 +54,11 @@ class LoginTokenObtainPairView(TokenObtainPairView):
     serializer_class = LoginTokenObtainPairSerializer
 
 # 获取所有用户视图
-class UserListView(generics.ListAPIView):
-    # 优化查询：select_related 用于一对一(Profile)，prefetch_related 用于多对多(Groups)
-    queryset = User.objects.all().select_related('profile').prefetch_related('groups')
+class UserListView(StreamingListMixin, generics.ListAPIView):
+    # 优化查询：prefetch_related 用于多对多(Groups)；UserSerializer 不输出档案，不再 select_related('profile')
+    queryset = User.objects.all().prefetch_related('groups')
     serializer_class = UserSerializer
+    replica_actions = ('get',)
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAdmin]
@@ -137,6 +139,7 @@ class UserRoleStatisticsView(APIView):
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAdmin]
+    replica_actions = ('get',)
 
     def get(self, request, *args, **kwargs):
         # 核心逻辑：从 Group 模型出发，统计关联的 user 数量
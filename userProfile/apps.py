@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UserprofileConfig(AppConfig):
     name = 'userProfile'
+
+    def ready(self):
+        # 注册档案检索索引的同步信号
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from userProfile.models import Profile
+from userProfile.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = '全量重建用户档案检索索引（批量导入数据后执行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='目标数据库别名')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            total = rebuild_index(Profile.objects.using(using).all(), using=using)
+        self.stdout.write(self.style.SUCCESS(f'档案检索索引重建完成，共 {total} 条'))
@@ -0,0 +1,66 @@
+import re
+
+from django.db import migrations
+
+# 迁移是历史快照：表结构、分词规则与回填 SQL 都写在这里，不引用运行时的 userProfile.search，
+# 后者之后的修改不会影响本迁移的执行结果
+
+CREATE_FTS_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS sys_user_profile_fts USING fts5('
+    'user_id, real_name, department, major, clazz, title, tokenize="unicode61 remove_diacritics 2")'
+)
+INSERT_FTS_SQL = (
+    'INSERT INTO sys_user_profile_fts (rowid, user_id, real_name, department, major, clazz, title) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s)'
+)
+SELECT_PROFILES_SQL = 'SELECT id, user_id, real_name, department, major, clazz, title FROM sys_user_profile'
+
+PG_SEARCH_EXPR = (
+    "(user_id || ' ' || real_name || ' ' || department || ' ' || "
+    "coalesce(major, '') || ' ' || coalesce(clazz, '') || ' ' || coalesce(title, ''))"
+)
+
+# CJK 字符逐字切分（与创建索引时的 competitionManagementSys.fts.segment 一致）
+CJK_RE = re.compile(r'([㐀-䶿一-鿿豈-﫿])')
+
+
+def segment(text):
+    if not text:
+        return ''
+    return ' '.join(CJK_RE.sub(r' \1 ', text).split())
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_FTS_SQL)
+        with connection.cursor() as cursor:
+            cursor.execute(SELECT_PROFILES_SQL)
+            rows = [[row[0]] + [segment(value) for value in row[1:]] for row in cursor.fetchall()]
+            cursor.executemany(INSERT_FTS_SQL, rows)
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS sys_user_profile_trgm ON sys_user_profile '
+            f'USING gin ({PG_SEARCH_EXPR} gin_trgm_ops)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS sys_user_profile_fts')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS sys_user_profile_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userProfile', '0003_alter_profile_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,85 @@
+"""
+档案全文检索
+
+- SQLite：使用 FTS5 虚拟表 sys_user_profile_fts（rowid 即 Profile.id），由 signals 同步
+- PostgreSQL：使用 pg_trgm 的表达式 GIN 索引，无需额外同步
+- 其他数据库：退化为 icontains 查询
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+
+from competitionManagementSys.fts import FtsIndex
+
+# 参与检索的档案字段；学工号、姓名命中的结果排在院系/专业命中的结果前面
+FTS_COLUMNS = ['user_id', 'real_name', 'department', 'major', 'clazz', 'title']
+profile_index = FtsIndex(
+    'sys_user_profile_fts',
+    FTS_COLUMNS,
+    weights=[5.0, 10.0, 1.0, 1.0, 1.0, 1.0],
+)
+
+# PostgreSQL 下的检索表达式，必须与迁移中建立的索引表达式完全一致
+PG_SEARCH_EXPR = (
+    "(user_id || ' ' || real_name || ' ' || department || ' ' || "
+    "coalesce(major, '') || ' ' || coalesce(clazz, '') || ' ' || coalesce(title, ''))"
+)
+
+
+def _profile_values(profile):
+    return {column: getattr(profile, column) for column in FTS_COLUMNS}
+
+
+def index_profile(profile, using=DEFAULT_DB_ALIAS):
+    """写入/刷新单条档案的索引"""
+    profile_index.upsert(profile.pk, _profile_values(profile), using=using)
+
+
+def remove_profile(profile_id, using=DEFAULT_DB_ALIAS):
+    """删除单条档案的索引"""
+    profile_index.delete(profile_id, using=using)
+
+
+def rebuild_index(profiles, using=DEFAULT_DB_ALIAS):
+    """全量重建索引，返回写入的条数"""
+    rows = (
+        (profile.pk, _profile_values(profile))
+        for profile in profiles.only('id', *FTS_COLUMNS).iterator(chunk_size=2000)
+    )
+    return profile_index.rebuild(rows, using=using)
+
+
+def search_profile_ids(q, limit=20, using=DEFAULT_DB_ALIAS):
+    """
+    按相关度返回命中的 Profile.id 列表
+    """
+    q = (q or '').strip()
+    if not q:
+        return []
+
+    ids = profile_index.search(q, limit=limit, using=using)
+    if ids is not None:
+        return ids
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        terms = q.split()
+        where = ' AND '.join([f'{PG_SEARCH_EXPR} ILIKE %s'] * len(terms))
+        params = [f'%{t}%' for t in terms]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id FROM sys_user_profile WHERE {where} '
+                f'ORDER BY (user_id LIKE %s OR real_name ILIKE %s) DESC, '
+                f'similarity({PG_SEARCH_EXPR}, %s) DESC LIMIT %s',
+                params + [f'{terms[0]}%', f'{terms[0]}%', q, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # 其他数据库：退化为模糊匹配
+    from .models import Profile
+    condition = Q()
+    for term in q.split():
+        term_q = Q()
+        for column in FTS_COLUMNS:
+            term_q |= Q(**{f'{column}__icontains': term})
+        condition &= term_q
+    return list(Profile.objects.using(using).filter(condition).values_list('id', flat=True)[:limit])
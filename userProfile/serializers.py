@@ -13,16 +13,20 @@ class ProfileSerializer(serializers.ModelSerializer):
             'department', 'major', 'clazz', 'title', 'role_name'
         ]
 
+    def _group_names(self, obj):
+        # 使用 groups.all() 以便命中 prefetch_related('user__groups') 的缓存
+        return [g.name for g in sorted(obj.user.groups.all(), key=lambda g: g.pk)]
+
     def get_role_name(self, obj):
         # 返回用户所属的第一个组名（角色）
-        group = obj.user.groups.first()
-        return group.name if group else "普通用户"
+        names = self._group_names(obj)
+        return names[0] if names else "普通用户"
 
     def to_representation(self, instance):
         """动态处理字段显隐"""
         ret = super().to_representation(instance)
         # 逻辑判断：如果用户属于 'Student' 组，则在返回结果中移除 title
-        if instance.user.groups.filter(name='Student').exists():
+        if 'Student' in self._group_names(instance):
             ret.pop('title', None)
         return ret
 
@@ -33,4 +37,45 @@ class UserDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = get_user_model()
-        fields = ['user_id', 'username', 'profile']
\ No newline at end of file
+        fields = ['user_id', 'username', 'profile']
+
+PROFILE_FIELDS = ['real_name', 'phone', 'email', 'department', 'major', 'clazz', 'title']
+
+
+def build_user_details(user_pks):
+    """
+    UserDetailSerializer 的扁平版本，供只读列表的扁平序列化器使用
+    返回 {用户主键: {'user_id', 'username', 'profile'}}，与 UserDetailSerializer 输出一致（无档案时 profile 为 None），
+    用户、档案、角色组各一次查询（按批）
+    """
+    from competitionManagementSys.flat import in_batches
+
+    User = get_user_model()
+    users = {}
+    for batch in in_batches(set(user_pks)):
+        for pk, user_id, username in User.objects.filter(pk__in=batch).values_list('pk', 'user_id', 'username'):
+            users[pk] = {'user_id': user_id, 'username': username, 'profile': None}
+    if not users:
+        return users
+
+    # 与 ProfileSerializer 相同：按组主键排序，第一个组名为角色
+    group_names = {}
+    for batch in in_batches(users):
+        rows = (
+            User.groups.through.objects.filter(user_id__in=batch)
+            .order_by('group_id').values_list('user_id', 'group__name')
+        )
+        for pk, name in rows:
+            group_names.setdefault(pk, []).append(name)
+
+    # Profile.user 关联的是 user_id 字段
+    pk_by_user_id = {detail['user_id']: pk for pk, detail in users.items()}
+    for batch in in_batches(pk_by_user_id):
+        for row in Profile.objects.filter(user_id__in=batch).values('user_id', *PROFILE_FIELDS):
+            pk = pk_by_user_id[row['user_id']]
+            names = group_names.get(pk, [])
+            row['role_name'] = names[0] if names else "普通用户"
+            if 'Student' in names:
+                row.pop('title')
+            users[pk]['profile'] = row
+    return users
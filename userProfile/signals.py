@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Profile
+from .search import index_profile, remove_profile
+
+
+@receiver(post_save, sender=Profile)
+def sync_profile_search_index(sender, instance, using, raw=False, **kwargs):
+    """档案新增/修改后刷新检索索引"""
+    if raw:
+        return
+    index_profile(instance, using=using)
+
+
+@receiver(post_delete, sender=Profile)
+def remove_profile_search_index(sender, instance, using, **kwargs):
+    """档案删除后清理检索索引"""
+    remove_profile(instance.pk, using=using)
@@ -1,3 +1,54 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from competitionManagementSys.factories import create_admin, create_user
+from .models import Profile
+from .search import profile_index, rebuild_index, search_profile_ids
+
+
+class ProfileSearchTests(TestCase):
+    """档案全文检索：按相关度排序、前缀匹配，索引随档案变更同步"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_admin()
+        cls.zhang = create_user('20240001', real_name='张伟', department='物理学院', major='应用物理').profile
+        cls.li = create_user('20240002', real_name='李娜', department='计算机学院', major='张江校区软件工程').profile
+        cls.teacher = create_user('T1001', real_name='王芳', department='计算机学院', title='副教授').profile
+
+    def names(self, q, limit=20):
+        return [Profile.objects.get(pk=pk).real_name for pk in search_profile_ids(q, limit=limit)]
+
+    def test_ranking(self):
+        # 姓名命中排在专业命中之前
+        self.assertEqual(self.names('张'), ['张伟', '李娜'])
+        self.assertEqual(self.names('张', limit=1), ['张伟'])
+        self.assertEqual(sorted(self.names('计算机')), ['李娜', '王芳'])
+
+    def test_prefix_and_terms(self):
+        self.assertEqual(sorted(self.names('2024')), ['张伟', '李娜'])
+        self.assertEqual(self.names('计算 副教'), ['王芳'])
+        self.assertEqual(self.names('"*'), [])
+        self.assertEqual(self.names('  '), [])
+
+    def test_index_follows_changes(self):
+        self.zhang.real_name = '张三丰'
+        self.zhang.save()
+        self.assertEqual(self.names('三丰'), ['张三丰'])
+
+        self.teacher.delete()
+        self.assertEqual(self.names('副教授'), [])
+
+        # 全量重建与信号维护的结果一致
+        expected = self.names('计算机')
+        self.assertEqual(rebuild_index(Profile.objects.all()), 2)
+        self.assertEqual(self.names('计算机'), expected)
+        self.assertEqual(profile_index.rebuild([]), 0)
+        self.assertEqual(self.names('计算机'), [])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/user-profile/search/', {'q': '张', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['real_name'] for item in response.json()], ['张伟'])
@@ -1,6 +1,8 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, filters
+from rest_framework.response import Response
 from .models import Profile
+from .search import search_profile_ids
 from .serializers import ProfileSerializer
 from userManage.permissions import IsAdminOrReadOnly
 
@@ -24,10 +26,12 @@ class ProfileSearchByFieldNameView(generics.ListAPIView):
     """
     通过姓名搜索用户
     GET /user-profile/search/?real_name=张三
+    全文检索（学工号/姓名/院系/专业/班级/职称，按相关度排序，支持前缀匹配）
+    GET /user-profile/search/?q=张&limit=20
     """
     serializer_class = ProfileSerializer
     permission_classes = [IsAdminOrReadOnly]
-    queryset = Profile.objects.all().select_related('user')
+    queryset = Profile.objects.all().select_related('user').prefetch_related('user__groups')
 
     # 1. 切换后端为 DjangoFilterBackend
     filter_backends = [DjangoFilterBackend]
@@ -36,6 +40,26 @@ class ProfileSearchByFieldNameView(generics.ListAPIView):
     # 默认就是精确查询
     filterset_fields = ['real_name']
 
+    max_search_limit = 50
+
+    def list(self, request, *args, **kwargs):
+        q = request.query_params.get('q')
+        if q is None:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_search_limit)
+        except ValueError:
+            limit = 20
+
+        # 先从索引中取出排好序的 id，再按 id 取档案并保持相关度顺序
+        profile_ids = search_profile_ids(q, limit=max(limit, 1))
+        profiles = self.get_queryset().in_bulk(profile_ids)
+        ordered = [profiles[pk] for pk in profile_ids if pk in profiles]
+
+        serializer = self.get_serializer(ordered, many=True)
+        return Response(serializer.data)
+
 
 class ProfileRetrieveByUserIdView(generics.RetrieveAPIView):
     """